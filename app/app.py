@@ -1,10 +1,20 @@
 import streamlit as st
 import pandas as pd
 import os
-import joblib
+import sys
+import time
 import plotly.express as px
 import plotly.graph_objects as go
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from models.batch_scoring import iter_file_chunks, run_batch_scoring
+from models.model_registry import get_model, model_metrics
+from models.prediction_table import GRID
+from utils.date_parsing import ISO_DATE_FORMAT, parse_dates
+from utils.feature_registry import SPECS_BY_NAME, model_input
+from utils.olap_cube import OLAP_CUBE_PATH, SOURCE_COLUMNS, OlapCube
+from utils.spatial_index import SPATIAL_INDEX_PATH, load_spatial_index
+
 
 # PAGE CONFIG
 st.set_page_config(
@@ -60,21 +70,56 @@ footer {visibility: hidden;}
 
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 
-DATA_PATH = os.path.join(BASE_DIR, "data", "processed", "sample_accidents.csv")
-MODEL_PATH = os.path.join(BASE_DIR, "models", "trained_models", "best_model.pkl")
 FORECAST_PATH = os.path.join(BASE_DIR, "reports", "forecast", "30_day_forecast.csv")
 HEATMAP_PATH = os.path.join(BASE_DIR, "reports", "heatmap", "advanced_accident_heatmap.html")
+SAMPLE_DATA_PATH = os.path.join(BASE_DIR, "data", "processed", "sample_accidents.csv")
 
 
 # LOAD DATA
-
-@st.cache_data
-def load_data():
-    df = pd.read_csv(DATA_PATH)
+# Overview aggregates come from the OLAP cube built by the pipeline (full
+# national data); each filter change is a slice and sum, independent of row
+# count. Without a built cube, one is built in memory from the sample dataset.
+
+def cube_source():
+    for path in (OLAP_CUBE_PATH, SAMPLE_DATA_PATH):
+        if os.path.exists(path):
+            return path
+    return None
+
+
+# The file's mtime is part of the cache key, so a rebuilt cube is picked up
+@st.cache_resource(max_entries=1)
+def load_cube(path, mtime):
+    if path == OLAP_CUBE_PATH:
+        return OlapCube.load(path)
+    df = pd.read_csv(path, usecols=SOURCE_COLUMNS)
     df["Date"] = pd.to_datetime(df["Date"])
-    return df
+    return OlapCube.from_dataframe(df)
+
+
+# The saved spatial index (utils/spatial_index.py), reloaded when it is rebuilt;
+# None while it is missing or older than the dataset it indexes
+@st.cache_resource(max_entries=1)
+def load_index(mtime):
+    return load_spatial_index()
+
+
+# PREDICTION FORM OPTIONS
+# Scores of a lookup feature covered by the prediction table, labelled with
+# the categories the feature registry maps to each one
+
+def score_labels(name):
+    labels = {}
+    for score in GRID[name]:
+        sources = SPECS_BY_NAME[name].sources_of(score)
+        labels[int(score)] = f"{score} · {', '.join(sources)}" if sources else f"{score} · (no listed category)"
+    return labels
 
-df = load_data()
+
+def default_score_index(name):
+    # Score of the registry's first category (e.g. "Fine without high winds")
+    first_score = next(iter(SPECS_BY_NAME[name].table.values()))
+    return [int(score) for score in GRID[name]].index(first_score)
 
 
 # SIDEBAR NAVIGATION
@@ -93,10 +138,54 @@ if page == "Executive Overview":
     st.title("🚦 Smart City Traffic Intelligence Overview")
     st.markdown("Data-driven national accident analytics for strategic planning.")
 
-    total_accidents = len(df)
-    high_severity = (df["Severity_Label"] == "High").mean() * 100
-    avg_daily = df.groupby("Date").size().mean()
-    risky_time = df["Time_Category"].value_counts().idxmax()
+    source = cube_source()
+    if source is None:
+        st.warning("OLAP cube not found. Run utils/olap_cube.py (pipeline stage 'cube') first.")
+        st.stop()
+    if source == SAMPLE_DATA_PATH:
+        st.info("Showing the sample dataset. Build the OLAP cube (utils/olap_cube.py) for the full national data.")
+
+    cube = load_cube(source, os.path.getmtime(source))
+    dates = cube.labels["Date"]
+
+    # Filters
+    st.sidebar.markdown("### Filters")
+    date_range = st.sidebar.date_input(
+        "Date Range",
+        value=(dates[0].item(), dates[-1].item()),
+        min_value=dates[0].item(),
+        max_value=dates[-1].item()
+    )
+    severities = st.sidebar.multiselect("Severity", list(cube.labels["Severity_Label"]))
+    time_categories = st.sidebar.multiselect("Time of Day", SPECS_BY_NAME["Time_Category"].categories)
+    weathers = st.sidebar.multiselect("Weather Conditions", list(cube.labels["Weather_Conditions"]))
+    road_types = st.sidebar.multiselect("Road Type", list(cube.labels["Road_Type"]))
+    day_type = st.sidebar.selectbox("Day Type", ["All", "Weekday", "Weekend"])
+
+    # An empty multiselect means no filter
+    selection = cube.select(
+        date_range[0] if date_range else None,
+        date_range[-1] if date_range else None,
+        {
+            "Severity_Label": severities or None,
+            "Time_Category": time_categories or None,
+            "Weather_Conditions": weathers or None,
+            "Road_Type": road_types or None,
+            "Is_Weekend": None if day_type == "All" else int(day_type == "Weekend")
+        }
+    )
+    overview = selection.marginals("Date", "Severity_Label", "Time_Category")
+
+    daily = overview["Date"].reset_index()
+    severity_counts = overview["Severity_Label"]
+    time_category_counts = overview["Time_Category"]
+
+    total_accidents = int(severity_counts.sum())
+    high_severity = severity_counts.get("High", 0) / max(total_accidents, 1) * 100
+    # The cube's Date axis is dense: average over days that had accidents
+    accident_days = daily.loc[daily["Accidents"] > 0, "Accidents"]
+    avg_daily = accident_days.mean() if len(accident_days) else 0
+    risky_time = time_category_counts.idxmax() if total_accidents else "-"
 
     col1, col2, col3, col4 = st.columns(4)
 
@@ -107,8 +196,6 @@ if page == "Executive Overview":
 
     st.markdown("---")
 
-    daily = df.groupby("Date").size().reset_index(name="Accidents")
-
     trend_fig = px.line(
         daily,
         x="Date",
@@ -122,8 +209,8 @@ if page == "Executive Overview":
     st.markdown("---")
 
     severity_fig = px.pie(
-        df,
-        names="Severity_Label",
+        names=severity_counts.index,
+        values=severity_counts.values,
         template="plotly_dark",
         title="Accident Severity Distribution"
     )
@@ -138,7 +225,8 @@ elif page == "ML Prediction":
 
     st.title("🤖 Accident Severity Prediction Engine")
 
-    model = joblib.load(MODEL_PATH)
+    # Loaded once per process; reloaded only when the model is retrained
+    model = get_model()
 
     st.markdown("Adjust parameters to simulate accident conditions.")
 
@@ -148,31 +236,51 @@ elif page == "ML Prediction":
     casualties = col1.number_input("Number of Casualties", 0, 20, 1)
     speed_limit = col1.selectbox("Speed Limit (mph)", [20, 30, 40, 50, 60, 70])
 
-    weather_index = col2.slider("Weather Severity Index", 1, 5, 1)
-    road_risk = col2.slider("Road Risk Score", 1, 5, 3)
+    # Every score the prediction table covers, labelled with the conditions
+    # the feature registry maps to it (so scores no category reaches stay selectable)
+    weather_labels = score_labels("Weather_Severity_Index")
+    road_labels = score_labels("Road_Risk_Score")
+    weather_score = col2.selectbox(
+        "Weather Severity Index",
+        list(weather_labels),
+        index=default_score_index("Weather_Severity_Index"),
+        format_func=weather_labels.get
+    )
+    road_score = col2.selectbox(
+        "Road Risk Score",
+        list(road_labels),
+        index=default_score_index("Road_Risk_Score"),
+        format_func=road_labels.get
+    )
     weekend = col2.selectbox("Is Weekend?", [0, 1])
 
     if st.button("🚀 Predict Severity"):
 
-        input_df = pd.DataFrame([{
-    "Number_of_Vehicles": vehicles,
-    "Number_of_Casualties": casualties,
-    "Speed_limit": speed_limit,
-    "Weather_Severity_Index": weather_index,
-    "Road_Risk_Score": road_risk,
-    "Is_Weekend": weekend
-}])
+        input_df = model_input({
+            "Number_of_Vehicles": vehicles,
+            "Number_of_Casualties": casualties,
+            "Speed_limit": speed_limit,
+            "Weather_Severity_Index": weather_score,
+            "Road_Risk_Score": road_score,
+            "Is_Weekend": weekend
+        })
 
+        start = time.perf_counter()
         prediction = model.predict(input_df)[0]
-        probs = model.predict_proba(input_df)[0]
+        probs = model.predict_proba(input_df).iloc[0]
+        inference_ms = 1e3 * (time.perf_counter() - start)
 
-        severity_map = {0: "High", 1: "Low", 2: "Medium"}
+        st.success(f"Predicted Severity: **{prediction}**")
 
-        st.success(f"Predicted Severity: **{severity_map.get(prediction, prediction)}**")
+        metrics = model_metrics()
+        st.caption(
+            f"Inference: {inference_ms:.1f} ms · "
+            f"Model load: {metrics['last_load_seconds']:.2f} s (once per process, {metrics['loads']} load(s))"
+        )
 
         prob_df = pd.DataFrame({
-            "Severity": ["High", "Low", "Medium"],
-            "Probability": probs
+            "Severity": probs.index,
+            "Probability": probs.values
         })
 
         prob_fig = px.bar(
@@ -186,6 +294,29 @@ elif page == "ML Prediction":
 
         st.plotly_chart(prob_fig, use_container_width=True)
 
+    st.markdown("---")
+    st.markdown("### 📂 Batch Scoring")
+
+    uploaded = st.file_uploader("Score an accident file (CSV or Parquet)", type=["csv", "parquet"])
+
+    if uploaded is not None and st.button("⚙️ Score File"):
+        try:
+            # One worker: a process pool per click would reload the model inside the server
+            rows, rate, skipped, scores = run_batch_scoring(iter_file_chunks(uploaded), n_workers=1)
+        except ValueError as err:
+            st.error(str(err))
+        else:
+            st.success(f"Scored {rows:,} rows ({rate:,.0f} rows/sec)")
+            if skipped:
+                st.warning(f"{skipped:,} rows with a missing model input (e.g. no speed limit) were not scored")
+            st.dataframe(scores.head(100))
+            st.download_button(
+                "Download Scores (CSV)",
+                scores.to_csv(index=False),
+                file_name="severity_scores.csv",
+                mime="text/csv"
+            )
+
 
 
 # PAGE 3 — HEATMAP
@@ -201,6 +332,33 @@ elif page == "Risk Heatmap":
     else:
         st.warning("Heatmap file not found. Generate it first.")
 
+    st.markdown("---")
+    st.markdown("### 📍 Location Risk Lookup")
+
+    index = load_index(os.path.getmtime(SPATIAL_INDEX_PATH)) if os.path.exists(SPATIAL_INDEX_PATH) else None
+
+    if index is None:
+        st.warning("Spatial index missing or older than the cleaned dataset. Run utils/spatial_index.py first.")
+    else:
+        col1, col2, col3 = st.columns(3)
+        lat = col1.number_input("Latitude", -90.0, 90.0, 51.5074, format="%.5f")
+        lon = col2.number_input("Longitude", -180.0, 180.0, -0.1278, format="%.5f")
+        radius = col3.slider("Radius (m)", 100, 2000, 500, step=100)
+
+        # Last 3 years of the indexed data
+        latest = pd.Timestamp(index.days.max(), unit="D")
+        since = latest - pd.DateOffset(years=3)
+
+        start = time.perf_counter()
+        accidents = index.count(lat, lon, radius, since=since)
+        severe = index.count(lat, lon, radius, severity=[1, 2], since=since)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        col1, col2 = st.columns(2)
+        col1.metric(f"Accidents within {radius} m", f"{accidents:,}")
+        col2.metric("Fatal or Serious", f"{severe:,}")
+        st.caption(f"{since.date()} to {latest.date()} · answered in {elapsed_ms:.2f} ms from the spatial index")
+
 
 
 # PAGE 4 — FORECAST
@@ -212,7 +370,7 @@ elif page == "Forecast":
     if os.path.exists(FORECAST_PATH):
         forecast = pd.read_csv(FORECAST_PATH)
 
-        forecast["ds"] = pd.to_datetime(forecast["ds"])
+        forecast["ds"] = parse_dates(forecast["ds"], ISO_DATE_FORMAT)
 
         fig = go.Figure()
 
@@ -0,0 +1,108 @@
+"""
+Async Database Benchmark
+Smart City Traffic Analytics System
+
+Latency of a dashboard page needing five independent aggregates, run one
+after another and concurrently through database/async_db.py.
+
+Runs against a local SQLite stand-in (via DB_URL). Each query first calls
+server_delay(ms), a SQL function that sleeps without holding the GIL, to
+stand in for the network round trip and server time of a MySQL query.
+
+Usage: python benchmarks/bench_async_db.py [rows]
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import event
+
+os.environ["DB_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_async.db')}"
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database.async_db import gather_queries, shutdown_executor
+from database.db_connection import checkout, get_engine
+
+
+# Kept small: on a real server the scans run server-side, here they share the client CPU
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+
+# Five page aggregates and their simulated server latency (ms)
+PAGE_QUERIES = {
+    "total": (20, "SELECT COUNT(*) FROM accidents"),
+    "high_severity": (35, "SELECT COUNT(*) FROM accidents WHERE accident_severity = 1"),
+    "avg_daily": (50, "SELECT AVG(n) FROM (SELECT COUNT(*) AS n FROM accidents GROUP BY date)"),
+    "by_weather": (65, "SELECT weather_conditions, COUNT(*) FROM accidents GROUP BY weather_conditions"),
+    "by_road_type": (80, "SELECT road_type, COUNT(*) FROM accidents GROUP BY road_type")
+}
+
+
+def server_delay(ms):
+    time.sleep(ms / 1000)
+    return ms
+
+
+def delayed(delay_ms, sql):
+    """sql plus one server_delay call (an uncorrelated subquery runs once, not per row)"""
+    return f"SELECT * FROM ({sql}) WHERE (SELECT server_delay({delay_ms})) > 0"
+
+
+def setup():
+    event.listen(get_engine(), "connect", lambda conn, record: conn.create_function("server_delay", 1, server_delay))
+
+    rng = np.random.default_rng(42)
+    df = pd.DataFrame({
+        "accident_index": np.arange(ROWS).astype(str),
+        "accident_severity": rng.choice([1, 2, 3], ROWS, p=[0.02, 0.15, 0.83]),
+        "date": pd.to_datetime("2005-01-01") + pd.to_timedelta(rng.integers(0, 3650, ROWS), unit="D"),
+        "weather_conditions": rng.choice(["Fine", "Raining", "Snowing", "Fog"], ROWS),
+        "road_type": rng.choice(["Single carriageway", "Dual carriageway", "Roundabout"], ROWS)
+    })
+    with checkout() as conn:
+        df.to_sql("accidents", conn, index=False)
+        conn.commit()
+
+
+def serial():
+    for delay_ms, sql in PAGE_QUERIES.values():
+        with checkout() as conn:
+            conn.exec_driver_sql(delayed(delay_ms, sql)).fetchall()
+
+
+def concurrent():
+    queries = {name: delayed(delay_ms, sql) for name, (delay_ms, sql) in PAGE_QUERIES.items()}
+    results = asyncio.run(gather_queries(queries, cached=False))
+    failed = [name for name, rows in results.items() if isinstance(rows, Exception)]
+    assert not failed, failed
+
+
+def best_of(func, repeats=5):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+if __name__ == "__main__":
+    print(f"Building {ROWS:,}-row stand-in accidents table...")
+    setup()
+
+    # Warm the pool so neither run pays for new connections
+    concurrent()
+
+    delays = [delay_ms for delay_ms, _ in PAGE_QUERIES.values()]
+    serial_time = best_of(serial)
+    concurrent_time = best_of(concurrent)
+
+    print(f"Simulated server latency: {delays} ms (sum {sum(delays)} ms, slowest {max(delays)} ms)")
+    print(f"Serial:     {1e3 * serial_time:7.1f} ms")
+    print(f"Concurrent: {1e3 * concurrent_time:7.1f} ms   ({serial_time / concurrent_time:.1f}x faster)")
+
+    shutdown_executor()
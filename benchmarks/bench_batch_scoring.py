@@ -0,0 +1,69 @@
+"""
+Batch Scoring Benchmark
+Smart City Traffic Analytics System
+
+Throughput of models/batch_scoring.py on a Parquet input of rows/10 and
+rows accident records (1M and 10M by default), written to a Parquet
+output, on one worker process and on one worker per CPU core.
+
+Scoring cost does not depend on the values, so the input repeats one
+block of synthetic raw records instead of generating every row.
+
+Usage: python benchmarks/bench_batch_scoring.py [rows]
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.synthetic_data import make_raw_accidents
+from models.batch_scoring import BATCH_SCORING_CHUNK_ROWS, iter_file_chunks, run_batch_scoring, scoring_columns
+from models.model_registry import get_model
+
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+BLOCK_ROWS = min(ROWS, 1_000_000)
+
+
+def write_input(path, rows, block):
+    with pq.ParquetWriter(path, block.schema) as writer:
+        for start in range(0, rows, BLOCK_ROWS):
+            writer.write_table(block.slice(0, min(BLOCK_ROWS, rows - start)))
+
+
+def score(path, output, n_workers):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        rows, _, skipped = run_batch_scoring(iter_file_chunks(path), output=output, n_workers=n_workers)
+    # Rows with a missing speed limit are skipped, not scored
+    return rows + skipped, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    workdir = tempfile.mkdtemp()
+    cores = os.cpu_count() or 1
+
+    print(f"Generating a {BLOCK_ROWS:,}-row synthetic block...")
+    raw = make_raw_accidents(BLOCK_ROWS)
+    block = pa.Table.from_pandas(raw[[col for col in scoring_columns() if col in raw.columns]], preserve_index=False)
+
+    # Model load is paid once per process; keep it out of the timings
+    get_model()
+
+    print(f"Chunks of {BATCH_SCORING_CHUNK_ROWS:,} rows, {cores} CPU core(s)")
+    for rows in (ROWS // 10, ROWS):
+        path = os.path.join(workdir, f"input_{rows}.parquet")
+        write_input(path, rows, block)
+
+        print(f"\n{rows:,} rows:")
+        for n_workers in sorted({1, cores}):
+            scored, elapsed = score(path, os.path.join(workdir, f"scores_{rows}_{n_workers}.parquet"), n_workers)
+            assert scored == rows
+            print(f"{n_workers:3d} worker(s): {elapsed:7.2f} s   {rows / elapsed:10,.0f} rows/sec")
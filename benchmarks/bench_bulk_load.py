@@ -0,0 +1,76 @@
+"""
+Bulk Load Benchmark
+Smart City Traffic Analytics System
+
+Loads synthetic accidents-table rows with each strategy of
+database/bulk_load.py and with the previous to_sql path, into a local
+stand-in database (SQLite file via DB_URL, or any server set in DB_URL
+before running), and reports rows/sec.
+
+load_data only runs against MySQL; it is skipped for other databases.
+
+Usage: python benchmarks/bench_bulk_load.py [rows]
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+
+if not os.getenv("DB_URL"):
+    os.environ["DB_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_bulk_load.db')}"
+
+from sqlalchemy import text
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.synthetic_data import make_raw_accidents
+from database.bulk_load import STRATEGIES, bulk_load
+from database.db_connection import checkout, get_engine
+from database.insert_data import prepare_accidents_frame
+from utils.data_cleaning import clean_dataframe
+from utils.feature_engineering import engineer_features
+
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+TABLE = "bench_accidents"
+
+SECONDARY_INDEXES = {
+    "idx_bench_date": "date",
+    "idx_bench_severity": "accident_severity",
+    "idx_bench_location": "latitude, longitude"
+}
+
+
+def reset_table(df):
+    with checkout() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+        conn.commit()
+        df.head(0).to_sql(TABLE, conn, index=False)
+        for name, columns in SECONDARY_INDEXES.items():
+            conn.execute(text(f"CREATE INDEX {name} ON {TABLE} ({columns})"))
+        conn.commit()
+
+
+if __name__ == "__main__":
+    print(f"Generating {ROWS:,} synthetic accidents rows...")
+    with contextlib.redirect_stdout(io.StringIO()):
+        df = prepare_accidents_frame(engineer_features(clean_dataframe(make_raw_accidents(ROWS), 1)))
+
+    print(f"Target: {os.environ['DB_URL']}")
+    rates = {}
+    for strategy in ("to_sql",) + tuple(s for s in STRATEGIES if s != "to_sql"):
+        if strategy == "load_data" and get_engine().dialect.name != "mysql":
+            print("load_data: skipped (needs MySQL)")
+            continue
+
+        reset_table(df)
+        # The previous path kept the indexes live during the load
+        rates[strategy] = bulk_load(df, TABLE, strategy, rebuild_indexes=strategy != "to_sql")
+
+        with checkout() as conn:
+            assert conn.execute(text(f"SELECT COUNT(*) FROM {TABLE}")).scalar() == len(df)
+
+    print()
+    for strategy, rate in rates.items():
+        print(f"{strategy:<10} {rate:>12,.0f} rows/sec   {rate / rates['to_sql']:5.2f}x vs to_sql")
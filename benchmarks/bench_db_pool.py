@@ -0,0 +1,86 @@
+"""
+Database Connection Pool Benchmark
+Smart City Traffic Analytics System
+
+Runs N small queries against a local stand-in database (SQLite file,
+selected through DB_URL) with the previous per-call connection paths
+and with the pooled checkout of database/db_connection.py.
+
+A real MySQL server adds a TCP handshake and authentication to every
+new connection, so the gap there is larger than shown here.
+
+Usage: python benchmarks/bench_db_pool.py [queries]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
+
+DB_FILE = os.path.join(tempfile.mkdtemp(), "bench_pool.db")
+os.environ["DB_URL"] = f"sqlite:///{DB_FILE}"
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database.db_connection import checkout, pool_metrics
+
+
+QUERIES = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+ROWS = 10_000
+QUERY = "SELECT accident_severity FROM accidents WHERE accident_index = :key"
+
+
+def timed(label, func):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<45} {1e3 * elapsed / QUERIES:8.3f} ms/query")
+    return elapsed
+
+
+def engine_per_call():
+    """Previous insert path: a new engine for every call"""
+    for i in range(QUERIES):
+        engine = create_engine(os.environ["DB_URL"])
+        with engine.connect() as conn:
+            conn.execute(text(QUERY), {"key": str(i % ROWS)}).scalar()
+        engine.dispose()
+
+
+def connect_per_call():
+    """Previous fetch/count path: a new DBAPI connection for every call"""
+    engine = create_engine(os.environ["DB_URL"], poolclass=NullPool)
+    for i in range(QUERIES):
+        with engine.connect() as conn:
+            conn.execute(text(QUERY), {"key": str(i % ROWS)}).scalar()
+
+
+def pooled():
+    for i in range(QUERIES):
+        with checkout() as conn:
+            conn.execute(text(QUERY), {"key": str(i % ROWS)}).scalar()
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(42)
+    setup_engine = create_engine(os.environ["DB_URL"])
+    pd.DataFrame({
+        "accident_index": np.arange(ROWS).astype(str),
+        "accident_severity": rng.choice([1, 2, 3], ROWS)
+    }).to_sql("accidents", setup_engine, index=False)
+    with setup_engine.begin() as conn:
+        conn.execute(text("CREATE UNIQUE INDEX idx_accident_index ON accidents (accident_index)"))
+    setup_engine.dispose()
+
+    print(f"Running {QUERIES:,} small queries against {os.environ['DB_URL']}...")
+    engine_time = timed("New engine per call", engine_per_call)
+    connect_time = timed("New connection per call", connect_per_call)
+    pooled_time = timed("Pooled checkout", pooled)
+
+    print(f"Speedup vs new engine per call: {engine_time / pooled_time:.1f}x")
+    print(f"Speedup vs new connection per call: {connect_time / pooled_time:.1f}x")
+    print("Pool metrics:", pool_metrics())
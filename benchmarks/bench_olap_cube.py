@@ -0,0 +1,98 @@
+"""
+OLAP Cube Benchmark
+Smart City Traffic Analytics System
+
+One Executive Overview rerun (total, High severity %, daily trend, most
+frequent Time_Category, severity split) under a set of sidebar filters,
+computed from the rows with pandas (the previous app) and from the OLAP
+cube (utils/olap_cube.py), at two dataset sizes: the cube answer should
+cost the same at both, and match the pandas one figure for figure.
+
+Usage: python benchmarks/bench_olap_cube.py [rows]
+"""
+
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.synthetic_data import make_raw_accidents
+from utils.data_cleaning import clean_dataframe
+from utils.feature_engineering import engineer_features
+from utils.olap_cube import OlapCube
+
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+REPEATS = 5
+
+DATE_FROM, DATE_TO = "2008-01-01", "2012-12-31"
+FILTERS = {
+    "Weather_Conditions": ["Raining without high winds", "Raining with high winds"],
+    "Time_Category": ["Evening", "Night"]
+}
+
+
+def best_of(func):
+    times = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def overview_pandas(df):
+    df = df[(df["Date"] >= DATE_FROM) & (df["Date"] <= DATE_TO)]
+    for col, values in FILTERS.items():
+        df = df[df[col].isin(values)]
+
+    daily = df.groupby("Date").size()
+    return (
+        len(df),
+        (df["Severity_Label"] == "High").mean(),
+        daily.mean(),
+        df["Time_Category"].value_counts().idxmax(),
+        df["Severity_Label"].value_counts()
+    )
+
+
+def overview_cube(cube):
+    overview = cube.select(DATE_FROM, DATE_TO, FILTERS).marginals("Date", "Severity_Label", "Time_Category")
+
+    severity = overview["Severity_Label"]
+    total = int(severity.sum())
+    # Dense Date axis: days without accidents are not averaged
+    daily = overview["Date"]
+    return (
+        total,
+        severity.get("High", 0) / max(total, 1),
+        daily[daily > 0].mean(),
+        overview["Time_Category"].idxmax(),
+        severity
+    )
+
+
+if __name__ == "__main__":
+    print(f"Generating {ROWS:,} synthetic ML-ready rows...")
+    with contextlib.redirect_stdout(io.StringIO()):
+        full = engineer_features(clean_dataframe(make_raw_accidents(ROWS), 1))
+
+    for rows in (ROWS // 4, ROWS):
+        df = full.iloc[:rows]
+
+        build_start = time.perf_counter()
+        cube = OlapCube.from_dataframe(df)
+        build_time = time.perf_counter() - build_start
+
+        pandas_time, expected = best_of(lambda: overview_pandas(df))
+        cube_time, result = best_of(lambda: overview_cube(cube))
+        assert result[0] == expected[0] and result[3] == expected[3]
+        assert abs(result[2] - expected[2]) < 1e-9, "Average daily incidents differ"
+        assert (result[4].reindex(expected[4].index) == expected[4]).all(), "Severity split differs"
+
+        print(f"\n{rows:,} rows: cube {cube.counts.shape} {cube.counts.dtype}, built in {build_time:.2f} s")
+        print(f"Filtered rows: {expected[0]:,}")
+        print(f"pandas over rows: {1e3 * pandas_time:8.1f} ms")
+        print(f"OLAP cube:        {1e3 * cube_time:8.1f} ms   ({pandas_time / cube_time:.1f}x faster)")
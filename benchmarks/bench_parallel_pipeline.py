@@ -0,0 +1,57 @@
+"""
+Parallel Pipeline Benchmark
+Smart City Traffic Analytics System
+
+Times clean_dataframe + engineer_features on synthetic raw data with
+1..N worker processes, checks every result against the serial output
+and reports the speedup.
+
+Usage: python benchmarks/bench_parallel_pipeline.py [rows] [max_workers]
+"""
+
+import contextlib
+import io
+import os
+import sys
+import time
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.synthetic_data import make_raw_accidents
+from utils.data_cleaning import clean_dataframe
+from utils.feature_engineering import engineer_features
+from utils.parallel import run_partitioned
+
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+MAX_WORKERS = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+
+
+def run_pipeline(raw, n_workers):
+    # stage progress messages are silenced to keep the report readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        df = clean_dataframe(raw.copy(), n_workers)
+        return run_partitioned(engineer_features, df, n_workers)
+
+
+if __name__ == "__main__":
+    print(f"Generating {ROWS:,} synthetic raw records...")
+    raw = make_raw_accidents(ROWS)
+
+    baseline = None
+    serial_time = None
+
+    print(f"{'workers':>8} {'seconds':>10} {'speedup':>8}")
+    for n_workers in range(1, MAX_WORKERS + 1):
+        start = time.perf_counter()
+        result = run_pipeline(raw, n_workers)
+        elapsed = time.perf_counter() - start
+
+        if baseline is None:
+            baseline, serial_time = result, elapsed
+        else:
+            pd.testing.assert_frame_equal(result, baseline)
+
+        print(f"{n_workers:>8} {elapsed:>10.2f} {serial_time / elapsed:>7.2f}x")
+
+    print("All parallel results match the serial output.")
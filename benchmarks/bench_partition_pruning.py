@@ -0,0 +1,84 @@
+"""
+Partition Pruning Benchmark
+Smart City Traffic Analytics System
+
+Reads of one city in one year from a synthetic ML-ready dataset stored
+flat (the previous layout: read everything, then filter in pandas) and
+partitioned by Year / Local_Authority_(District) (utils/data_store.py
+prunes the partitions before opening any file), at two dataset sizes:
+the slice read should grow with the slice, not with the national total.
+
+Usage: python benchmarks/bench_partition_pruning.py [rows]
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import utils.data_store as data_store
+from benchmarks.synthetic_data import make_raw_accidents
+from utils.data_cleaning import clean_dataframe
+from utils.feature_engineering import engineer_features
+
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+REPEATS = 5
+
+CITY = "Leeds"
+YEAR = 2012
+COLUMNS = ["Date", "Latitude", "Longitude", "Severity_Label"]
+
+
+def best_of(func):
+    times = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def read_flat(name):
+    df = data_store.load_dataset(name, columns=COLUMNS + ["Year", data_store.REGION_COLUMN])
+    return df[(df["Year"] == YEAR) & (df[data_store.REGION_COLUMN] == CITY)]
+
+
+def read_pruned(name):
+    return data_store.load_dataset(
+        name,
+        columns=COLUMNS,
+        filters=[("Year", "==", YEAR), (data_store.REGION_COLUMN, "==", CITY)]
+    )
+
+
+if __name__ == "__main__":
+    data_store.PROCESSED_DIR = tempfile.mkdtemp()
+
+    print(f"Generating {ROWS:,} synthetic ML-ready rows...")
+    with contextlib.redirect_stdout(io.StringIO()):
+        full = engineer_features(clean_dataframe(make_raw_accidents(ROWS), 1))
+
+    for rows in (ROWS // 4, ROWS):
+        df = full.iloc[:rows]
+        flat_name, partitioned_name = f"flat_{rows}", f"partitioned_{rows}"
+
+        # Flat: a dataset with no partition columns declared
+        with contextlib.redirect_stdout(io.StringIO()):
+            data_store.save_dataset(df, flat_name)
+            data_store.DATASET_PARTITIONS[partitioned_name] = data_store.DATASET_PARTITIONS[data_store.ML_READY_DATASET]
+            data_store.save_dataset(df, partitioned_name)
+
+        flat_time, flat_slice = best_of(lambda: read_flat(flat_name))
+        pruned_time, pruned_slice = best_of(lambda: read_pruned(partitioned_name))
+        assert len(flat_slice) == len(pruned_slice)
+
+        files, total_files = data_store.dataset_partitions(
+            partitioned_name, [("Year", "==", YEAR), (data_store.REGION_COLUMN, "==", CITY)]
+        )
+        print(f"\n{rows:,} rows, slice {CITY} {YEAR}: {len(pruned_slice):,} rows ({len(files)} of {total_files} files)")
+        print(f"Flat read + pandas filter: {1e3 * flat_time:8.1f} ms")
+        print(f"Partition-pruned read:     {1e3 * pruned_time:8.1f} ms   ({flat_time / pruned_time:.1f}x faster)")
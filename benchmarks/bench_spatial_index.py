@@ -0,0 +1,92 @@
+"""
+Spatial Index Benchmark
+Smart City Traffic Analytics System
+
+Times radius, bounding-box and nearest-neighbour queries of
+utils/spatial_index.py against a full scan, on synthetic accident
+locations clustered around UK cities.
+
+Usage: python benchmarks/bench_spatial_index.py [rows]
+"""
+
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.spatial_index import SpatialIndex, haversine_m
+
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+QUERIES = 1000
+SCAN_QUERIES = 20
+
+CITY_CENTRES = [
+    (51.507, -0.128),   # London
+    (52.486, -1.890),   # Birmingham
+    (53.480, -2.242),   # Manchester
+    (53.800, -1.549),   # Leeds
+    (55.864, -4.252)    # Glasgow
+]
+
+
+def make_points(rows):
+    rng = np.random.default_rng(42)
+    centres = np.array(CITY_CENTRES)[rng.integers(0, len(CITY_CENTRES), rows)]
+    in_city = rng.random(rows) < 0.7
+
+    lat = np.where(in_city, centres[:, 0] + rng.normal(0, 0.08, rows), rng.uniform(50.5, 55.5, rows))
+    lon = np.where(in_city, centres[:, 1] + rng.normal(0, 0.12, rows), rng.uniform(-5.5, 1.5, rows))
+    severity = rng.choice(np.array([1, 2, 3], dtype=np.int8), rows, p=[0.02, 0.15, 0.83])
+    days = pd.date_range("2005-01-01", "2014-12-31")
+    dates = days[rng.integers(0, len(days), rows)]
+    return lat, lon, severity, dates
+
+
+def per_query(label, func, queries):
+    start = time.perf_counter()
+    results = [func(lat, lon) for lat, lon in queries]
+    elapsed = time.perf_counter() - start
+    print(f"{label:<45} {1e3 * elapsed / len(queries):9.3f} ms/query")
+    return results
+
+
+if __name__ == "__main__":
+    print(f"Generating {ROWS:,} synthetic accident locations...")
+    lat, lon, severity, dates = make_points(ROWS)
+
+    start = time.perf_counter()
+    index = SpatialIndex.build(lat, lon, severity, dates)
+    print(f"Index built in {time.perf_counter() - start:.2f} s ({len(index.cell_ids):,} cells)")
+
+    rng = np.random.default_rng(7)
+    picks = rng.integers(0, ROWS, QUERIES)
+    queries = list(zip(lat[picks], lon[picks]))
+    days = (dates.to_numpy(dtype="datetime64[D]") - np.datetime64("1970-01-01", "D")).astype(np.int32)
+    since = pd.Timestamp("2012-01-01")
+    severe = np.isin(severity, [1, 2])
+
+    # Severe accidents within 500 m in the last 3 years
+    def scan(q_lat, q_lon):
+        mask = severe & (days >= (since - pd.Timestamp("1970-01-01")).days)
+        return np.flatnonzero(mask & (haversine_m(q_lat, q_lon, lat, lon) <= 500))
+
+    def indexed(q_lat, q_lon):
+        return index.radius(q_lat, q_lon, 500, severity=[1, 2], since=since)
+
+    scanned = per_query("Full scan (500 m, severe, since 2012)", scan, queries[:SCAN_QUERIES])
+    found = per_query("Grid index (500 m, severe, since 2012)", indexed, queries)
+    for expected, result in zip(scanned, found):
+        assert np.array_equal(expected, np.sort(result)), "Radius results differ"
+
+    per_query("Grid index radius count (1 km, all)", lambda a, b: index.count(a, b, 1000), queries)
+    per_query("Grid index bbox (~2 km box)", lambda a, b: index.bbox(a - 0.01, b - 0.015, a + 0.01, b + 0.015), queries)
+    nearest = per_query("Grid index 10 nearest", lambda a, b: index.nearest(a, b, 10), queries)
+
+    for (q_lat, q_lon), (rows, distance) in zip(queries[:SCAN_QUERIES], nearest):
+        expected = np.sort(haversine_m(q_lat, q_lon, lat, lon))[:10]
+        assert np.allclose(expected, distance), "Nearest results differ"
+
+    print("Index results match the full scan.")
@@ -0,0 +1,76 @@
+"""
+Tree Compiler Benchmark
+Smart City Traffic Analytics System
+
+predict_proba latency of the trained severity model at batch sizes from
+1 row to 100k: XGBoost's native predictor (XGBClassifier.predict_proba)
+against the NumPy evaluator of models/tree_compiler.py, the faster of the
+two, and the largest probability difference between them. Ends with the
+crossover batch size, to compare with MODEL_COMPILED_MAX_ROWS (the
+registry serves batches up to that size with the NumPy evaluator and
+everything larger with XGBoost).
+
+Usage: python benchmarks/bench_tree_compiler.py [rows]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from models.model_registry import MODEL_COMPILED_MAX_ROWS, get_model
+from models.prediction_table import grid_frame
+from models.tree_compiler import CompiledEnsemble
+
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+BATCH_SIZES = [1, 2, 4, 8, 16, 32, 100, 1000, ROWS]
+
+
+def best_of(func, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+if __name__ == "__main__":
+    model = get_model().model
+
+    start = time.perf_counter()
+    compiled = CompiledEnsemble.from_model(model)
+    print(f"Compiled {len(compiled)} trees ({len(compiled.feature):,} nodes) in {1e3 * (time.perf_counter() - start):.0f} ms")
+
+    # Dashboard-grid inputs (repeated as needed), 1% with a missing speed limit
+    rng = np.random.default_rng(42)
+    grid = grid_frame().to_numpy(dtype=np.float32)
+    X = grid[rng.integers(0, len(grid), ROWS)]
+    X[rng.random(ROWS) < 0.01, 2] = np.nan
+
+    print(f"{'batch':>8} {'XGBoost':>12} {'NumPy':>12} {'speed-up':>9} {'faster':>8} {'max diff':>10}")
+    numpy_wins = []
+    for batch in BATCH_SIZES:
+        rows = X[:batch]
+        repeats = 200 if batch <= 100 else 3
+
+        native_time = best_of(lambda: model.predict_proba(rows), repeats)
+        compiled_time = best_of(lambda: compiled.predict_proba(rows), repeats)
+        difference = np.abs(compiled.predict_proba(rows) - model.predict_proba(rows)).max()
+
+        if compiled_time < native_time:
+            numpy_wins.append(batch)
+
+        print(
+            f"{batch:>8,} {1e3 * native_time:>9.3f} ms {1e3 * compiled_time:>9.3f} ms "
+            f"{native_time / compiled_time:>8.1f}x {'NumPy' if compiled_time < native_time else 'XGBoost':>8} "
+            f"{difference:>10.1e}"
+        )
+
+    if numpy_wins:
+        print(f"NumPy evaluator wins up to {max(numpy_wins):,} rows (MODEL_COMPILED_MAX_ROWS = {MODEL_COMPILED_MAX_ROWS})")
+    else:
+        print(f"NumPy evaluator never wins; set MODEL_COMPILED_MAX_ROWS=0 (currently {MODEL_COMPILED_MAX_ROWS})")
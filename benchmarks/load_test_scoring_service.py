@@ -0,0 +1,130 @@
+"""
+Scoring Service Load Test
+Smart City Traffic Analytics System
+
+Starts models/scoring_service.py locally and sends single-record
+POST /predict requests from concurrent keep-alive clients, once without
+micro-batching (max batch 1) and once with it, reporting client-side
+throughput and p50 / p99 latency plus the service's own metrics.
+
+Usage: python benchmarks/load_test_scoring_service.py [requests] [clients]
+"""
+
+import http.client
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.synthetic_data import ROAD_TYPES, WEATHER_CONDITIONS
+
+
+REQUESTS = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+CLIENTS = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+
+HOST, PORT = "127.0.0.1", 8655
+SERVICE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models", "scoring_service.py")
+
+# (max batch, max wait ms)
+CONFIGS = {
+    "no batching": (1, 0),
+    "micro-batching": (64, 2)
+}
+
+
+def make_records(n, seed=42):
+    rng = np.random.default_rng(seed)
+    weather = [w for w in WEATHER_CONDITIONS if w]
+    return [
+        {
+            "Number_of_Vehicles": int(rng.integers(1, 8)),
+            "Number_of_Casualties": int(rng.integers(1, 5)),
+            "Speed_limit": int(rng.choice([20, 30, 40, 50, 60, 70])),
+            "Weather_Conditions": str(rng.choice(weather)),
+            "Road_Type": str(rng.choice(ROAD_TYPES)),
+            "Is_Weekend": int(rng.integers(0, 2))
+        }
+        for _ in range(n)
+    ]
+
+
+def request(conn, method, path, body=None):
+    conn.request(method, path, body=body, headers={"Content-Type": "application/json"})
+    response = conn.getresponse()
+    payload = response.read()
+    if response.status != 200:
+        raise RuntimeError(f"{response.status}: {payload[:200]!r}")
+    return json.loads(payload)
+
+
+def start_service(max_batch, max_wait_ms):
+    process = subprocess.Popen(
+        [sys.executable, "-W", "ignore", SERVICE, "--host", HOST, "--port", str(PORT),
+         "--max-batch", str(max_batch), "--max-wait-ms", str(max_wait_ms)],
+        stdout=subprocess.DEVNULL
+    )
+
+    # Wait for the model to load
+    for _ in range(300):
+        try:
+            request(http.client.HTTPConnection(HOST, PORT, timeout=1), "GET", "/health")
+            return process
+        except (OSError, RuntimeError):
+            time.sleep(0.1)
+
+    process.kill()
+    raise RuntimeError("Scoring service did not start")
+
+
+def client(bodies, latencies):
+    conn = http.client.HTTPConnection(HOST, PORT)
+    for body in bodies:
+        start = time.perf_counter()
+        request(conn, "POST", "/predict", body)
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+
+
+def run_load(bodies):
+    latencies = []
+    threads = [
+        threading.Thread(target=client, args=(bodies[i::CLIENTS], latencies))
+        for i in range(CLIENTS)
+    ]
+
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    return elapsed, np.array(latencies) * 1e3
+
+
+if __name__ == "__main__":
+    bodies = [json.dumps(record) for record in make_records(REQUESTS)]
+    print(f"{REQUESTS:,} single-record requests from {CLIENTS} concurrent clients")
+
+    for name, (max_batch, max_wait_ms) in CONFIGS.items():
+        service = start_service(max_batch, max_wait_ms)
+        try:
+            # Warm-up, outside the timings
+            run_load(bodies[:CLIENTS * 5])
+            elapsed, latencies = run_load(bodies)
+            metrics = request(http.client.HTTPConnection(HOST, PORT), "GET", "/metrics")
+        finally:
+            service.terminate()
+            service.wait()
+
+        assert len(latencies) == REQUESTS
+        print(f"\n{name} (max batch {max_batch}, max wait {max_wait_ms} ms):")
+        print(f"  Throughput:    {REQUESTS / elapsed:8,.0f} requests/sec")
+        print(f"  Client p50:    {np.percentile(latencies, 50):8.2f} ms   p99: {np.percentile(latencies, 99):8.2f} ms")
+        print(f"  Service p50:   {metrics['latency_ms_p50']:8.2f} ms   p99: {metrics['latency_ms_p99']:8.2f} ms")
+        print(f"  Mean batch:    {metrics['mean_batch_size']:8.1f} records ({metrics['batches']:,} predict_proba calls)")
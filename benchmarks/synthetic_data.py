@@ -0,0 +1,69 @@
+"""
+Synthetic Accident Data
+Smart City Traffic Analytics System
+
+Generates raw-format accident records (same columns and encodings as
+data/raw/UK_Accident.csv) for benchmarks.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+WEATHER_CONDITIONS = [
+    "Fine without high winds",
+    "Fine with high winds",
+    "Raining without high winds",
+    "Raining with high winds",
+    "Snowing without high winds",
+    "Snowing with high winds",
+    "Fog or mist",
+    "Other",
+    None
+]
+
+ROAD_TYPES = [
+    "Single carriageway",
+    "Dual carriageway",
+    "Roundabout",
+    "One way street",
+    "Slip road",
+    "Unknown"
+]
+
+DISTRICTS = ["Westminster", "Camden", "Birmingham", "Leeds", "Manchester", "Glasgow City"]
+
+
+def make_raw_accidents(rows, seed=42):
+    """Raw accident records with a few missing and invalid values"""
+    rng = np.random.default_rng(seed)
+    days = pd.date_range("2005-01-01", "2014-12-31")
+    dates = days[rng.integers(0, len(days), rows)]
+    times = pd.Index([f"{h:02d}:{m:02d}" for h in range(24) for m in range(60)])
+
+    df = pd.DataFrame({
+        "Accident_Index": [f"2005{i:09d}" for i in range(rows)],
+        "Longitude": np.where(rng.random(rows) < 0.01, 0, rng.uniform(-5.5, 1.5, rows)).round(6),
+        "Latitude": rng.uniform(50.5, 55.5, rows).round(6),
+        "Police_Force": rng.integers(1, 99, rows),
+        "Accident_Severity": rng.choice([1, 2, 3], rows, p=[0.02, 0.15, 0.83]),
+        "Number_of_Vehicles": rng.integers(1, 8, rows),
+        "Number_of_Casualties": rng.integers(1, 5, rows),
+        "Date": dates.strftime("%d/%m/%Y"),
+        "Day_of_Week": (dates.dayofweek + 1) % 7 + 1,
+        "Time": times[rng.integers(0, len(times), rows)],
+        "Local_Authority_(District)": rng.choice(DISTRICTS, rows),
+        "Road_Type": rng.choice(ROAD_TYPES, rows),
+        "Speed_limit": rng.choice([20, 30, 40, 50, 60, 70], rows).astype(float),
+        "Light_Conditions": rng.choice(["Daylight", "Darkness - lights lit"], rows),
+        "Weather_Conditions": rng.choice(WEATHER_CONDITIONS, rows),
+        "Road_Surface_Conditions": rng.choice(["Dry", "Wet or damp", None], rows),
+        "Urban_or_Rural_Area": rng.integers(1, 3, rows),
+        "Year": dates.year
+    })
+
+    df.loc[rng.random(rows) < 0.02, "Speed_limit"] = np.nan
+    df.loc[rng.random(rows) < 0.001, "Date"] = None
+    df.loc[rng.random(rows) < 0.001, "Time"] = None
+
+    return df
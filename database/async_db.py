@@ -0,0 +1,174 @@
+"""
+Async Database Module
+Smart City Traffic & Accident Risk Analytics System
+
+asyncio front end to the blocking database layer, so independent queries
+of one dashboard page or report run concurrently.
+
+Handles:
+- Bounded thread-pool executor over the shared connection pool
+- Async counterparts of get_connection / fetch / insert_dataframe
+- gather-style helpers to run independent queries together
+- Per-query timeouts
+- run() for synchronous callers (Streamlit scripts, CLI)
+
+Blocking drivers release the GIL while they wait on the server, so the
+threads overlap their I/O; a page needing several aggregates then takes
+about as long as its slowest query.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+from sqlalchemy import text
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database.db_connection import DB_POOL_SIZE, checkout, count_records, get_connection, insert_dataframe
+from database.query_cache import cached_fetch
+
+
+# Threads beyond the pool size would only wait for a free connection
+DB_ASYNC_WORKERS = int(os.getenv("DB_ASYNC_WORKERS", str(DB_POOL_SIZE)))
+DB_QUERY_TIMEOUT = float(os.getenv("DB_QUERY_TIMEOUT", "30"))   # seconds; 0 = no timeout
+
+_EXECUTOR = None
+_EXECUTOR_LOCK = threading.Lock()
+
+
+
+# Executor
+
+def get_executor():
+    """The shared executor, created on first use"""
+    global _EXECUTOR
+
+    if _EXECUTOR is None:
+        with _EXECUTOR_LOCK:
+            if _EXECUTOR is None:
+                _EXECUTOR = ThreadPoolExecutor(max_workers=DB_ASYNC_WORKERS, thread_name_prefix="db-async")
+
+    return _EXECUTOR
+
+
+def shutdown_executor():
+    global _EXECUTOR
+
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is not None:
+            _EXECUTOR.shutdown(wait=True)
+            _EXECUTOR = None
+
+
+async def run_sync(func, *args, timeout=DB_QUERY_TIMEOUT, **kwargs):
+    """
+    Await func(*args, **kwargs) run on the executor.
+
+    On timeout asyncio.TimeoutError is raised; the worker thread still
+    finishes the call (a DBAPI call cannot be interrupted), then returns
+    its connection to the pool.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(get_executor(), lambda: func(*args, **kwargs))
+    return await asyncio.wait_for(future, timeout or None)
+
+
+
+# Async Counterparts
+
+async def get_connection_async(timeout=DB_QUERY_TIMEOUT):
+    """Pooled DBAPI connection (close() returns it to the pool)"""
+    return await run_sync(get_connection, timeout=timeout)
+
+
+def _fetch(query, params=None):
+    with checkout() as conn:
+        statement = text(query) if isinstance(query, str) else query
+        return [tuple(row) for row in conn.execute(statement, params or {}).fetchall()]
+
+
+async def fetch(query, params=None, timeout=DB_QUERY_TIMEOUT, cached=True):
+    """
+    Rows (list of tuples) of a SQL string or SQLAlchemy Core select;
+    cached=True goes through the query cache
+    """
+    func = cached_fetch if cached else _fetch
+    return await run_sync(func, query, params, timeout=timeout)
+
+
+async def fetch_frame(query, params=None, timeout=DB_QUERY_TIMEOUT):
+    """Query result as a DataFrame (not cached)"""
+    def read():
+        with checkout() as conn:
+            statement = text(query) if isinstance(query, str) else query
+            result = conn.execute(statement, params or {})
+            return pd.DataFrame(result.fetchall(), columns=list(result.keys()))
+
+    return await run_sync(read, timeout=timeout)
+
+
+async def insert_dataframe_async(df, table_name="accidents", strategy=None, mode="append", timeout=None):
+    """insert_dataframe on the executor (no timeout by default: loads can be long)"""
+    return await run_sync(insert_dataframe, df, table_name, strategy, mode, timeout=timeout)
+
+
+async def count_records_async(timeout=DB_QUERY_TIMEOUT):
+    return await run_sync(count_records, timeout=timeout)
+
+
+
+# Concurrency Helpers
+
+async def gather(*awaitables, return_exceptions=False):
+    """asyncio.gather over awaitables (e.g. fetch(...) / run_sync(...) calls)"""
+    return await asyncio.gather(*awaitables, return_exceptions=return_exceptions)
+
+
+async def gather_queries(queries, timeout=DB_QUERY_TIMEOUT, cached=True):
+    """
+    Run independent queries concurrently:
+
+        results = await gather_queries({
+            "total": "SELECT COUNT(*) FROM accidents",
+            "fatal": ("SELECT COUNT(*) FROM accidents WHERE accident_severity = :s", {"s": 1})
+        })
+
+    queries: name -> SQL / Core select, or (query, params)
+    Returns name -> rows; a query that failed or timed out maps to its exception.
+    """
+    names = list(queries)
+    calls = []
+    for name in names:
+        query, params = queries[name] if isinstance(queries[name], tuple) else (queries[name], None)
+        calls.append(fetch(query, params, timeout=timeout, cached=cached))
+
+    results = await asyncio.gather(*calls, return_exceptions=True)
+    return dict(zip(names, results))
+
+
+def run(coro):
+    """Run a coroutine from synchronous code and return its result"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    # Already inside an event loop (e.g. a notebook): run on a helper thread
+    with ThreadPoolExecutor(max_workers=1) as helper:
+        return helper.submit(asyncio.run, coro).result()
+
+
+
+# Test Script
+
+if __name__ == "__main__":
+    results = run(gather_queries({
+        "total": "SELECT COUNT(*) FROM accidents",
+        "days": "SELECT COUNT(DISTINCT date) FROM accidents",
+        "fatal": ("SELECT COUNT(*) FROM accidents WHERE accident_severity = :s", {"s": 1})
+    }))
+    for name, rows in results.items():
+        print(f"{name}: {rows}")
@@ -0,0 +1,301 @@
+"""
+Bulk Load Module
+Smart City Traffic & Accident Risk Analytics System
+
+High-throughput loading of DataFrames into the database.
+
+Handles:
+- Selectable strategy:
+    multirow   multi-row INSERT ... VALUES batches on one connection
+    load_data  LOAD DATA LOCAL INFILE from a temporary CSV (MySQL only)
+    parallel   multirow batches from several writer threads over disjoint chunks
+    to_sql     plain pandas to_sql (the previous path, kept for comparison)
+- Dropping and rebuilding secondary indexes around loads that are large
+  relative to the table (an empty table's first load, not a nightly
+  append to years of history)
+- Rows/sec reporting
+"""
+
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import inspect, text
+
+from database.db_connection import checkout, get_engine
+from database.tables import TABLES, add_missing_columns
+
+
+STRATEGIES = ("multirow", "load_data", "parallel", "to_sql")
+DEFAULT_STRATEGY = os.getenv("DB_LOAD_STRATEGY", "multirow")
+
+# Rows per INSERT statement (also capped by the driver's bind-parameter limit)
+MULTIROW_BATCH_ROWS = 1000
+SQLITE_MAX_PARAMS = 32766
+
+# Rows converted to Python values at a time
+CONVERT_SLAB_ROWS = 50_000
+
+# Rows per chunk written to the LOAD DATA file
+CSV_CHUNK_ROWS = 100_000
+
+PARALLEL_WRITERS = int(os.getenv("DB_LOAD_WRITERS", "4"))
+
+# Secondary indexes are dropped and rebuilt for loads at least this large,
+# and at least this fraction of the rows already in the table: rebuilding
+# re-sorts the whole table, which a small append to a large table loses to
+INDEX_REBUILD_MIN_ROWS = 100_000
+INDEX_REBUILD_MIN_FRACTION = 0.5
+
+
+
+# Helpers
+
+def _dialect():
+    return get_engine().dialect.name
+
+
+def _placeholder():
+    return "?" if get_engine().dialect.paramstyle == "qmark" else "%s"
+
+
+def _quote(name):
+    return get_engine().dialect.identifier_preparer.quote(name)
+
+
+def _rows(df):
+    """Rows as tuples of plain Python values (NaN/NaT become NULL)"""
+    values = df.astype(object).where(df.notna(), None)
+
+    # Datetimes as the driver expects them (SQLite stores text, like to_sql)
+    for col in df.select_dtypes(include="datetime").columns:
+        if _dialect() == "sqlite":
+            dates_only = (df[col].dropna().dt.normalize() == df[col].dropna()).all()
+            converted = df[col].dt.strftime("%Y-%m-%d" if dates_only else "%Y-%m-%d %H:%M:%S")
+        else:
+            converted = pd.Series(df[col].dt.to_pydatetime(), index=df.index, dtype=object)
+        values[col] = converted.where(df[col].notna(), None)
+
+    return list(values.itertuples(index=False, name=None))
+
+
+def _ensure_table(df, table_name):
+    """
+    Create the table if it does not exist yet: from its declared DDL
+    (database/tables.py), otherwise from df's dtypes
+    """
+    if inspect(get_engine()).has_table(table_name):
+        if table_name in TABLES:
+            add_missing_columns(TABLES[table_name])
+        return
+
+    if table_name in TABLES:
+        TABLES[table_name].create(get_engine())
+        return
+
+    with checkout() as conn:
+        df.head(0).to_sql(table_name, conn, index=False)
+        conn.commit()
+
+
+
+# Secondary Indexes
+
+def secondary_indexes(table_name):
+    """Non-unique indexes of a table (unique ones stay: they enforce keys)"""
+    return [
+        index for index in inspect(get_engine()).get_indexes(table_name)
+        if not index.get("unique")
+    ]
+
+
+def drop_indexes(table_name, indexes):
+    with checkout() as conn:
+        for index in indexes:
+            if _dialect() == "mysql":
+                conn.execute(text(f"DROP INDEX {_quote(index['name'])} ON {_quote(table_name)}"))
+            else:
+                conn.execute(text(f"DROP INDEX {_quote(index['name'])}"))
+        conn.commit()
+
+
+def table_rows(table_name):
+    """Rows in a table (MySQL: the statistics estimate, which needs no scan)"""
+    with checkout() as conn:
+        if _dialect() == "mysql":
+            count = conn.execute(
+                text(
+                    "SELECT table_rows FROM information_schema.tables "
+                    "WHERE table_schema = DATABASE() AND table_name = :table"
+                ),
+                {"table": table_name}
+            ).scalar()
+        else:
+            count = conn.execute(text(f"SELECT COUNT(*) FROM {_quote(table_name)}")).scalar()
+    return int(count or 0)
+
+
+def should_rebuild_indexes(table_name, rows):
+    """Whether dropping and rebuilding the indexes beats maintaining them during a load"""
+    if rows < INDEX_REBUILD_MIN_ROWS:
+        return False
+    return rows >= INDEX_REBUILD_MIN_FRACTION * table_rows(table_name)
+
+
+def create_indexes(table_name, indexes):
+    with checkout() as conn:
+        for index in indexes:
+            columns = ", ".join(_quote(col) for col in index["column_names"])
+            conn.execute(text(f"CREATE INDEX {_quote(index['name'])} ON {_quote(table_name)} ({columns})"))
+        conn.commit()
+
+
+
+# Strategies
+
+def _insert_multirow(df, table_name, conn):
+    """Multi-row INSERT batches over one DBAPI connection"""
+    columns = ", ".join(_quote(col) for col in df.columns)
+    row_sql = "(" + ", ".join([_placeholder()] * len(df.columns)) + ")"
+
+    batch_rows = MULTIROW_BATCH_ROWS
+    if _dialect() == "sqlite":
+        batch_rows = min(batch_rows, SQLITE_MAX_PARAMS // max(len(df.columns), 1))
+
+    full_sql = f"INSERT INTO {_quote(table_name)} ({columns}) VALUES " + ", ".join([row_sql] * batch_rows)
+
+    cursor = conn.cursor()
+    for slab_start in range(0, len(df), CONVERT_SLAB_ROWS):
+        rows = _rows(df.iloc[slab_start:slab_start + CONVERT_SLAB_ROWS])
+
+        for start in range(0, len(rows), batch_rows):
+            batch = rows[start:start + batch_rows]
+            sql = full_sql
+            if len(batch) < batch_rows:
+                sql = f"INSERT INTO {_quote(table_name)} ({columns}) VALUES " + ", ".join([row_sql] * len(batch))
+            cursor.execute(sql, [value for row in batch for value in row])
+    cursor.close()
+
+
+def load_multirow(df, table_name):
+    conn = get_engine().raw_connection()
+    try:
+        _insert_multirow(df, table_name, conn)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def load_parallel(df, table_name, writers=PARALLEL_WRITERS):
+    """Disjoint chunks written concurrently, each writer on its own pooled connection"""
+    # SQLite allows a single writer, so extra threads would only wait on the lock
+    if _dialect() == "sqlite":
+        writers = 1
+
+    bounds = np.linspace(0, len(df), writers + 1, dtype=int)
+    chunks = [df.iloc[start:end] for start, end in zip(bounds[:-1], bounds[1:]) if end > start]
+
+    with ThreadPoolExecutor(max_workers=writers) as pool:
+        list(pool.map(lambda chunk: load_multirow(chunk, table_name), chunks))
+
+
+def load_data_infile(df, table_name):
+    """
+    Streams df to a temporary CSV, then LOAD DATA LOCAL INFILE.
+    Needs local_infile enabled on the MySQL server and DB_LOCAL_INFILE=true.
+    """
+    if _dialect() != "mysql":
+        raise ValueError("The load_data strategy needs MySQL; use multirow or parallel instead")
+
+    fd, path = tempfile.mkstemp(suffix=".csv")
+    os.close(fd)
+
+    try:
+        # Written in chunks so the CSV text never exists in memory in full
+        for start in range(0, len(df), CSV_CHUNK_ROWS):
+            df.iloc[start:start + CSV_CHUNK_ROWS].to_csv(
+                path,
+                mode="a",
+                header=False,
+                index=False,
+                na_rep="\\N",
+                date_format="%Y-%m-%d"
+            )
+
+        columns = ", ".join(_quote(col) for col in df.columns)
+        conn = get_engine().raw_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(
+                f"LOAD DATA LOCAL INFILE '{path}' INTO TABLE {_quote(table_name)} "
+                "FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' "
+                f"LINES TERMINATED BY '\\n' ({columns})"
+            )
+            cursor.close()
+            conn.commit()
+        finally:
+            conn.close()
+
+    finally:
+        os.remove(path)
+
+
+def load_to_sql(df, table_name):
+    with checkout() as conn:
+        df.to_sql(name=table_name, con=conn, if_exists="append", index=False, chunksize=5000)
+        conn.commit()
+
+
+LOADERS = {
+    "multirow": load_multirow,
+    "load_data": load_data_infile,
+    "parallel": load_parallel,
+    "to_sql": load_to_sql
+}
+
+
+
+# Entry Point
+
+def bulk_load(df, table_name="accidents", strategy=DEFAULT_STRATEGY, rebuild_indexes=None):
+    """
+    Append df to table_name with the chosen strategy.
+
+    rebuild_indexes: drop secondary indexes before and recreate them after
+                     the load (default: for loads of INDEX_REBUILD_MIN_ROWS+ rows
+                     that are also INDEX_REBUILD_MIN_FRACTION+ of the table)
+    Returns rows/sec.
+    """
+    if strategy not in LOADERS:
+        raise ValueError(f"Unknown load strategy '{strategy}'. Choose from: {', '.join(STRATEGIES)}")
+
+    if df.empty:
+        print("Nothing to load.")
+        return 0.0
+
+    _ensure_table(df, table_name)
+
+    if rebuild_indexes is None:
+        rebuild_indexes = should_rebuild_indexes(table_name, len(df))
+    indexes = secondary_indexes(table_name) if rebuild_indexes else []
+
+    start = time.perf_counter()
+
+    if indexes:
+        print(f"Dropping {len(indexes)} secondary indexes for the load...")
+        drop_indexes(table_name, indexes)
+
+    try:
+        LOADERS[strategy](df, table_name)
+    finally:
+        if indexes:
+            print("Rebuilding secondary indexes...")
+            create_indexes(table_name, indexes)
+
+    elapsed = time.perf_counter() - start
+    rate = len(df) / elapsed if elapsed else float("inf")
+    print(f"Loaded {len(df)} rows into '{table_name}' ({strategy}) in {elapsed:.2f} s: {rate:,.0f} rows/sec")
+    return rate
@@ -4,15 +4,20 @@ Smart City Traffic & Accident Risk Analytics System
 
 Handles:
 - Secure DB connection using .env
-- SQLAlchemy engine creation
-- Data insertion
-- Data fetching
+- MySQL or embedded SQLite backend (DB_BACKEND)
+- Shared, lazily created SQLAlchemy engine with a connection pool
+- Context-managed connection checkout with pool metrics
+- Data insertion (bulk load strategies in bulk_load.py, rollups in rollups.py)
+- Data fetching (repeated reads cached by query_cache.py)
 """
 
 import os
-import mysql.connector
+import threading
+import time
+from contextlib import contextmanager
+
 import pandas as pd
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, text
 from dotenv import load_dotenv
 
 
@@ -26,64 +31,253 @@ DB_USER = os.getenv("DB_USER")
 DB_PASSWORD = os.getenv("DB_PASSWORD")
 DB_NAME = os.getenv("DB_NAME")
 
+# Storage backend: "mysql" (server configured above) or "sqlite" (embedded file,
+# no server needed: analysts, CI, local dashboards)
+DB_BACKEND = os.getenv("DB_BACKEND", "mysql").lower()
+DB_SQLITE_PATH = os.getenv(
+    "DB_SQLITE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "accidents.db")
+)
+
+# Full SQLAlchemy URL; overrides the backend settings when set
+DB_URL = os.getenv("DB_URL")
+
+# Pool settings
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))      # seconds; below MySQL's wait_timeout
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))        # seconds to wait for a free connection
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+# Client-side permission for LOAD DATA LOCAL INFILE (bulk_load's load_data strategy)
+DB_LOCAL_INFILE = os.getenv("DB_LOCAL_INFILE", "false").lower() in ("1", "true", "yes")
+
+
+
+# Shared Engine (created on first use)
+
+_ENGINE = None
+_ENGINE_LOCK = threading.Lock()
+
+
+class PoolMetrics:
+    """Checkout counts and wait times of the shared engine's pool"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.connects = 0
+            self.total_wait = 0.0
+            self.max_wait = 0.0
+
+    def record_checkout(self, wait):
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+    def record_connect(self):
+        with self._lock:
+            self.connects += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "new_connections": self.connects,
+                "total_wait_s": self.total_wait,
+                "avg_wait_ms": 1000 * self.total_wait / self.checkouts if self.checkouts else 0.0,
+                "max_wait_ms": 1000 * self.max_wait
+            }
+
+
+POOL_METRICS = PoolMetrics()
 
 
-# MySQL Connection (Basic Connector)
+def database_url():
+    if DB_URL:
+        return DB_URL
+    if DB_BACKEND == "sqlite":
+        os.makedirs(os.path.dirname(DB_SQLITE_PATH), exist_ok=True)
+        return f"sqlite:///{DB_SQLITE_PATH}"
+    if DB_BACKEND != "mysql":
+        raise ValueError(f"Unknown DB_BACKEND '{DB_BACKEND}'. Use 'mysql' or 'sqlite'.")
+    return f"mysql+mysqlconnector://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}"
+
+
+def _configure_sqlite(dbapi_connection, connection_record):
+    """WAL lets dashboard reads run during loads; NORMAL sync is safe with WAL"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
+
+def get_engine():
+    """
+    Returns the shared SQLAlchemy engine, creating it on first use
+    """
+    global _ENGINE
+
+    if _ENGINE is None:
+        with _ENGINE_LOCK:
+            if _ENGINE is None:
+                url = database_url()
+                connect_args = {}
+                if DB_LOCAL_INFILE and url.startswith("mysql"):
+                    connect_args["allow_local_infile"] = True
+
+                engine = create_engine(
+                    url,
+                    connect_args=connect_args,
+                    pool_size=DB_POOL_SIZE,
+                    max_overflow=DB_MAX_OVERFLOW,
+                    pool_recycle=DB_POOL_RECYCLE,
+                    pool_timeout=DB_POOL_TIMEOUT,
+                    pool_pre_ping=DB_POOL_PRE_PING
+                )
+                event.listen(engine, "connect", lambda *args: POOL_METRICS.record_connect())
+                if engine.dialect.name == "sqlite":
+                    event.listen(engine, "connect", _configure_sqlite)
+                _ENGINE = engine
+
+    return _ENGINE
+
+
+def dispose_engine():
+    """
+    Closes all pooled connections (e.g. after fork or a config change)
+    """
+    global _ENGINE
+
+    with _ENGINE_LOCK:
+        if _ENGINE is not None:
+            _ENGINE.dispose()
+            _ENGINE = None
+
+
+# Kept for existing callers
+def get_sqlalchemy_engine():
+    """
+    Returns SQLAlchemy engine for bulk insert operations
+    """
+    return get_engine()
+
+
+@contextmanager
+def checkout():
+    """
+    Borrow a pooled connection:
+
+        with checkout() as conn:
+            conn.execute(text("SELECT 1"))
+
+    The connection goes back to the pool on exit.
+    """
+    engine = get_engine()
+
+    start = time.perf_counter()
+    conn = engine.connect()
+    POOL_METRICS.record_checkout(time.perf_counter() - start)
+
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def pool_metrics():
+    """
+    Checkout/wait metrics plus the pool's current state
+    """
+    metrics = POOL_METRICS.snapshot()
+    if _ENGINE is not None:
+        metrics["pool_status"] = _ENGINE.pool.status()
+    return metrics
+
+
+
+# Raw DBAPI Connection (pooled)
 
 def get_connection():
     """
-    Returns MySQL connection object
+    Returns a pooled DBAPI connection; close() hands it back to the pool
     """
     try:
-        connection = mysql.connector.connect(
-            host=DB_HOST,
-            user=DB_USER,
-            password=DB_PASSWORD,
-            database=DB_NAME
-        )
-        print("Database connection successful.")
+        start = time.perf_counter()
+        connection = get_engine().raw_connection()
+        POOL_METRICS.record_checkout(time.perf_counter() - start)
         return connection
 
-    except mysql.connector.Error as err:
+    except Exception as err:
         print(f"Error connecting to database: {err}")
         return None
 
 
 
-# SQLAlchemy Engine (For Pandas to_sql)
+# Insert DataFrame into Database
 
-def get_sqlalchemy_engine():
-    """
-    Returns SQLAlchemy engine for bulk insert operations
-    """
-    engine = create_engine(
-        f"mysql+mysqlconnector://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}"
-    )
-    return engine
+# append: plain bulk load; upsert: insert-or-update on the table's key (merge.py)
+LOAD_MODES = ("append", "upsert")
 
 
+def _recount_rollups(df):
+    """Bring the rollup keys of a failed append back in line with the accidents table"""
+    from database.rollups import rebuild_rollups
 
-# Insert DataFrame into Database
+    try:
+        rebuild_rollups(df)
+    except Exception as e:
+        print(f"Rollups could not be recounted ({e}); run python database/rollups.py to rebuild them.")
 
-def insert_dataframe(df, table_name="accidents"):
+
+def insert_dataframe(df, table_name="accidents", strategy=None, mode="append"):
     """
-    Inserts DataFrame into MySQL table
+    Inserts DataFrame into the accidents (or another) table; loads into
+    accidents also update the rollup tables (database/rollups.py). When an
+    append fails, the rollup keys of the batch are recounted from the table.
+    strategy: bulk load strategy for append mode (see database/bulk_load.py; default DB_LOAD_STRATEGY)
+    mode:     "append", or "upsert" to merge on accident_index (safe to re-run)
+    Returns True when the load succeeded, False when it failed.
     """
-    try:
-        engine = get_sqlalchemy_engine()
+    # Imported here: bulk_load, merge, rollups and query_cache build on this module
+    from database.bulk_load import DEFAULT_STRATEGY, bulk_load
+    from database.merge import merge_dataframe
+    from database.query_cache import invalidate_tables
+    from database.rollups import update_rollups
 
-        df.to_sql(
-            name=table_name,
-            con=engine,
-            if_exists="append",
-            index=False,
-            chunksize=5000
-        )
+    if mode not in LOAD_MODES:
+        raise ValueError(f"Unknown load mode '{mode}'. Choose from: {', '.join(LOAD_MODES)}")
 
+    try:
+        if mode == "upsert":
+            # Rollups are updated inside each merge transaction
+            merge_dataframe(df, table_name)
+        else:
+            try:
+                bulk_load(df, table_name, strategy or DEFAULT_STRATEGY)
+                if table_name == "accidents":
+                    update_rollups(df)
+            except Exception:
+                # The loaders commit on their own connections, so part or all of
+                # the batch may be in accidents without its rollup counts
+                if table_name == "accidents":
+                    _recount_rollups(df)
+                raise
         print("Data inserted successfully into database.")
+        return True
 
     except Exception as e:
         print(f"Error inserting data: {e}")
+        return False
+
+    finally:
+        # Also after a failed load: part of it may have been written
+        invalidate_tables(table_name)
 
 
 
@@ -93,44 +287,38 @@ def fetch_sample_records(limit=5):
     """
     Fetch sample records from accidents table
     """
-    conn = get_connection()
-
-    if conn:
-        cursor = conn.cursor()
-        query = f"SELECT * FROM accidents LIMIT {limit}"
-        cursor.execute(query)
-
-        rows = cursor.fetchall()
+    with checkout() as conn:
+        rows = conn.execute(
+            text("SELECT * FROM accidents LIMIT :limit"),
+            {"limit": int(limit)}
+        ).fetchall()
 
-        for row in rows:
-            print(row)
+    for row in rows:
+        print(row)
 
-        cursor.close()
-        conn.close()
+    return rows
 
 
 # Count Total Records
 
 def count_records():
     """
-    Returns total row count in accidents table
+    Returns total row count in accidents table (cached until the next insert)
     """
-    conn = get_connection()
-
-    if conn:
-        cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM accidents;")
-        count = cursor.fetchone()[0]
+    from database.query_cache import cached_fetch
 
-        cursor.close()
-        conn.close()
+    count = cached_fetch("SELECT COUNT(*) FROM accidents")[0][0]
 
-        print(f"Total Records in accidents table: {count}")
-        return count
+    print(f"Total Records in accidents table: {count}")
+    return count
 
 
 
 # Test Script
 
 if __name__ == "__main__":
-    count_records()
\ No newline at end of file
+    count_records()
+    print(pool_metrics())
+
+    from database.query_cache import cache_metrics
+    print(cache_metrics())
@@ -1,61 +1,48 @@
-import pandas as pd
+import argparse
 import os
-from db_connection import insert_dataframe
+import sys
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-DATA_PATH = os.path.join(BASE_DIR, "data", "processed", "ml_ready_accidents.csv")
+sys.path.append(BASE_DIR)
+from database.bulk_load import STRATEGIES
+from database.db_connection import LOAD_MODES, insert_dataframe
+from database.tables import DATASET_COLUMNS
+from utils.data_store import ML_READY_DATASET, load_dataset
 
+# Columns loaded into the accidents table
+SOURCE_COLUMNS = list(DATASET_COLUMNS)
 
-def main():
+
+def prepare_accidents_frame(df):
+    """Select and rename ML-ready columns to match the accidents table"""
+    # Select only relevant columns matching schema, renamed to the SQL schema
+    return df[SOURCE_COLUMNS].rename(columns=DATASET_COLUMNS)
+
+
+def main(strategy=None, mode="upsert"):
     print("Loading ML-ready dataset...")
-    df = pd.read_csv(DATA_PATH)
-    df = df.drop_duplicates(subset=["Accident_Index"])
-    # Select only relevant columns matching schema
-    df = df[[
-        "Accident_Index",
-        "Accident_Severity",
-        "Severity_Label",
-        "Number_of_Vehicles",
-        "Number_of_Casualties",
-        "Date",
-        "Time",
-        "Day_of_Week",
-        "Latitude",
-        "Longitude",
-        "Weather_Conditions",
-        "Road_Type",
-        "Light_Conditions",
-        "Road_Surface_Conditions",
-        "Time_Category",
-        "Is_Weekend",
-        "Weather_Severity_Index",
-        "Road_Risk_Score"
-    ]]
-
-    # Rename to match SQL schema
-    df.columns = [
-        "accident_index",
-        "accident_severity",
-        "severity_label",
-        "number_of_vehicles",
-        "number_of_casualties",
-        "date",
-        "time",
-        "day_of_week",
-        "latitude",
-        "longitude",
-        "weather_conditions",
-        "road_type",
-        "light_conditions",
-        "road_surface_conditions",
-        "time_category",
-        "is_weekend",
-        "weather_severity_index",
-        "road_risk_score"
-    ]
-
-    insert_dataframe(df)
+    df = load_dataset(ML_READY_DATASET, columns=SOURCE_COLUMNS)
+
+    # Upsert merges on accident_index batch by batch: repeated keys and
+    # re-runs update rows instead of duplicating them
+    insert_dataframe(prepare_accidents_frame(df), strategy=strategy, mode=mode)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Load the ML-ready dataset into the accidents table")
+    parser.add_argument(
+        "--strategy",
+        choices=STRATEGIES,
+        default=None,
+        help="Bulk load strategy for append mode (default: DB_LOAD_STRATEGY or multirow)"
+    )
+    parser.add_argument(
+        "--mode",
+        choices=LOAD_MODES,
+        default="upsert",
+        help="upsert: insert-or-update on accident_index, safe to re-run (default); "
+             "append: plain bulk load into an empty table"
+    )
+    args = parser.parse_args()
+
+    main(args.strategy, args.mode)
\ No newline at end of file
@@ -0,0 +1,197 @@
+"""
+Merge Module
+Smart City Traffic & Accident Risk Analytics System
+
+Idempotent loading: rows are inserted, or update the existing row with
+the same key, so re-running a load or retrying a failed one is safe.
+
+Handles:
+- Staging each batch in a temporary table (multi-row INSERTs)
+- One INSERT ... SELECT per batch that merges the stage into the target:
+    MySQL   ON DUPLICATE KEY UPDATE
+    SQLite  ON CONFLICT (key) DO UPDATE
+- Unique key check (adds a unique index to tables created before the key)
+- Rollup deltas for accidents loads: replaced rows are subtracted, new
+  versions added, in the same transaction as the merge
+"""
+
+import os
+import time
+
+import pandas as pd
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import DBAPIError
+
+from database.bulk_load import _dialect, _ensure_table, _insert_multirow, _quote
+from database.db_connection import checkout, get_engine
+from database.query_cache import invalidate_tables
+from database.rollups import ROLLUPS, ensure_rollups, rollup_deltas, upsert_counts
+
+
+# Rows staged and merged per statement (and per transaction)
+MERGE_BATCH_ROWS = int(os.getenv("DB_MERGE_BATCH_ROWS", "50000"))
+
+# Key of each table loaded in upsert mode
+MERGE_KEYS = {
+    "accidents": "accident_index",
+    "severity_predictions": "accident_index"
+}
+
+# accidents columns the rollups are computed from
+ROLLUP_SOURCE_COLUMNS = ["date", "time", "accident_severity", "weather_conditions", "road_type"]
+
+
+
+# Unique Key
+
+def ensure_merge_key(table_name, key):
+    """
+    The merge needs a primary key or unique index on key. Tables created
+    before accident_index became the primary key get a unique index.
+    """
+    inspector = inspect(get_engine())
+
+    if inspector.get_pk_constraint(table_name).get("constrained_columns") == [key]:
+        return
+
+    unique_indexes = [
+        index for index in inspector.get_indexes(table_name)
+        if index.get("unique") and index["column_names"] == [key]
+    ]
+    unique_constraints = [
+        constraint for constraint in inspector.get_unique_constraints(table_name)
+        if constraint["column_names"] == [key]
+    ]
+    if unique_indexes or unique_constraints:
+        return
+
+    print(f"Adding a unique index on {table_name}.{key}...")
+    try:
+        with checkout() as conn:
+            conn.execute(text(
+                f"CREATE UNIQUE INDEX {_quote(f'uq_{table_name}_{key}')} "
+                f"ON {_quote(table_name)} ({_quote(key)})"
+            ))
+            conn.commit()
+    except DBAPIError as err:
+        raise ValueError(
+            f"Cannot add a unique index on {table_name}.{key} (duplicate keys already loaded?). "
+            f"Remove the duplicates or reload into an empty table. ({err.orig})"
+        ) from err
+
+
+
+# Statements
+
+def _create_stage(conn, table_name, stage):
+    temporary = "TEMPORARY" if _dialect() == "mysql" else "TEMP"
+    drop = "DROP TEMPORARY TABLE" if _dialect() == "mysql" else "DROP TABLE"
+
+    conn.execute(text(f"{drop} IF EXISTS {_quote(stage)}"))
+    conn.execute(text(
+        f"CREATE {temporary} TABLE {_quote(stage)} AS SELECT * FROM {_quote(table_name)} WHERE 1 = 0"
+    ))
+
+
+def _merge_sql(table_name, stage, columns, key):
+    column_list = ", ".join(_quote(col) for col in columns)
+    updates = [col for col in columns if col != key]
+    insert = f"INSERT INTO {_quote(table_name)} ({column_list}) SELECT {column_list} FROM {_quote(stage)}"
+
+    if _dialect() == "mysql":
+        assignments = ", ".join(f"{_quote(col)} = VALUES({_quote(col)})" for col in updates)
+        return f"{insert} ON DUPLICATE KEY UPDATE {assignments}"
+
+    if _dialect() == "sqlite":
+        # WHERE 1 keeps SQLite from parsing ON CONFLICT as a join constraint
+        assignments = ", ".join(f"{_quote(col)} = excluded.{_quote(col)}" for col in updates)
+        return f"{insert} WHERE 1 ON CONFLICT ({_quote(key)}) DO UPDATE SET {assignments}"
+
+    raise ValueError(f"Upsert mode is not implemented for '{_dialect()}'")
+
+
+def _replaced_rows(conn, table_name, stage, key, columns):
+    """Current version of the rows the staged batch will replace"""
+    select_list = ", ".join(f"t.{_quote(col)}" for col in columns)
+    result = conn.execute(text(
+        f"SELECT {select_list} FROM {_quote(table_name)} t "
+        f"JOIN {_quote(stage)} s ON t.{_quote(key)} = s.{_quote(key)}"
+    ))
+    return pd.DataFrame(result.fetchall(), columns=columns)
+
+
+
+# Entry Point
+
+def merge_dataframe(df, table_name="accidents", key=None, batch_rows=MERGE_BATCH_ROWS):
+    """
+    Insert-or-update df into table_name on key, one staged batch per
+    transaction. Within a batch the last row of a repeated key wins, as
+    it would across batches. Returns rows/sec.
+    """
+    key = key or MERGE_KEYS.get(table_name)
+    if key is None:
+        raise ValueError(f"No merge key known for '{table_name}'; pass key=")
+
+    if df.empty:
+        print("Nothing to load.")
+        return 0.0
+
+    _ensure_table(df, table_name)
+    ensure_merge_key(table_name, key)
+
+    track_rollups = table_name == "accidents"
+    if track_rollups:
+        ensure_rollups()
+
+    stage = f"{table_name}_stage"
+    merge_sql = _merge_sql(table_name, stage, list(df.columns), key)
+
+    start = time.perf_counter()
+    merged = updated = 0
+
+    with checkout() as conn:
+        _create_stage(conn, table_name, stage)
+
+        for batch_start in range(0, len(df), batch_rows):
+            batch = df.iloc[batch_start:batch_start + batch_rows]
+            batch = batch.drop_duplicates(subset=[key], keep="last")
+
+            conn.execute(text(f"DELETE FROM {_quote(stage)}"))
+            _insert_multirow(batch, stage, conn.connection)
+
+            if track_rollups:
+                replaced = _replaced_rows(conn, table_name, stage, key, ROLLUP_SOURCE_COLUMNS)
+            else:
+                replaced = _replaced_rows(conn, table_name, stage, key, [key])
+
+            conn.execute(text(merge_sql))
+
+            if track_rollups:
+                # Old versions out, new versions in
+                changes = batch[ROLLUP_SOURCE_COLUMNS]
+                if not replaced.empty:
+                    changes = pd.concat([replaced, changes], ignore_index=True)
+                weights = [-1] * len(replaced) + [1] * len(batch)
+                upsert_counts(conn, rollup_deltas(changes, weights))
+
+            conn.commit()
+
+            merged += len(batch)
+            updated += len(replaced)
+            print(f"Merged {merged}/{len(df)} rows...")
+
+        conn.execute(text(f"DROP {'TEMPORARY ' if _dialect() == 'mysql' else ''}TABLE {_quote(stage)}"))
+        conn.commit()
+
+    invalidate_tables(table_name)
+    if track_rollups:
+        invalidate_tables(*(table.name for table in ROLLUPS))
+
+    elapsed = time.perf_counter() - start
+    rate = len(df) / elapsed if elapsed else float("inf")
+    print(
+        f"Merged {merged} rows into '{table_name}' ({merged - updated} new, {updated} updated) "
+        f"in {elapsed:.2f} s: {rate:,.0f} rows/sec"
+    )
+    return rate
@@ -0,0 +1,194 @@
+"""
+Database Queries Module
+Smart City Traffic & Accident Risk Analytics System
+
+Bounded-memory reads of the accidents table.
+
+Handles:
+- Parameterised SELECTs with column projection and filters on date
+  range, severity, weather, road type and region (local authority)
+- Unbuffered (server-side) cursor, fetched in chunks of configurable size
+- Typed DataFrame chunks with the ML-ready dataset's column names and dtypes
+"""
+
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database.bulk_load import _placeholder, _quote
+from database.db_connection import POOL_METRICS, get_engine
+from database.tables import DATASET_COLUMNS
+from utils.schema import ML_READY_SCHEMA, apply_schema
+
+
+DEFAULT_CHUNK_ROWS = int(os.getenv("DB_FETCH_CHUNK_ROWS", "50000"))
+
+
+
+# Helpers
+
+def _as_list(value):
+    if isinstance(value, (list, tuple, set)):
+        return list(value)
+    return [value]
+
+
+def _as_date(value):
+    """ISO date string: compares correctly with DATE (MySQL) and text dates (SQLite)"""
+    return pd.Timestamp(value).strftime("%Y-%m-%d")
+
+
+def _typed(rows, columns):
+    """DataFrame chunk with dataset column names and ML-ready dtypes"""
+    df = pd.DataFrame.from_records(rows, columns=columns)
+
+    if "Date" in df.columns:
+        df["Date"] = pd.to_datetime(df["Date"])
+
+    if df.empty:
+        # No values to check the downcasts against: declared dtypes directly
+        return df.astype({col: ML_READY_SCHEMA[col] for col in columns if col in ML_READY_SCHEMA})
+
+    return apply_schema(df, ML_READY_SCHEMA)
+
+
+def _unbuffered_cursor(connection):
+    """
+    Cursor that streams rows from the server instead of buffering the
+    whole result. SQLAlchemy's mysqlconnector dialect only creates
+    buffered cursors, so the DBAPI cursor is requested directly.
+    SQLite cursors already step through the result lazily.
+    """
+    if get_engine().dialect.name == "mysql":
+        return connection.cursor(buffered=False)
+    return connection.cursor()
+
+
+
+# Query Building
+
+def build_accidents_query(columns=None, date_from=None, date_to=None, severity=None,
+                          weather=None, road_type=None, region=None, limit=None):
+    """
+    SELECT over the accidents table and its bound parameters.
+
+    columns:           dataset column names to return (default: all)
+    date_from/date_to: inclusive date range
+    severity:          Accident_Severity code(s) (1 = fatal, 2 = serious, 3 = slight)
+    weather:           Weather_Conditions value(s)
+    road_type:         Road_Type value(s)
+    region:            Local_Authority_(District) value(s); with a date range,
+                       served by the (local_authority, date) index
+    limit:             maximum rows
+    """
+    columns = list(columns or DATASET_COLUMNS)
+    unknown = [col for col in columns if col not in DATASET_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown accidents columns: {', '.join(unknown)}")
+
+    where = []
+    params = []
+
+    if date_from is not None:
+        where.append(f"{_quote('date')} >= {_placeholder()}")
+        params.append(_as_date(date_from))
+
+    if date_to is not None:
+        where.append(f"{_quote('date')} <= {_placeholder()}")
+        params.append(_as_date(date_to))
+
+    for column, values, cast in [
+        ("accident_severity", severity, int),
+        ("weather_conditions", weather, str),
+        ("road_type", road_type, str),
+        ("local_authority", region, str)
+    ]:
+        if values is None:
+            continue
+        values = [cast(value) for value in _as_list(values)]
+        where.append(f"{_quote(column)} IN ({', '.join([_placeholder()] * len(values))})")
+        params.extend(values)
+
+    sql = f"SELECT {', '.join(_quote(DATASET_COLUMNS[col]) for col in columns)} FROM {_quote('accidents')}"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    if limit is not None:
+        sql += f" LIMIT {_placeholder()}"
+        params.append(int(limit))
+
+    return sql, params, columns
+
+
+
+# Streaming Reads
+
+def stream_accidents(columns=None, date_from=None, date_to=None, severity=None,
+                     weather=None, road_type=None, region=None, limit=None,
+                     chunksize=DEFAULT_CHUNK_ROWS):
+    """
+    Yields the matching accidents rows as typed DataFrame chunks of at
+    most chunksize rows (filters as in build_accidents_query):
+
+        for chunk in stream_accidents(["Date", "Severity_Label"], date_from="2014-01-01"):
+            ...
+
+    Only one chunk is held in memory at a time.
+    """
+    sql, params, columns = build_accidents_query(
+        columns, date_from, date_to, severity, weather, road_type, region, limit
+    )
+
+    start = time.perf_counter()
+    connection = get_engine().raw_connection()
+    POOL_METRICS.record_checkout(time.perf_counter() - start)
+    exhausted = False
+
+    try:
+        cursor = _unbuffered_cursor(connection)
+        cursor.execute(sql, params)
+
+        while True:
+            rows = cursor.fetchmany(chunksize)
+            if not rows:
+                break
+            yield _typed(rows, columns)
+
+        exhausted = True
+        cursor.close()
+
+    finally:
+        if not exhausted and get_engine().dialect.name == "mysql":
+            # Rows left unread on an unbuffered cursor would block the
+            # connection's next query: discard it rather than pool it
+            connection.invalidate()
+        connection.close()
+
+
+def read_accidents(columns=None, chunksize=DEFAULT_CHUNK_ROWS, **filters):
+    """
+    All matching rows as one typed DataFrame (streamed, then concatenated)
+    """
+    chunks = list(stream_accidents(columns, chunksize=chunksize, **filters))
+    if not chunks:
+        return _typed([], list(columns or DATASET_COLUMNS))
+
+    # Chunks carry their own category sets; concat falls back to object, so re-type
+    return apply_schema(pd.concat(chunks, ignore_index=True), ML_READY_SCHEMA)
+
+
+
+# Test Script
+
+if __name__ == "__main__":
+    total = 0
+    peak = 0
+
+    for chunk in stream_accidents(["Date", "Accident_Severity", "Weather_Conditions", "Road_Type"]):
+        total += len(chunk)
+        peak = max(peak, chunk.memory_usage(deep=True).sum())
+
+    print(f"Streamed {total} rows in chunks of up to {DEFAULT_CHUNK_ROWS} (largest chunk {peak / 1e6:.1f} MB)")
+    print(read_accidents(["Date", "Severity_Label", "Weather_Conditions"], severity=1, limit=5))
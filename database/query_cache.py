@@ -0,0 +1,420 @@
+"""
+Query Cache Module
+Smart City Traffic & Accident Risk Analytics System
+
+Result cache for repeated read queries (dashboard KPIs, counts, rollups).
+
+Handles:
+- Keys from whitespace-normalised SQL plus bound parameters
+- LRU eviction bounded by entry count and total bytes, plus a TTL
+- Invalidation by table: every write through insert_dataframe bumps the
+  table's version, and entries read under an older version are misses
+- Backends (DB_CACHE_BACKEND):
+    memory  per process (default)
+    disk    SQLite file shared by processes on one host (Streamlit workers)
+    off     no caching
+- Hit / miss / eviction / expiry / invalidation counters
+"""
+
+import functools
+import hashlib
+import json
+import os
+import pickle
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import text
+
+from database.db_connection import checkout, get_engine
+
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DB_CACHE_BACKEND = os.getenv("DB_CACHE_BACKEND", "memory").lower()
+DB_CACHE_TTL = float(os.getenv("DB_CACHE_TTL", "300"))                   # seconds
+DB_CACHE_MAX_ENTRIES = int(os.getenv("DB_CACHE_MAX_ENTRIES", "1024"))
+DB_CACHE_MAX_BYTES = int(os.getenv("DB_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+DB_CACHE_PATH = os.getenv("DB_CACHE_PATH", os.path.join(BASE_DIR, ".cache", "query_cache.db"))
+
+# Tables a query reads, when not given explicitly
+TABLE_PATTERN = re.compile(r"\b(?:from|join)\s+[`\"\[]?(\w+)", re.IGNORECASE)
+QUOTED_PATTERN = re.compile(r"('(?:[^']|'')*')")
+
+
+
+# Keys
+
+def normalise_sql(sql):
+    """Collapse whitespace outside string literals and drop a trailing ';'"""
+    parts = QUOTED_PATTERN.split(str(sql).strip().rstrip(";"))
+    return "".join(
+        part if i % 2 else re.sub(r"\s+", " ", part)
+        for i, part in enumerate(parts)
+    ).strip()
+
+
+def cache_key(sql, params=None):
+    payload = json.dumps([normalise_sql(sql), params], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def tables_in(sql):
+    """Table names after FROM / JOIN (lower case)"""
+    return sorted({name.lower() for name in TABLE_PATTERN.findall(QUOTED_PATTERN.sub("''", str(sql)))})
+
+
+
+# Counters
+
+class CacheStats:
+    """Per-process cache counters"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+            self.expirations = 0
+            self.invalidations = 0
+
+    def add(self, **counts):
+        with self._lock:
+            for name, count in counts.items():
+                setattr(self, name, getattr(self, name) + count)
+
+    def snapshot(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations
+            }
+
+
+
+# Backends
+# Entries: key -> (value, {table: version}, expires_at, size)
+
+class MemoryBackend:
+    """LRU dict in this process"""
+
+    def __init__(self, max_entries=DB_CACHE_MAX_ENTRIES, max_bytes=DB_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, value, versions, expires, size):
+        """Store an entry; returns the number of entries evicted"""
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (value, versions, expires, size)
+            self._bytes += size
+
+            evicted = 0
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                self._remove(next(iter(self._entries)))
+                evicted += 1
+            return evicted
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[3]
+
+    def delete(self, key):
+        with self._lock:
+            self._remove(key)
+
+    def versions(self, tables):
+        with self._lock:
+            return {table: self._versions.get(table, 0) for table in tables}
+
+    def bump(self, tables):
+        with self._lock:
+            for table in tables:
+                self._versions[table] = self._versions.get(table, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class DiskBackend:
+    """LRU in a SQLite file: processes on one host share entries and table versions"""
+
+    def __init__(self, path=DB_CACHE_PATH, max_entries=DB_CACHE_MAX_ENTRIES, max_bytes=DB_CACHE_MAX_BYTES):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._conn() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, value BLOB, versions TEXT, "
+                "expires REAL, size INTEGER, accessed REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries (accessed)")
+            conn.execute("CREATE TABLE IF NOT EXISTS table_versions (name TEXT PRIMARY KEY, version INTEGER)")
+
+    def _conn(self):
+        """One connection per thread (sqlite3 connections are not shared across threads)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        conn = self._conn()
+        row = conn.execute("SELECT value, versions, expires, size FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        conn.execute("UPDATE entries SET accessed = ? WHERE key = ?", (time.time(), key))
+        return pickle.loads(row[0]), json.loads(row[1]), row[2], row[3]
+
+    def set(self, key, value, versions, expires, size):
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                (key, value, json.dumps(versions), expires, size, time.time())
+            )
+            count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+
+            evicted = 0
+            if count > self.max_entries or total > self.max_bytes:
+                # Least recently used first, until both bounds hold
+                for old_key, old_size in conn.execute(
+                    "SELECT key, size FROM entries ORDER BY accessed"
+                ).fetchall():
+                    if count <= self.max_entries and total <= self.max_bytes:
+                        break
+                    conn.execute("DELETE FROM entries WHERE key = ?", (old_key,))
+                    count -= 1
+                    total -= old_size
+                    evicted += 1
+        return evicted
+
+    def delete(self, key):
+        self._conn().execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def versions(self, tables):
+        if not tables:
+            return {}
+        rows = self._conn().execute(
+            f"SELECT name, version FROM table_versions WHERE name IN ({', '.join('?' * len(tables))})",
+            list(tables)
+        ).fetchall()
+        found = dict(rows)
+        return {table: found.get(table, 0) for table in tables}
+
+    def bump(self, tables):
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            for table in tables:
+                conn.execute(
+                    "INSERT INTO table_versions VALUES (?, 1) "
+                    "ON CONFLICT(name) DO UPDATE SET version = version + 1",
+                    (table,)
+                )
+
+    def clear(self):
+        self._conn().execute("DELETE FROM entries")
+
+    def __len__(self):
+        return self._conn().execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+
+
+# Cache
+
+class QueryCache:
+    """
+    Read-through cache for query results:
+
+        rows = QUERY_CACHE.fetch("SELECT COUNT(*) FROM accidents")
+
+    Cached values are shared between callers: treat them as read-only.
+    """
+
+    def __init__(self, backend=None, ttl=DB_CACHE_TTL):
+        self.backend = backend
+        self.ttl = ttl
+        self.stats = CacheStats()
+
+    @property
+    def enabled(self):
+        return self.backend is not None
+
+    def get(self, key, tables):
+        """Cached value, or None on a miss (absent, expired or stale)"""
+        entry = self.backend.get(key)
+        if entry is None:
+            self.stats.add(misses=1)
+            return None
+
+        value, versions, expires, _ = entry
+
+        if expires < time.time():
+            self.backend.delete(key)
+            self.stats.add(misses=1, expirations=1)
+            return None
+
+        if versions != self.backend.versions(tables):
+            self.backend.delete(key)
+            self.stats.add(misses=1, invalidations=1)
+            return None
+
+        self.stats.add(hits=1)
+        return value
+
+    def set(self, key, value, versions, ttl=None):
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(payload) > self.backend.max_bytes:
+            return
+
+        stored = payload if isinstance(self.backend, DiskBackend) else value
+        expires = time.time() + (self.ttl if ttl is None else ttl)
+        evicted = self.backend.set(key, stored, versions, expires, len(payload))
+        self.stats.add(evictions=evicted)
+
+    def fetch(self, query, params=None, tables=None, ttl=None):
+        """
+        Rows (list of tuples) of a SQL string or SQLAlchemy Core select.
+        tables: tables the query reads (default: parsed from the query)
+        """
+        if hasattr(query, "compile"):
+            compiled = query.compile(dialect=get_engine().dialect)
+            sql, params = str(compiled), dict(compiled.params, **(params or {}))
+            tables = tables or sorted(
+                getattr(source, "name", "").lower() for source in query.get_final_froms()
+            )
+        else:
+            sql = str(query)
+            tables = tables or tables_in(sql)
+
+        def run():
+            with checkout() as conn:
+                result = conn.execute(query if hasattr(query, "compile") else text(sql), params or {})
+                return [tuple(row) for row in result.fetchall()]
+
+        if not self.enabled:
+            return run()
+
+        tables = sorted(tables)
+        key = cache_key(sql, params)
+
+        value = self.get(key, tables)
+        if value is None:
+            # Versions read before the query: a write racing with it leaves the entry stale
+            versions = self.backend.versions(tables)
+            value = run()
+            self.set(key, value, versions, ttl)
+
+        return value
+
+    def memoize(self, tables, ttl=None):
+        """
+        Decorator caching a function's return value per arguments, e.g. a
+        reader that post-processes query rows into a DataFrame:
+
+            @QUERY_CACHE.memoize(tables=["accidents_daily"])
+            def daily_counts(...): ...
+        """
+        tables = sorted(table.lower() for table in tables)
+
+        def decorator(func):
+            name = f"{func.__module__}.{func.__qualname__}"
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+
+                key = cache_key(name, [args, kwargs])
+                value = self.get(key, tables)
+                if value is None:
+                    versions = self.backend.versions(tables)
+                    value = func(*args, **kwargs)
+                    self.set(key, value, versions, ttl)
+                return value
+
+            return wrapper
+
+        return decorator
+
+    def invalidate(self, *tables):
+        """Mark every cached result reading these tables as stale"""
+        if self.enabled:
+            self.backend.bump([table.lower() for table in tables])
+
+    def clear(self):
+        if self.enabled:
+            self.backend.clear()
+
+    def metrics(self):
+        metrics = self.stats.snapshot()
+        metrics["backend"] = type(self.backend).__name__ if self.enabled else "off"
+        metrics["entries"] = len(self.backend) if self.enabled else 0
+        return metrics
+
+
+def make_backend(kind=DB_CACHE_BACKEND):
+    if kind == "memory":
+        return MemoryBackend()
+    if kind == "disk":
+        return DiskBackend()
+    if kind == "off":
+        return None
+    raise ValueError(f"Unknown DB_CACHE_BACKEND '{kind}'. Use 'memory', 'disk' or 'off'.")
+
+
+QUERY_CACHE = QueryCache(make_backend())
+
+
+def cached_fetch(query, params=None, tables=None, ttl=None):
+    return QUERY_CACHE.fetch(query, params, tables, ttl)
+
+
+def cached(tables, ttl=None):
+    return QUERY_CACHE.memoize(tables, ttl)
+
+
+def invalidate_tables(*tables):
+    QUERY_CACHE.invalidate(*tables)
+
+
+def cache_metrics():
+    return QUERY_CACHE.metrics()
@@ -0,0 +1,289 @@
+"""
+Rollups Module
+Smart City Traffic & Accident Risk Analytics System
+
+Pre-aggregated accident counts, kept in step with the accidents table so
+dashboards and reports read O(days) rows instead of O(accidents).
+
+Handles:
+- Rollup tables (declared in tables.py):
+    accidents_daily         date
+    accidents_hourly        date x hour x severity
+    accidents_by_weather    weather x severity
+    accidents_by_road_type  road type x severity
+- Incremental maintenance: counts of each loaded batch are added with a
+  dialect upsert (ON DUPLICATE KEY UPDATE / ON CONFLICT DO UPDATE)
+- Full rebuild from the accidents table (first use, or after manual edits),
+  or a recount of only the keys a batch touches (after a failed load)
+- Readers returning dataset column names (Date, Hour, Severity_Label, ...),
+  cached by query_cache.py until the next load
+"""
+
+import os
+import sys
+
+import pandas as pd
+from sqlalchemy import Integer, cast, func, inspect, select
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database.db_connection import checkout, get_engine
+from database.query_cache import cached, invalidate_tables
+from database.tables import (
+    accidents,
+    accidents_by_road_type,
+    accidents_by_weather,
+    accidents_daily,
+    accidents_hourly,
+    create_tables
+)
+from utils.date_parsing import parse_times
+from utils.feature_registry import SPECS_BY_NAME
+
+
+# Where consumers (dashboard, forecasting, EDA) read aggregates from:
+# "dataset" (processed files) or "db" (these rollups)
+ANALYTICS_SOURCE = os.getenv("ANALYTICS_SOURCE", "dataset").lower()
+
+# Rollup table -> grouping columns (accidents table names; hour comes from time)
+ROLLUPS = {
+    accidents_daily: ["date"],
+    accidents_hourly: ["date", "hour", "accident_severity"],
+    accidents_by_weather: ["weather_conditions", "accident_severity"],
+    accidents_by_road_type: ["road_type", "accident_severity"]
+}
+
+# Reader dimension -> rollup table and its key column
+SEVERITY_MATRICES = {
+    "Weather_Conditions": (accidents_by_weather, "weather_conditions"),
+    "Road_Type": (accidents_by_road_type, "road_type")
+}
+
+
+
+# Deltas from a Loaded Batch
+
+def rollup_deltas(df, weights=None):
+    """
+    Per-rollup counts of the rows in df (accidents table columns),
+    as lists of row dicts ready for upsert_counts().
+
+    weights: per-row count (default 1); -1 removes a row's contribution,
+             e.g. for the previous version of a row replaced by an upsert
+    """
+    frame = pd.DataFrame(index=df.index)
+    frame["weight"] = 1 if weights is None else weights
+    frame["date"] = pd.to_datetime(df["date"])
+    frame["accident_severity"] = df["accident_severity"]
+    frame["weather_conditions"] = df["weather_conditions"].astype(object)
+    frame["road_type"] = df["road_type"].astype(object)
+
+    hour, _ = parse_times(df["time"])
+    frame["hour"] = hour.where(hour >= 0)
+
+    deltas = {}
+    for table, keys in ROLLUPS.items():
+        counts = frame.groupby(keys)["weight"].sum().reset_index(name="accidents")
+        counts = counts[counts["accidents"] != 0]
+        if "date" in keys:
+            counts["date"] = counts["date"].dt.date
+        for col in ("hour", "accident_severity"):
+            if col in keys:
+                counts[col] = counts[col].astype("int64")
+        deltas[table] = counts.astype(object).to_dict("records")
+
+    return deltas
+
+
+def _upsert(table):
+    """INSERT that adds to the existing count when the key is already present"""
+    dialect = get_engine().dialect.name
+
+    if dialect == "mysql":
+        from sqlalchemy.dialects.mysql import insert
+        stmt = insert(table)
+        return stmt.on_duplicate_key_update(accidents=table.c.accidents + stmt.inserted.accidents)
+
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+        stmt = insert(table)
+        return stmt.on_conflict_do_update(
+            index_elements=[col.name for col in table.primary_key.columns],
+            set_={"accidents": table.c.accidents + stmt.excluded.accidents}
+        )
+
+    raise ValueError(f"Rollup upserts are not implemented for '{dialect}'")
+
+
+def upsert_counts(conn, deltas):
+    """Add (or, with negative counts, subtract) deltas to the rollup tables"""
+    for table, rows in deltas.items():
+        if rows:
+            conn.execute(_upsert(table), rows)
+        if any(row["accidents"] < 0 for row in rows):
+            conn.execute(table.delete().where(table.c.accidents <= 0))
+
+
+
+# Maintenance
+
+def ensure_rollups():
+    """
+    Build the rollup tables from the accidents table if any is missing.
+    Returns True when they were built.
+    """
+    if _missing_rollups():
+        rebuild_rollups()
+        return True
+    return False
+
+
+def _missing_rollups():
+    inspector = inspect(get_engine())
+    return [table for table in ROLLUPS if not inspector.has_table(table.name)]
+
+
+def _batch_keys(df):
+    """Distinct values of every rollup's leading key column in a batch (accidents table columns)"""
+    return {
+        "date": sorted(set(pd.to_datetime(df["date"]).dropna().dt.date)),
+        "weather_conditions": sorted(df["weather_conditions"].dropna().astype(str).unique()),
+        "road_type": sorted(df["road_type"].dropna().astype(str).unique())
+    }
+
+
+def rebuild_rollups(df=None):
+    """
+    Recompute the rollups from the accidents table.
+
+    df: only recount the keys this batch touches (its dates, weather
+        conditions and road types), e.g. after a load that failed part-way.
+        Missing rollup tables are always built in full.
+    """
+    keys = None if df is None or _missing_rollups() else _batch_keys(df)
+    create_tables()
+
+    hour = cast(func.substr(accidents.c.time, 1, 2), Integer).label("hour")
+    queries = {
+        accidents_daily: select(accidents.c.date, func.count())
+            .where(accidents.c.date.isnot(None))
+            .group_by(accidents.c.date),
+        accidents_hourly: select(accidents.c.date, hour, accidents.c.accident_severity, func.count())
+            .where(accidents.c.date.isnot(None), accidents.c.time.isnot(None),
+                   accidents.c.accident_severity.isnot(None))
+            .group_by(accidents.c.date, hour, accidents.c.accident_severity),
+        accidents_by_weather: select(accidents.c.weather_conditions, accidents.c.accident_severity, func.count())
+            .where(accidents.c.weather_conditions.isnot(None), accidents.c.accident_severity.isnot(None))
+            .group_by(accidents.c.weather_conditions, accidents.c.accident_severity),
+        accidents_by_road_type: select(accidents.c.road_type, accidents.c.accident_severity, func.count())
+            .where(accidents.c.road_type.isnot(None), accidents.c.accident_severity.isnot(None))
+            .group_by(accidents.c.road_type, accidents.c.accident_severity)
+    }
+
+    with checkout() as conn:
+        for table, query in queries.items():
+            delete = table.delete()
+            if keys is not None:
+                key = ROLLUPS[table][0]
+                delete = delete.where(table.c[key].in_(keys[key]))
+                query = query.where(accidents.c[key].in_(keys[key]))
+            conn.execute(delete)
+            conn.execute(table.insert().from_select(ROLLUPS[table] + ["accidents"], query))
+        conn.commit()
+
+    invalidate_tables(*(table.name for table in ROLLUPS))
+
+    if keys is None:
+        print(f"Rebuilt {len(queries)} rollup tables from the accidents table.")
+    else:
+        print(f"Recounted the rollup keys of {len(df)} rows ({len(keys['date'])} dates) from the accidents table.")
+
+
+def update_rollups(df):
+    """
+    Add a batch just loaded into the accidents table to the rollups.
+    Rollup tables that do not exist yet are built from the whole table
+    (which already contains the batch).
+    """
+    if ensure_rollups():
+        return
+
+    with checkout() as conn:
+        upsert_counts(conn, rollup_deltas(df))
+        conn.commit()
+
+    invalidate_tables(*(table.name for table in ROLLUPS))
+
+    print(f"Rollups updated with {len(df)} rows.")
+
+
+
+# Readers
+
+# Results are served from the query cache until the next load: treat them as read-only
+
+def _read(query):
+    with checkout() as conn:
+        return pd.DataFrame(conn.execute(query).fetchall(), columns=list(query.selected_columns.keys()))
+
+
+def _severity_labels(codes):
+    return codes.map(SPECS_BY_NAME["Severity_Label"].value)
+
+
+@cached(tables=[accidents_daily.name])
+def daily_counts(date_from=None, date_to=None):
+    """Accidents per day: columns Date, Accidents"""
+    query = select(accidents_daily.c.date, accidents_daily.c.accidents).order_by(accidents_daily.c.date)
+    if date_from is not None:
+        query = query.where(accidents_daily.c.date >= pd.Timestamp(date_from).date())
+    if date_to is not None:
+        query = query.where(accidents_daily.c.date <= pd.Timestamp(date_to).date())
+
+    df = _read(query)
+    return pd.DataFrame({"Date": pd.to_datetime(df["date"]), "Accidents": df["accidents"].astype("int64")})
+
+
+@cached(tables=[accidents_hourly.name])
+def hourly_counts():
+    """Accidents per date, hour and severity: Date, Hour, Accident_Severity, Severity_Label, Accidents"""
+    df = _read(select(accidents_hourly))
+    return pd.DataFrame({
+        "Date": pd.to_datetime(df["date"]),
+        "Hour": df["hour"].astype("int8"),
+        "Accident_Severity": df["accident_severity"].astype("int8"),
+        "Severity_Label": _severity_labels(df["accident_severity"]),
+        "Accidents": df["accidents"].astype("int64")
+    })
+
+
+@cached(tables=[accidents_by_weather.name, accidents_by_road_type.name])
+def severity_matrix(dimension):
+    """
+    Accidents by dimension ("Weather_Conditions" or "Road_Type") and
+    Severity_Label, shaped like pd.crosstab(df[dimension], df["Severity_Label"])
+    """
+    if dimension not in SEVERITY_MATRICES:
+        raise ValueError(f"No rollup for '{dimension}'. Choose from: {', '.join(SEVERITY_MATRICES)}")
+
+    table, key = SEVERITY_MATRICES[dimension]
+    df = _read(select(table))
+    df["Severity_Label"] = _severity_labels(df["accident_severity"])
+
+    matrix = df.pivot_table(index=key, columns="Severity_Label", values="accidents", aggfunc="sum", fill_value=0)
+    matrix.index.name = dimension
+    matrix.columns.name = "Severity_Label"
+    return matrix.astype("int64")
+
+
+@cached(tables=[accidents_by_weather.name])
+def severity_counts():
+    """Accidents per Severity_Label"""
+    return severity_matrix("Weather_Conditions").sum().sort_values(ascending=False)
+
+
+
+if __name__ == "__main__":
+    rebuild_rollups()
+    daily = daily_counts()
+    print(f"{len(daily)} days, {daily['Accidents'].sum()} accidents")
+    print(severity_counts())
@@ -0,0 +1,185 @@
+"""
+Database Tables Module
+Smart City Traffic & Accident Risk Analytics System
+
+Portable DDL (SQLAlchemy Core) for the tables this project writes, so
+the same definitions work on MySQL and on the embedded SQLite backend.
+
+Handles:
+- accidents table (the columns loaded by insert_data.py, keyed on
+  accident_index) and its mapping from ML-ready dataset column names
+- Indexes for the dashboard and pipeline filters: date, severity,
+  location and the categorical condition columns
+- Rollup tables: daily counts, date x hour x severity, and
+  weather x severity / road type x severity matrices
+- severity_predictions table written by batch scoring (models/batch_scoring.py)
+- Creating missing tables and adding newly declared columns/indexes to
+  existing ones (python database/tables.py)
+"""
+
+import os
+import sys
+
+from sqlalchemy import Column, Date, Float, Index, Integer, MetaData, SmallInteger, String, Table, inspect, text
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database.db_connection import get_engine
+
+
+metadata = MetaData()
+
+
+# Accidents
+
+accidents = Table(
+    "accidents",
+    metadata,
+    Column("accident_index", String(20), primary_key=True),
+    Column("accident_severity", SmallInteger),
+    Column("severity_label", String(10)),
+    Column("number_of_vehicles", SmallInteger),
+    Column("number_of_casualties", SmallInteger),
+    Column("speed_limit", SmallInteger),
+    Column("date", Date),
+    Column("time", String(5)),
+    Column("day_of_week", SmallInteger),
+    Column("latitude", Float),
+    Column("longitude", Float),
+    Column("local_authority", String(40)),
+    Column("weather_conditions", String(40)),
+    Column("road_type", String(30)),
+    Column("light_conditions", String(40)),
+    Column("road_surface_conditions", String(40)),
+    Column("time_category", String(10)),
+    Column("is_weekend", SmallInteger),
+    Column("weather_severity_index", SmallInteger),
+    Column("road_risk_score", SmallInteger),
+
+    Index("idx_accidents_date", "date"),
+    Index("idx_accidents_severity", "accident_severity"),
+    Index("idx_accidents_location", "latitude", "longitude"),
+    # Region + date range reads scan only that slice of the index
+    Index("idx_accidents_region_date", "local_authority", "date"),
+    Index("idx_accidents_severity_label", "severity_label"),
+    Index("idx_accidents_weather", "weather_conditions"),
+    Index("idx_accidents_road_type", "road_type"),
+    Index("idx_accidents_light", "light_conditions"),
+    Index("idx_accidents_surface", "road_surface_conditions"),
+    Index("idx_accidents_time_category", "time_category")
+)
+
+
+
+# Rollups (maintained by database/rollups.py on every accidents load)
+
+accidents_daily = Table(
+    "accidents_daily",
+    metadata,
+    Column("date", Date, primary_key=True),
+    Column("accidents", Integer, nullable=False)
+)
+
+accidents_hourly = Table(
+    "accidents_hourly",
+    metadata,
+    Column("date", Date, primary_key=True),
+    Column("hour", SmallInteger, primary_key=True, autoincrement=False),
+    Column("accident_severity", SmallInteger, primary_key=True, autoincrement=False),
+    Column("accidents", Integer, nullable=False)
+)
+
+accidents_by_weather = Table(
+    "accidents_by_weather",
+    metadata,
+    Column("weather_conditions", String(40), primary_key=True),
+    Column("accident_severity", SmallInteger, primary_key=True, autoincrement=False),
+    Column("accidents", Integer, nullable=False)
+)
+
+accidents_by_road_type = Table(
+    "accidents_by_road_type",
+    metadata,
+    Column("road_type", String(30), primary_key=True),
+    Column("accident_severity", SmallInteger, primary_key=True, autoincrement=False),
+    Column("accidents", Integer, nullable=False)
+)
+
+
+
+# Batch Scoring Output
+
+severity_predictions = Table(
+    "severity_predictions",
+    metadata,
+    Column("accident_index", String(20), primary_key=True),
+    Column("predicted_severity", String(10)),
+    Column("prob_high", Float),
+    Column("prob_medium", Float),
+    Column("prob_low", Float)
+)
+
+
+TABLES = {table.name: table for table in metadata.sorted_tables}
+
+
+# ML-ready dataset column -> accidents table column
+DATASET_COLUMNS = {
+    "Accident_Index": "accident_index",
+    "Accident_Severity": "accident_severity",
+    "Severity_Label": "severity_label",
+    "Number_of_Vehicles": "number_of_vehicles",
+    "Number_of_Casualties": "number_of_casualties",
+    "Speed_limit": "speed_limit",
+    "Date": "date",
+    "Time": "time",
+    "Day_of_Week": "day_of_week",
+    "Latitude": "latitude",
+    "Longitude": "longitude",
+    "Local_Authority_(District)": "local_authority",
+    "Weather_Conditions": "weather_conditions",
+    "Road_Type": "road_type",
+    "Light_Conditions": "light_conditions",
+    "Road_Surface_Conditions": "road_surface_conditions",
+    "Time_Category": "time_category",
+    "Is_Weekend": "is_weekend",
+    "Weather_Severity_Index": "weather_severity_index",
+    "Road_Risk_Score": "road_risk_score"
+}
+
+
+def add_missing_columns(table, engine=None):
+    """
+    Bring an existing table up to its declaration: add columns declared
+    after it was created (NULL for existing rows) and their indexes
+    """
+    engine = engine or get_engine()
+    inspector = inspect(engine)
+    existing = {column["name"] for column in inspector.get_columns(table.name)}
+    missing = [column for column in table.columns if column.name not in existing]
+
+    if missing:
+        preparer = engine.dialect.identifier_preparer
+        with engine.begin() as conn:
+            for column in missing:
+                print(f"Adding column {table.name}.{column.name}...")
+                conn.execute(text(
+                    f"ALTER TABLE {preparer.quote(table.name)} ADD COLUMN "
+                    f"{preparer.quote(column.name)} {column.type.compile(dialect=engine.dialect)}"
+                ))
+
+    for index in table.indexes:
+        index.create(engine, checkfirst=True)
+
+
+def create_tables(engine=None):
+    """Create any declared table (and its indexes) that does not exist yet"""
+    engine = engine or get_engine()
+    metadata.create_all(engine, checkfirst=True)
+    for table in metadata.sorted_tables:
+        add_missing_columns(table, engine)
+
+
+if __name__ == "__main__":
+    engine = get_engine()
+    create_tables(engine)
+    print(f"Tables ready ({', '.join(TABLES)}) at: {engine.url.render_as_string(hide_password=True)}")
@@ -0,0 +1,344 @@
+"""
+Batch Scoring Module
+Smart City Traffic & Accident Risk Analytics System
+
+Scores whole accident files or the accidents table with the trained
+severity model.
+
+Handles:
+- Streaming the input in chunks: CSV, Parquet (file or dataset
+  directory) or the accidents table (optionally one date range, e.g. a
+  monthly extract)
+- Model features built by the feature registry, as in training; rows
+  with a missing model input (e.g. a speed_limit still NULL on rows
+  loaded before the column existed) are skipped and counted, not scored
+- predict_proba in worker processes, several chunks in flight, results
+  written back in input order
+- Output to CSV / Parquet, or the severity_predictions table (upsert on
+  accident_index, so re-scoring replaces the previous scores)
+- Rows/sec reporting
+
+Usage:
+    python models/batch_scoring.py data/raw/UK_Accident.csv --output reports/scores.parquet
+    python models/batch_scoring.py --table accidents --date-from 2014-01-01 --date-to 2014-01-31
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from models.model_registry import get_model
+from utils.date_parsing import ISO_DATE_FORMAT, parse_dates
+from utils.feature_registry import SPECS_BY_NAME, model_frame, model_inputs
+from utils.parallel import resolve_workers
+
+
+BATCH_SCORING_CHUNK_ROWS = int(os.getenv("BATCH_SCORING_CHUNK_ROWS", "100000"))
+BATCH_SCORING_WORKERS = int(os.getenv("BATCH_SCORING_WORKERS", "0"))     # 0 = one per CPU core
+
+KEY_COLUMN = "Accident_Index"
+PREDICTION_COLUMN = "Predicted_Severity"
+
+# Severity labels in registry order (High, Medium, Low)
+SEVERITY_LABELS = list(SPECS_BY_NAME["Severity_Label"].table.values())
+PROBABILITY_COLUMNS = {label: f"Prob_{label}" for label in SEVERITY_LABELS}
+
+# Scored output column -> severity_predictions column
+TABLE_COLUMNS = {
+    KEY_COLUMN: "accident_index",
+    PREDICTION_COLUMN: "predicted_severity",
+    **{col: col.lower() for col in PROBABILITY_COLUMNS.values()}
+}
+
+
+
+# Input
+
+def scoring_columns():
+    """Every column scoring may use (the key, then the feature sources)"""
+    columns = [KEY_COLUMN]
+    for alternatives in model_inputs():
+        columns.extend(alternatives)
+    return columns
+
+
+def check_columns(available):
+    """Raise if the input cannot provide one of the model features"""
+    missing = [
+        " or ".join(alternatives) for alternatives in model_inputs()
+        if not any(col in available for col in alternatives)
+    ]
+    if missing:
+        raise ValueError(f"Input is missing columns needed for scoring: {', '.join(missing)}")
+
+
+def _input_format(source):
+    name = source if isinstance(source, str) else getattr(source, "name", "")
+    return "csv" if name.lower().endswith(".csv") else "parquet"
+
+
+def iter_file_chunks(source, chunksize=BATCH_SCORING_CHUNK_ROWS):
+    """
+    Chunks of a CSV or Parquet input (a path, a dataset directory or an
+    open file such as a Streamlit upload), limited to the scoring columns
+    """
+    wanted = scoring_columns()
+
+    if _input_format(source) == "csv":
+        header = pd.read_csv(source, nrows=0).columns
+        if hasattr(source, "seek"):
+            source.seek(0)
+        check_columns(header)
+        yield from pd.read_csv(source, chunksize=chunksize, usecols=[col for col in header if col in wanted])
+        return
+
+    if isinstance(source, str):
+        # A file, or a dataset directory (partitioned ones included)
+        dataset = ds.dataset(source, format="parquet", partitioning="hive" if os.path.isdir(source) else None)
+        available = dataset.schema.names
+        check_columns(available)
+        batches = dataset.to_batches(columns=[col for col in available if col in wanted], batch_size=chunksize)
+    else:
+        parquet_file = pq.ParquetFile(source)
+        available = parquet_file.schema_arrow.names
+        check_columns(available)
+        batches = parquet_file.iter_batches(chunksize, columns=[col for col in available if col in wanted])
+
+    for batch in batches:
+        yield batch.to_pandas()
+
+
+def iter_table_chunks(date_from=None, date_to=None, chunksize=BATCH_SCORING_CHUNK_ROWS):
+    """Chunks of the accidents table (optionally one date range)"""
+    from sqlalchemy import inspect
+
+    from database.db_connection import get_engine
+    from database.queries import stream_accidents
+    from database.tables import DATASET_COLUMNS
+
+    columns = [col for col in scoring_columns() if col in DATASET_COLUMNS]
+    check_columns(columns)
+
+    # Tables created before a model input was declared lack its column
+    existing = {column["name"] for column in inspect(get_engine()).get_columns("accidents")}
+    absent = [DATASET_COLUMNS[col] for col in columns if DATASET_COLUMNS[col] not in existing]
+    if absent:
+        raise ValueError(
+            f"The accidents table has no {', '.join(absent)} column. "
+            "Reload it with database/insert_data.py before scoring it."
+        )
+
+    yield from stream_accidents(columns, date_from=date_from, date_to=date_to, chunksize=chunksize)
+
+
+
+# Scoring
+
+def _with_dates(chunk):
+    """Date strings from CSV inputs: raw (dd/mm/yyyy) or ISO exports"""
+    if "Date" not in chunk.columns or "Day_of_Week" in chunk.columns:
+        return chunk
+    if pd.api.types.is_datetime64_any_dtype(chunk["Date"]):
+        return chunk
+
+    dates = parse_dates(chunk["Date"])
+    if dates.isna().all():
+        dates = parse_dates(chunk["Date"], ISO_DATE_FORMAT)
+    return chunk.assign(Date=dates)
+
+
+def _score_complete_rows(chunk, bundle=None):
+    """(scores of the rows with every model input, count of the other rows)"""
+    bundle = bundle or get_model()
+    chunk = _with_dates(chunk)
+
+    features = model_frame(chunk)
+    complete = features.notna().all(axis=1).to_numpy()
+    if not complete.all():
+        chunk, features = chunk[complete], features[complete]
+
+    probabilities = bundle.predict_proba(features)
+
+    scored = pd.DataFrame(index=chunk.index)
+    if KEY_COLUMN in chunk.columns:
+        scored[KEY_COLUMN] = chunk[KEY_COLUMN].astype(str)
+    scored[PREDICTION_COLUMN] = probabilities.idxmax(axis=1)
+    for label, col in PROBABILITY_COLUMNS.items():
+        scored[col] = probabilities[label].astype("float32")
+
+    return scored.reset_index(drop=True), int((~complete).sum())
+
+
+def score_chunk(chunk, bundle=None):
+    """
+    Predicted severity and class probabilities for one chunk; rows with a
+    missing model input are left out
+    """
+    return _score_complete_rows(chunk, bundle)[0]
+
+
+def _init_worker():
+    # Load once per worker; one thread per worker, the pool provides the parallelism
+    get_model().model.get_booster().set_param("nthread", 1)
+
+
+def _pool_context():
+    # Not fork: the parent may already hold an OpenMP-threaded model,
+    # which a forked child can deadlock on
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def score_chunks(chunks, n_workers=BATCH_SCORING_WORKERS):
+    """
+    Yields (scores, skipped rows) for every chunk, in input order.
+    With several workers, up to two chunks per worker are in flight while
+    the next ones are read.
+    """
+    n_workers = resolve_workers(n_workers)
+
+    if n_workers == 1:
+        bundle = get_model()
+        for chunk in chunks:
+            yield _score_complete_rows(chunk, bundle)
+        return
+
+    with ProcessPoolExecutor(n_workers, mp_context=_pool_context(), initializer=_init_worker) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(_score_complete_rows, chunk))
+            if len(pending) >= 2 * n_workers:
+                yield pending.popleft().result()
+
+        while pending:
+            yield pending.popleft().result()
+
+
+
+# Output
+
+class ScoreWriter:
+    """Appends scored chunks to a CSV / Parquet file or the severity_predictions table"""
+
+    def __init__(self, output=None, table=None, mode="upsert"):
+        self.output = output
+        self.table = table
+        self.mode = mode
+        self._parquet = None
+        self._csv_started = False
+
+        if output:
+            os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+
+    def write(self, scored):
+        if self.table and len(scored):
+            from database.db_connection import insert_dataframe
+
+            if KEY_COLUMN not in scored.columns:
+                raise ValueError(f"Writing scores to a table needs the {KEY_COLUMN} column in the input")
+            insert_dataframe(scored.rename(columns=TABLE_COLUMNS), self.table, mode=self.mode)
+
+        if not self.output:
+            return
+
+        if self.output.lower().endswith(".csv"):
+            scored.to_csv(self.output, mode="a" if self._csv_started else "w", header=not self._csv_started, index=False)
+            self._csv_started = True
+
+        else:
+            table = pa.Table.from_pandas(scored, preserve_index=False)
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.output, table.schema)
+            self._parquet.write_table(table)
+
+    def close(self):
+        if self._parquet is not None:
+            self._parquet.close()
+
+
+
+# Entry Point
+
+def run_batch_scoring(chunks, output=None, table=None, mode="upsert", n_workers=BATCH_SCORING_WORKERS):
+    """
+    Score chunks and write them to an output file and/or table.
+    Returns (rows scored, rows/sec, rows skipped for missing inputs);
+    without an output, (rows, rows/sec, skipped, scores).
+    """
+    writer = ScoreWriter(output, table, mode) if output or table else None
+    collected = []
+
+    start = time.perf_counter()
+    rows = 0
+    skipped = 0
+
+    try:
+        for scored, chunk_skipped in score_chunks(chunks, n_workers):
+            if writer:
+                writer.write(scored)
+            else:
+                collected.append(scored)
+
+            rows += len(scored)
+            skipped += chunk_skipped
+            elapsed = time.perf_counter() - start
+            print(f"Scored {rows:,} rows ({rows / elapsed:,.0f} rows/sec)...")
+    finally:
+        if writer:
+            writer.close()
+
+    elapsed = time.perf_counter() - start
+    rate = rows / elapsed if elapsed else float("inf")
+    print(f"Scored {rows:,} rows on {resolve_workers(n_workers)} worker(s) in {elapsed:.2f} s: {rate:,.0f} rows/sec")
+    if skipped:
+        print(f"Skipped {skipped:,} rows with a missing model input (not scored)")
+
+    if writer:
+        return rows, rate, skipped
+    scores = pd.concat(collected, ignore_index=True) if collected else pd.DataFrame()
+    return rows, rate, skipped, scores
+
+
+if __name__ == "__main__":
+    from database.db_connection import LOAD_MODES
+
+    parser = argparse.ArgumentParser(description="Score accident records with the trained severity model")
+    parser.add_argument("input", nargs="?", help="CSV or Parquet file / dataset directory")
+    parser.add_argument("--table", help="Score this database table instead of a file (accidents)")
+    parser.add_argument("--date-from", help="With --table: first date (YYYY-MM-DD)")
+    parser.add_argument("--date-to", help="With --table: last date (YYYY-MM-DD)")
+    parser.add_argument("--output", help="Output .csv or .parquet file")
+    parser.add_argument("--output-table", help="Output database table (e.g. severity_predictions)")
+    parser.add_argument("--mode", choices=LOAD_MODES, default="upsert", help="Load mode for --output-table")
+    parser.add_argument("--workers", type=int, default=BATCH_SCORING_WORKERS, help="Worker processes (0 = one per CPU core)")
+    parser.add_argument("--chunksize", type=int, default=BATCH_SCORING_CHUNK_ROWS, help="Rows per chunk")
+    args = parser.parse_args()
+
+    if bool(args.input) == bool(args.table):
+        parser.error("give either an input file or --table")
+    if args.table and args.table != "accidents":
+        parser.error("only the accidents table can be scored")
+
+    output_table = args.output_table
+    if not args.output and not output_table:
+        # Scoring the table writes back to the database by default
+        output_table = "severity_predictions" if args.table else None
+    if not args.output and not output_table:
+        parser.error("give --output and/or --output-table")
+
+    if args.table:
+        chunks = iter_table_chunks(args.date_from, args.date_to, args.chunksize)
+    else:
+        chunks = iter_file_chunks(args.input, args.chunksize)
+
+    run_batch_scoring(chunks, args.output, output_table, args.mode, args.workers)
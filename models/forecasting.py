@@ -6,37 +6,38 @@ Forecasts daily accident trends using Prophet.
 """
 
 import os
-import pandas as pd
+import sys
 import matplotlib.pyplot as plt
 from prophet import Prophet
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database.rollups import ANALYTICS_SOURCE, daily_counts
+from utils.data_store import ML_READY_DATASET, load_dataset
+
 
 
 # Path Setup
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-DATA_PATH = os.path.join(BASE_DIR, "data", "processed", "ml_ready_accidents.csv")
 OUTPUT_DIR = os.path.join(BASE_DIR, "reports", "forecast")
 
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
 
 
-# Load Dataset
-
-print("Loading dataset...")
-df = pd.read_csv(DATA_PATH)
-
-df["Date"] = pd.to_datetime(df["Date"])
-
-
+# Daily Accident Counts (rollup table, or aggregated from the dataset)
 
-# Aggregate Daily Accident Counts
+if ANALYTICS_SOURCE == "db":
+    print("Loading daily accident counts from the database rollups...")
+    # rename returns a new frame: daily_counts() results are shared through the query cache
+    daily_accidents = daily_counts().rename(columns={"Date": "ds", "Accidents": "y"})  # Prophet format
 
-print("Aggregating daily accident counts...")
+else:
+    print("Loading dataset...")
+    df = load_dataset(ML_READY_DATASET, columns=["Date"])
 
-daily_accidents = df.groupby("Date").size().reset_index()
-daily_accidents.columns = ["ds", "y"]  # Prophet format
+    print("Aggregating daily accident counts...")
+    daily_accidents = df.groupby("Date").size().reset_index(name="y").rename(columns={"Date": "ds"})  # Prophet format
 
 
 print(f"Total days available: {len(daily_accidents)}")
@@ -0,0 +1,289 @@
+"""
+Model Registry Module
+Smart City Traffic & Accident Risk Analytics System
+
+Process-wide cache of the trained artefacts, so scoring entry points
+(dashboard, batch scoring, services) pay the unpickling cost once per
+process instead of once per prediction.
+
+Handles:
+- Loading best_model.pkl, label_encoder.pkl and scaler.pkl together,
+  lazily on first use or eagerly with warm()
+- Hot reload: artefact fingerprints (size, mtime) are checked at most
+  every MODEL_RELOAD_CHECK_SECONDS, and a retrained model is picked up
+- Keeping the current model if a reload fails (e.g. a half-written file
+  while training is still saving)
+- Severity labels from the persisted label encoder
+- Prediction table lookups (models/prediction_table.py) for inputs on
+  its grid, the model for the rest: small batches through the NumPy
+  tree evaluator (models/tree_compiler.py), larger ones through XGBoost
+- Load time and memory metrics
+"""
+
+import os
+import sys
+import threading
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from models.prediction_table import load_prediction_table
+from models.tree_compiler import CompiledEnsemble
+from utils.feature_registry import MODEL_FEATURES
+
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_DIR = os.path.join(BASE_DIR, "models", "trained_models")
+
+# Artefacts saved by models/train_model.py (file names before the variant suffix)
+ARTIFACTS = {
+    "model": "best_model",
+    "label_encoder": "label_encoder",
+    "scaler": "scaler"
+}
+
+# Seconds between fingerprint checks; 0 checks on every call
+MODEL_RELOAD_CHECK_SECONDS = float(os.getenv("MODEL_RELOAD_CHECK_SECONDS", "2"))
+
+# Up to this many rows the NumPy tree evaluator beats a native predict_proba call
+# (break-even at about 16 rows for the 600-tree model, several times slower
+# from 32 rows up; benchmarks/bench_tree_compiler.py). Larger batches use XGBoost.
+MODEL_COMPILED_MAX_ROWS = int(os.getenv("MODEL_COMPILED_MAX_ROWS", "8"))
+
+
+
+# Helpers
+
+def _fingerprint(paths, optional=()):
+    """(size, mtime) of every artefact; changes whenever one is rewritten"""
+    fingerprint = []
+    for path in paths.values():
+        stat = os.stat(path)
+        fingerprint.append((stat.st_size, stat.st_mtime_ns))
+
+    # Optional files count as (0, 0) while missing
+    for path in optional:
+        stat = os.stat(path) if os.path.exists(path) else None
+        fingerprint.append((stat.st_size, stat.st_mtime_ns) if stat else (0, 0))
+
+    return tuple(fingerprint)
+
+
+def _rss_bytes():
+    """Resident memory of this process (Linux), or None"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+
+# Loaded Artefacts
+
+class ModelBundle:
+    """One consistent set of artefacts (model, label encoder, scaler)"""
+
+    def __init__(self, model, label_encoder, scaler, fingerprint, load_seconds, memory_bytes,
+                 model_path=None, table=None, compiled=None):
+        self.model = model
+        self.label_encoder = label_encoder
+        self.scaler = scaler     # Logistic Regression inputs only; best_model takes raw features
+        self.fingerprint = fingerprint
+        self.load_seconds = load_seconds
+        self.memory_bytes = memory_bytes
+        self.loaded_at = time.time()
+        self.model_path = model_path
+        self.table = table
+        self.compiled = compiled
+
+        # Rows answered by the prediction table / by the model
+        self.table_rows = 0
+        self.model_rows = 0
+
+        # Column order of predict_proba, as severity labels
+        self.classes = list(label_encoder.inverse_transform(model.classes_))
+
+    @property
+    def features(self):
+        names = getattr(self.model, "feature_names_in_", None)
+        return [str(name) for name in names] if names is not None else list(MODEL_FEATURES)
+
+    def _model_proba(self, X):
+        if self.compiled is not None and len(X) <= MODEL_COMPILED_MAX_ROWS:
+            return self.compiled.predict_proba(X).astype(np.float32)
+        return self.model.predict_proba(X)
+
+    def predict_proba_array(self, X):
+        """Class probabilities (classes order) for an array of rows in features order"""
+        X = np.asarray(X, dtype=np.float32)
+        if self.table is None:
+            self.model_rows += len(X)
+            return self._model_proba(X)
+
+        probabilities, in_range = self.table.lookup(X)
+        if not in_range.all():
+            # Off-grid or missing inputs: the model scores those rows
+            probabilities[~in_range] = self._model_proba(X[~in_range])
+
+        self.table_rows += int(in_range.sum())
+        self.model_rows += int((~in_range).sum())
+        return probabilities
+
+    def predict_proba(self, X):
+        """Class probabilities as a DataFrame with one column per severity label"""
+        probabilities = self.predict_proba_array(X[self.features].to_numpy(dtype=np.float32))
+        return pd.DataFrame(probabilities, columns=self.classes, index=X.index)
+
+    def predict(self, X):
+        """Severity labels (High / Medium / Low)"""
+        probabilities = self.predict_proba_array(X[self.features].to_numpy(dtype=np.float32))
+        return np.asarray(self.classes, dtype=object)[probabilities.argmax(axis=1)]
+
+
+
+# Registry
+
+class ModelRegistry:
+
+    def __init__(self, model_dir=MODEL_DIR, suffix="", check_seconds=MODEL_RELOAD_CHECK_SECONDS):
+        self.paths = {name: os.path.join(model_dir, f"{stem}{suffix}.pkl") for name, stem in ARTIFACTS.items()}
+        self.table_path = os.path.join(model_dir, f"prediction_table{suffix}.npz")
+        self.check_seconds = check_seconds
+
+        self._lock = threading.Lock()
+        self._bundle = None
+        self._checked_at = 0.0
+
+        self.loads = 0
+        self.failed_reloads = 0
+        self.total_load_seconds = 0.0
+        self.last_error = None
+
+    def _load(self, fingerprint):
+        rss_before = _rss_bytes()
+        start = time.perf_counter()
+
+        artefacts = {name: joblib.load(path) for name, path in self.paths.items()}
+        bundle_features = getattr(artefacts["model"], "feature_names_in_", MODEL_FEATURES)
+        table = load_prediction_table(self.paths["model"], [str(name) for name in bundle_features], self.table_path)
+
+        try:
+            compiled = CompiledEnsemble.from_model(artefacts["model"])
+        except ValueError as err:
+            print(f"Model not compiled, scoring with XGBoost only: {err}")
+            compiled = None
+
+        load_seconds = time.perf_counter() - start
+        rss_after = _rss_bytes()
+        memory = rss_after - rss_before if rss_before is not None and rss_after is not None else None
+
+        return ModelBundle(
+            fingerprint=fingerprint, load_seconds=load_seconds, memory_bytes=memory,
+            model_path=self.paths["model"], table=table, compiled=compiled, **artefacts
+        )
+
+    def get(self):
+        """
+        The current bundle, loading it on first use and reloading it when
+        the artefacts on disk have changed since it was loaded
+        """
+        bundle = self._bundle
+        if bundle is not None and time.monotonic() - self._checked_at < self.check_seconds:
+            return bundle
+
+        with self._lock:
+            self._checked_at = time.monotonic()
+            fingerprint = _fingerprint(self.paths, [self.table_path])
+
+            if self._bundle is not None and self._bundle.fingerprint == fingerprint:
+                return self._bundle
+
+            try:
+                new_bundle = self._load(fingerprint)
+            except Exception as err:
+                if self._bundle is None:
+                    raise
+                # Files mid-write: keep serving the loaded model, retry on the next check
+                self.failed_reloads += 1
+                self.last_error = repr(err)
+                print(f"Model reload failed, keeping the loaded model: {err!r}")
+                return self._bundle
+
+            if self._bundle is not None:
+                print(f"Model artefacts changed, reloaded in {new_bundle.load_seconds:.2f} s")
+
+            self._bundle = new_bundle
+            self.loads += 1
+            self.total_load_seconds += new_bundle.load_seconds
+            return new_bundle
+
+    def warm(self):
+        """Load eagerly (e.g. at service start-up)"""
+        return self.get()
+
+    def metrics(self):
+        bundle = self._bundle
+        return {
+            "loaded": bundle is not None,
+            "loads": self.loads,
+            "failed_reloads": self.failed_reloads,
+            "last_load_seconds": bundle.load_seconds if bundle else None,
+            "total_load_seconds": self.total_load_seconds,
+            "memory_bytes": bundle.memory_bytes if bundle else None,
+            "artefact_bytes": sum(size for size, _ in bundle.fingerprint) if bundle else None,
+            "loaded_at": bundle.loaded_at if bundle else None,
+            "prediction_table": bundle is not None and bundle.table is not None,
+            "compiled_trees": bundle is not None and bundle.compiled is not None,
+            "table_rows": bundle.table_rows if bundle else 0,
+            "model_rows": bundle.model_rows if bundle else 0,
+            "last_error": self.last_error
+        }
+
+
+# One registry per model variant, shared by the whole process
+_REGISTRIES = {}
+_REGISTRIES_LOCK = threading.Lock()
+
+
+def get_registry(suffix=""):
+    with _REGISTRIES_LOCK:
+        if suffix not in _REGISTRIES:
+            _REGISTRIES[suffix] = ModelRegistry(suffix=suffix)
+        return _REGISTRIES[suffix]
+
+
+def get_model(suffix=""):
+    """The current ModelBundle of a variant ("" or "_spatial")"""
+    return get_registry(suffix).get()
+
+
+def model_metrics(suffix=""):
+    return get_registry(suffix).metrics()
+
+
+
+# Test Script
+
+if __name__ == "__main__":
+    from utils.feature_registry import model_input
+
+    bundle = get_model()
+    print(f"Loaded in {bundle.load_seconds:.2f} s; classes: {bundle.classes}")
+
+    record = model_input({
+        "Number_of_Vehicles": 2,
+        "Number_of_Casualties": 1,
+        "Speed_limit": 30,
+        "Weather_Conditions": "Raining without high winds",
+        "Road_Type": "Single carriageway",
+        "Is_Weekend": 0
+    })
+
+    start = time.perf_counter()
+    label = get_model().predict(record)[0]
+    print(f"Warm prediction: {label} in {1e3 * (time.perf_counter() - start):.1f} ms")
+    print(model_metrics())
@@ -0,0 +1,178 @@
+"""
+Prediction Table Module
+Smart City Traffic & Accident Risk Analytics System
+
+Every model input the dashboard form can produce, scored once: class
+probabilities for the full grid of the six model features, stored in one
+array and addressed by the mixed-radix code of the inputs, so a
+prediction is an array lookup instead of a model call.
+
+Handles:
+- Input grid: vehicles 1-10, casualties 0-20, six speed limits, weather
+  and road indexes 1-5, weekend 0/1 (63,000 combinations)
+- Building the table from a trained model (run by train_model.py after
+  it saves best_model.pkl; python models/prediction_table.py rebuilds it)
+- Vectorized encoding with an in-range mask: rows outside the grid (or
+  with missing values) are left to the model
+- Persistence next to the model, tagged with the SHA-256 of the model
+  file it was built from, so a table never serves a different model
+"""
+
+import hashlib
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.feature_registry import MODEL_FEATURES
+
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_DIR = os.path.join(BASE_DIR, "models", "trained_models")
+PREDICTION_TABLE_PATH = os.path.join(MODEL_DIR, "prediction_table.npz")
+
+# Values of each model feature covered by the table (MODEL_FEATURES order)
+GRID = {
+    "Number_of_Vehicles": np.arange(1, 11),
+    "Number_of_Casualties": np.arange(0, 21),
+    "Speed_limit": np.array([20, 30, 40, 50, 60, 70]),
+    "Weather_Severity_Index": np.arange(1, 6),
+    "Road_Risk_Score": np.arange(1, 6),
+    "Is_Weekend": np.array([0, 1])
+}
+
+
+
+# Helpers
+
+def file_digest(path):
+    """SHA-256 of a file (identifies the model a table was built from)"""
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def grid_frame(grid=GRID):
+    """Every combination of the grid values, in code order (last feature fastest)"""
+    columns = np.meshgrid(*grid.values(), indexing="ij")
+    return pd.DataFrame({name: values.ravel() for name, values in zip(grid, columns)})
+
+
+
+# Table
+
+class PredictionTable:
+
+    def __init__(self, probabilities, grid, classes, model_digest):
+        self.probabilities = probabilities
+        self.grid = grid
+        self.classes = list(classes)
+        self.model_digest = model_digest
+
+        self.features = list(grid)
+        self.radix = np.array([len(values) for values in grid.values()])
+
+        # Place value of each feature's digit (mixed radix, last feature fastest)
+        self.place_values = np.concatenate([np.cumprod(self.radix[::-1])[::-1][1:], [1]])
+
+    def __len__(self):
+        return len(self.probabilities)
+
+    def encode(self, X):
+        """
+        Mixed-radix codes of the rows of X (array or DataFrame, columns in
+        self.features order) and a mask of the rows inside the grid
+        """
+        X = np.asarray(X, dtype=np.float64)
+        codes = np.zeros(len(X), dtype=np.int64)
+        in_range = np.ones(len(X), dtype=bool)
+
+        for i, values in enumerate(self.grid.values()):
+            column = X[:, i]
+            digits = np.searchsorted(values, column).clip(0, len(values) - 1)
+            in_range &= values[digits] == column
+            codes += digits * self.place_values[i]
+
+        return codes, in_range
+
+    def lookup(self, X):
+        """(probabilities, in_range): probabilities rows are only valid where in_range"""
+        codes, in_range = self.encode(X)
+        return self.probabilities[np.where(in_range, codes, 0)], in_range
+
+    @classmethod
+    def build(cls, model, classes, model_digest, grid=GRID):
+        frame = grid_frame(grid)
+        probabilities = model.predict_proba(frame[list(grid)]).astype(np.float32)
+        return cls(probabilities, grid, classes, model_digest)
+
+    def save(self, path=PREDICTION_TABLE_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        np.savez_compressed(
+            path,
+            probabilities=self.probabilities,
+            classes=np.array(self.classes),
+            model_digest=np.array(self.model_digest),
+            features=np.array(self.features),
+            **{f"grid_{i}": values for i, values in enumerate(self.grid.values())}
+        )
+
+    @classmethod
+    def load(cls, path=PREDICTION_TABLE_PATH):
+        with np.load(path, allow_pickle=False) as data:
+            features = [str(name) for name in data["features"]]
+            grid = {name: data[f"grid_{i}"] for i, name in enumerate(features)}
+            return cls(data["probabilities"], grid, data["classes"], str(data["model_digest"]))
+
+
+
+# Loading For A Model
+
+def load_prediction_table(model_path, features, path=PREDICTION_TABLE_PATH):
+    """
+    The table built from the model at model_path, or None (no table, a
+    table of another model, or a model with other inputs)
+    """
+    if not os.path.exists(path) or list(features) != list(GRID):
+        return None
+
+    table = PredictionTable.load(path)
+    if table.features != list(features):
+        return None
+
+    if table.model_digest != file_digest(model_path):
+        print("Prediction table was built from another model; scoring with the model until it is rebuilt")
+        return None
+
+    return table
+
+
+def build_prediction_table(model, label_encoder, model_path, path=PREDICTION_TABLE_PATH):
+    """Score the full grid with model and save the table"""
+    features = getattr(model, "feature_names_in_", MODEL_FEATURES)
+    if [str(name) for name in features] != list(GRID):
+        print("Model inputs differ from the prediction grid; no prediction table built")
+        return None
+
+    start = time.perf_counter()
+    classes = label_encoder.inverse_transform(model.classes_)
+    table = PredictionTable.build(model, classes, file_digest(model_path))
+    table.save(path)
+
+    print(
+        f"Prediction table saved ({len(table):,} input combinations, "
+        f"{table.probabilities.nbytes / 1e3:.0f} KB) in {time.perf_counter() - start:.2f} s at: {path}"
+    )
+    return table
+
+
+if __name__ == "__main__":
+    from models.model_registry import get_model
+
+    bundle = get_model()
+    build_prediction_table(bundle.model, bundle.label_encoder, bundle.model_path)
@@ -0,0 +1,299 @@
+"""
+Scoring Service Module
+Smart City Traffic & Accident Risk Analytics System
+
+Standalone HTTP service (standard library only) that scores accident
+records with the trained severity model, for systems that cannot drive
+the Streamlit UI.
+
+Handles:
+- POST /predict: one JSON record or a list of records (raw inputs, as in
+  the dashboard form; engineered features are filled in by the feature
+  registry)
+- Micro-batching: concurrent requests are coalesced into one
+  scoring call per batch (at most SCORING_MAX_BATCH records,
+  waiting at most SCORING_MAX_WAIT_MS for more after the first)
+- Warm model from the model registry (hot-reloaded after retraining)
+- GET /metrics: p50 / p99 latency, throughput, batch sizes, model metrics
+- GET /health
+
+Usage:
+    python models/scoring_service.py --port 8600
+
+    curl -X POST localhost:8600/predict -d '{"Number_of_Vehicles": 2, "Number_of_Casualties": 1,
+        "Speed_limit": 30, "Weather_Conditions": "Fog or mist", "Road_Type": "Roundabout", "Is_Weekend": 0}'
+"""
+
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from models.model_registry import get_model, get_registry, model_metrics
+from utils.feature_registry import record_features
+
+
+SCORING_HOST = os.getenv("SCORING_HOST", "127.0.0.1")
+SCORING_PORT = int(os.getenv("SCORING_PORT", "8600"))
+SCORING_MAX_BATCH = int(os.getenv("SCORING_MAX_BATCH", "64"))         # records per predict_proba call
+SCORING_MAX_WAIT_MS = float(os.getenv("SCORING_MAX_WAIT_MS", "2"))     # wait for more requests after the first
+SCORING_REQUEST_TIMEOUT = float(os.getenv("SCORING_REQUEST_TIMEOUT", "10"))   # seconds
+
+# Latency percentiles are over the most recent requests
+LATENCY_WINDOW = 10_000
+
+MAX_BODY_BYTES = 1_000_000
+
+# Pending connections the listening socket holds (the socketserver default of 5
+# resets clients whenever more than five connect at once)
+LISTEN_BACKLOG = 128
+
+
+
+# Metrics
+
+class ServiceMetrics:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.requests = 0
+        self.records = 0
+        self.errors = 0
+        self.batches = 0
+        self.batched_records = 0
+        self.max_batch_seen = 0
+
+    def record_request(self, seconds, n_records):
+        with self._lock:
+            self.latencies.append(seconds)
+            self.requests += 1
+            self.records += n_records
+
+    def record_error(self):
+        with self._lock:
+            self.errors += 1
+
+    def record_batch(self, n_records):
+        with self._lock:
+            self.batches += 1
+            self.batched_records += n_records
+            self.max_batch_seen = max(self.max_batch_seen, n_records)
+
+    def snapshot(self):
+        with self._lock:
+            latencies = np.array(self.latencies) * 1e3
+            uptime = time.time() - self.started_at
+            return {
+                "uptime_seconds": uptime,
+                "requests": self.requests,
+                "records": self.records,
+                "errors": self.errors,
+                "requests_per_second": self.requests / uptime if uptime else 0.0,
+                "records_per_second": self.records / uptime if uptime else 0.0,
+                "latency_ms_p50": float(np.percentile(latencies, 50)) if len(latencies) else None,
+                "latency_ms_p99": float(np.percentile(latencies, 99)) if len(latencies) else None,
+                "batches": self.batches,
+                "mean_batch_size": self.batched_records / self.batches if self.batches else None,
+                "max_batch_size": self.max_batch_seen
+            }
+
+
+
+# Micro-Batching
+
+class MicroBatcher:
+    """
+    Single scoring thread fed by a queue. A batch starts with the first
+    waiting request and takes every request that arrives within max_wait
+    of it, up to max_batch records; then one predict_proba call scores
+    the whole batch and each request's future gets its own rows.
+    """
+
+    def __init__(self, max_batch=SCORING_MAX_BATCH, max_wait_ms=SCORING_MAX_WAIT_MS, metrics=None):
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max_wait_ms / 1000
+        self.metrics = metrics
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="scoring-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, records):
+        """Future resolving to the scored records (list of dicts)"""
+        future = Future()
+        self._queue.put((records, future))
+        return future
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        size = len(batch[0][0])
+        deadline = time.perf_counter() + self.max_wait
+
+        while size < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(item)
+            size += len(item[0])
+
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            try:
+                self._score(batch)
+            except Exception as err:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(err)
+
+    def _score(self, batch):
+        # Requests whose records cannot be featurized fail alone, not the whole batch
+        bundle = get_model()
+
+        # Rows built straight from record_features: a DataFrame per request
+        # would cost more than the model call for a single record
+        frames = []
+        for records, future in batch:
+            try:
+                rows = [record_features(record) for record in records]
+                frames.append((np.array([[row[col] for col in bundle.features] for row in rows], dtype=np.float32), future))
+            except KeyError as err:
+                future.set_exception(ValueError(f"Record is missing {err}"))
+            except (TypeError, ValueError) as err:
+                future.set_exception(ValueError(f"Invalid record: {err}"))
+
+        if not frames:
+            return
+
+        X = np.concatenate([frame for frame, _ in frames])
+        probabilities = bundle.predict_proba_array(X)
+        if self.metrics:
+            self.metrics.record_batch(len(X))
+
+        start = 0
+        for frame, future in frames:
+            rows = probabilities[start:start + len(frame)]
+            start += len(frame)
+            future.set_result([
+                {
+                    "severity": bundle.classes[int(row.argmax())],
+                    "probabilities": {label: float(p) for label, p in zip(bundle.classes, row)}
+                }
+                for row in rows
+            ])
+
+
+
+# HTTP
+
+class ScoringHandler(BaseHTTPRequestHandler):
+    # Keep-alive, so clients can reuse connections
+    protocol_version = "HTTP/1.1"
+
+    batcher = None
+    metrics = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok", "model": model_metrics()})
+        elif self.path == "/metrics":
+            self._send_json(200, {**self.metrics.snapshot(), "model": model_metrics()})
+        else:
+            self._send_json(404, {"error": f"Unknown path {self.path}"})
+
+    def do_POST(self):
+        if self.path != "/predict":
+            self._send_json(404, {"error": f"Unknown path {self.path}"})
+            return
+
+        start = time.perf_counter()
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            if length > MAX_BODY_BYTES:
+                raise ValueError(f"Body larger than {MAX_BODY_BYTES} bytes")
+
+            payload = json.loads(self.rfile.read(length) or b"null")
+            single = isinstance(payload, dict)
+            records = [payload] if single else payload
+            if not isinstance(records, list) or not records or not all(isinstance(r, dict) for r in records):
+                raise ValueError("Body must be a JSON record or a non-empty list of records")
+
+            predictions = self.batcher.submit(records).result(timeout=SCORING_REQUEST_TIMEOUT)
+
+        except ValueError as err:
+            self.metrics.record_error()
+            self._send_json(400, {"error": str(err)})
+            return
+        except Exception as err:
+            self.metrics.record_error()
+            self._send_json(500, {"error": repr(err)})
+            return
+
+        self.metrics.record_request(time.perf_counter() - start, len(records))
+        self._send_json(200, predictions[0] if single else {"predictions": predictions})
+
+
+def make_server(host=SCORING_HOST, port=SCORING_PORT, max_batch=SCORING_MAX_BATCH, max_wait_ms=SCORING_MAX_WAIT_MS):
+    """Server with a warm model, ready for serve_forever()"""
+    get_registry().warm()
+
+    metrics = ServiceMetrics()
+    handler = type("Handler", (ScoringHandler,), {
+        "batcher": MicroBatcher(max_batch, max_wait_ms, metrics),
+        "metrics": metrics
+    })
+
+    server_class = type("ScoringServer", (ThreadingHTTPServer,), {
+        "request_queue_size": LISTEN_BACKLOG,
+        "daemon_threads": True
+    })
+    return server_class((host, port), handler)
+
+
+
+# Entry Point
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HTTP accident severity scoring service")
+    parser.add_argument("--host", default=SCORING_HOST)
+    parser.add_argument("--port", type=int, default=SCORING_PORT)
+    parser.add_argument("--max-batch", type=int, default=SCORING_MAX_BATCH, help="Records per predict_proba call")
+    parser.add_argument("--max-wait-ms", type=float, default=SCORING_MAX_WAIT_MS, help="Wait for more requests after the first")
+    args = parser.parse_args()
+
+    print("Loading model...")
+    server = make_server(args.host, args.port, args.max_batch, args.max_wait_ms)
+    print(f"Model loaded in {model_metrics()['last_load_seconds']:.2f} s")
+    print(f"Scoring service on http://{args.host}:{args.port} (max batch {args.max_batch}, max wait {args.max_wait_ms} ms)")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -7,19 +7,21 @@ Compatible with XGBoost 2.x and multi-class models.
 """
 
 import os
-import joblib
-import pandas as pd
+import sys
 import shap
 import matplotlib.pyplot as plt
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from models.model_registry import get_model
+from utils.data_store import ML_READY_DATASET, dataset_columns, load_dataset
+from utils.feature_registry import MODEL_FEATURES
+
 
 
 # Path Configuration
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
-MODEL_PATH = os.path.join(BASE_DIR, "models", "trained_models", "best_model.pkl")
-DATA_PATH = os.path.join(BASE_DIR, "data", "processed", "ml_ready_accidents.csv")
 OUTPUT_DIR = os.path.join(BASE_DIR, "reports", "shap")
 
 os.makedirs(OUTPUT_DIR, exist_ok=True)
@@ -29,26 +31,20 @@ os.makedirs(OUTPUT_DIR, exist_ok=True)
 # Load Model
 
 print("Loading trained model...")
-model = joblib.load(MODEL_PATH)
+model = get_model().model
 print("Model loaded successfully.")
 
 
 
 # Load Dataset
 
+features = list(MODEL_FEATURES)
+
+available_columns = dataset_columns(ML_READY_DATASET)
+features = [col for col in features if col in available_columns]
+
 print("Loading dataset...")
-df = pd.read_csv(DATA_PATH)
-
-features = [
-    "Number_of_Vehicles",
-    "Number_of_Casualties",
-    "Speed_limit",
-    "Weather_Severity_Index",
-    "Road_Risk_Score",
-    "Is_Weekend"
-]
-
-features = [col for col in features if col in df.columns]
+df = load_dataset(ML_READY_DATASET, columns=features)
 
 X = df[features]
 
@@ -14,8 +14,9 @@ Handles:
 - Model saving
 """
 
+import argparse
 import os
-import pandas as pd
+import sys
 import numpy as np
 import joblib
 
@@ -27,39 +28,50 @@ from sklearn.ensemble import RandomForestClassifier
 from xgboost import XGBClassifier
 from imblearn.over_sampling import SMOTE
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from models.prediction_table import PREDICTION_TABLE_PATH, build_prediction_table
+from utils.data_store import ML_READY_DATASET, dataset_columns, load_dataset
+from utils.feature_registry import MODEL_FEATURES
+from utils.spatial_features import SPATIAL_FEATURES
+
+
+parser = argparse.ArgumentParser(description="Train the accident severity models")
+parser.add_argument(
+    "--spatial",
+    action="store_true",
+    help="Also train on the neighbourhood accident-density features "
+         "(saved separately, as best_model_spatial.pkl etc.)"
+)
+args = parser.parse_args()
+
 
 
 # Safe Path Handling
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-DATA_PATH = os.path.join(BASE_DIR, "data", "processed", "ml_ready_accidents.csv")
 MODEL_DIR = os.path.join(BASE_DIR, "models", "trained_models")
 
 os.makedirs(MODEL_DIR, exist_ok=True)
 
 
 
-# Load Data
+# Feature Selection
 
-print("Loading dataset...")
-df = pd.read_csv(DATA_PATH)
-print("Dataset loaded.")
+features = list(MODEL_FEATURES)
+if args.spatial:
+    features += SPATIAL_FEATURES
 
+# Keep only existing columns
+available_columns = dataset_columns(ML_READY_DATASET)
+features = [col for col in features if col in available_columns]
 
 
-# Feature Selection
 
-features = [
-    "Number_of_Vehicles",
-    "Number_of_Casualties",
-    "Speed_limit",
-    "Weather_Severity_Index",
-    "Road_Risk_Score",
-    "Is_Weekend"
-]
+# Load Data (only the columns used for training)
 
-# Keep only existing columns
-features = [col for col in features if col in df.columns]
+print("Loading dataset...")
+df = load_dataset(ML_READY_DATASET, columns=features + ["Severity_Label"])
+print("Dataset loaded.")
 
 X = df[features]
 y = df["Severity_Label"]
@@ -171,8 +183,21 @@ evaluate_model("XGBoost", y_test, xgb_preds)
 
 print("\nSaving best model...")
 
-joblib.dump(xgb_model, os.path.join(MODEL_DIR, "best_model.pkl"))
-joblib.dump(scaler, os.path.join(MODEL_DIR, "scaler.pkl"))
-joblib.dump(label_encoder, os.path.join(MODEL_DIR, "label_encoder.pkl"))
+# The dashboard scores the base feature set, so spatial models get their own files
+suffix = "_spatial" if args.spatial else ""
+
+model_path = os.path.join(MODEL_DIR, f"best_model{suffix}.pkl")
+
+joblib.dump(xgb_model, model_path)
+joblib.dump(scaler, os.path.join(MODEL_DIR, f"scaler{suffix}.pkl"))
+joblib.dump(label_encoder, os.path.join(MODEL_DIR, f"label_encoder{suffix}.pkl"))
+
+print("Model saved successfully.")
+
+
+
+# Prediction Table (dashboard-form inputs, scored once)
 
-print("Model saved successfully.")
\ No newline at end of file
+if not args.spatial:
+    print("Building prediction table...")
+    build_prediction_table(xgb_model, label_encoder, model_path, PREDICTION_TABLE_PATH)
\ No newline at end of file
@@ -0,0 +1,274 @@
+"""
+Tree Compiler Module
+Smart City Traffic & Accident Risk Analytics System
+
+Flattens a trained XGBoost booster into contiguous NumPy arrays and
+evaluates it without XGBoost, for small batches where a native
+predict_proba call costs more in DMatrix construction and call overhead
+than in walking 600 depth-6 trees.
+
+Only useful for tiny batches: on one core it wins below about 16 rows
+and is several times slower than XGBoost's native predictor from 32
+rows up (benchmarks/bench_tree_compiler.py prints the crossover). The
+model registry therefore uses it only up to MODEL_COMPILED_MAX_ROWS and
+serves everything larger through XGBoost.
+
+Handles:
+- Export from the booster's JSON model: split feature, threshold,
+  left / right / missing child and leaf value of every node, trees
+  concatenated, root offset and output class per tree
+- Vectorized evaluation: every row walks every tree at once, one level
+  per step (leaves point to themselves, so rows that stop early stay put;
+  one gather for the split value and one for the child per level)
+- XGBoost's split rule (left when value < threshold, in float32) and
+  default directions for missing values
+- Base margin and softmax / logistic output transform
+- Persistence to a single .npz file and a check against the native
+  predictor (the trained model, plus a small binary model)
+
+Usage: python models/tree_compiler.py [--output compiled_trees.npz]   (compile best_model.pkl and check it)
+"""
+
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+# Rows evaluated together (bounds the rows x trees work arrays for large inputs)
+EVAL_BLOCK_ROWS = 1024
+
+OBJECTIVES = ("multi:softprob", "multi:softmax", "binary:logistic")
+
+
+
+# Export
+
+def _parse_base_score(value, n_outputs, objective):
+    """
+    Base margin from base_score ("0.5" in older models, "[5E-1,5E-1,5E-1]"
+    in newer ones). XGBoost adds it to the margin as-is for softmax, and
+    as logit(base_score) for the logistic objective.
+    """
+    values = np.array([float(v) for v in str(value).strip("[]").split(",")], dtype=np.float64)
+    if objective == "binary:logistic":
+        values = np.log(values / (1.0 - values))
+    return np.resize(values, n_outputs)
+
+
+def _node_depths(left, right):
+    depth = np.zeros(len(left), dtype=np.int32)
+    for node in range(len(left)):
+        # Children always have larger ids than their parent in XGBoost trees
+        if left[node] != -1:
+            depth[left[node]] = depth[right[node]] = depth[node] + 1
+    return depth
+
+
+class CompiledEnsemble:
+
+    def __init__(self, feature, threshold, left, right, missing, value, roots,
+                 tree_class, base_margin, max_depth, objective, feature_names):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.missing = missing
+        self.value = value
+        self.roots = roots
+        self.tree_class = tree_class
+        self.base_margin = base_margin
+        self.max_depth = int(max_depth)
+        self.objective = str(objective)
+        self.feature_names = [str(name) for name in feature_names]
+
+        self.n_outputs = len(base_margin)
+
+        # Left / right child side by side: child of node n is children[2n + (x >= threshold)]
+        self.children = np.column_stack([left, right]).ravel()
+
+        # Tree -> output column, so leaf values sum per class in one product
+        self.class_matrix = np.zeros((len(roots), self.n_outputs))
+        self.class_matrix[np.arange(len(roots)), tree_class] = 1.0
+
+    def __len__(self):
+        """Trees"""
+        return len(self.roots)
+
+    @classmethod
+    def from_booster(cls, booster):
+        model = json.loads(booster.save_raw("json"))["learner"]
+
+        objective = model["objective"]["name"]
+        if objective not in OBJECTIVES:
+            raise ValueError(f"Unsupported objective '{objective}'. Supported: {', '.join(OBJECTIVES)}")
+
+        gbtree = model["gradient_booster"]
+        if gbtree["name"] != "gbtree":
+            raise ValueError(f"Unsupported booster '{gbtree['name']}'")
+
+        trees = gbtree["model"]["trees"]
+        n_outputs = max(1, int(model["learner_model_param"]["num_class"]))
+
+        columns = {name: [] for name in ("feature", "threshold", "left", "right", "missing", "value")}
+        roots, max_depth, offset = [], 0, 0
+
+        for tree in trees:
+            if any(split_type != 0 for split_type in tree["split_type"]):
+                raise ValueError("Categorical splits are not supported")
+
+            left = np.array(tree["left_children"], dtype=np.int32)
+            right = np.array(tree["right_children"], dtype=np.int32)
+            conditions = np.array(tree["split_conditions"], dtype=np.float32)
+            default_left = np.array(tree["default_left"], dtype=bool)
+
+            is_leaf = left == -1
+            own = np.arange(len(left), dtype=np.int32)
+
+            # Leaves point to themselves; node ids become global
+            columns["left"].append(np.where(is_leaf, own, left) + offset)
+            columns["right"].append(np.where(is_leaf, own, right) + offset)
+            columns["missing"].append(np.where(is_leaf, own, np.where(default_left, left, right)) + offset)
+            columns["feature"].append(np.where(is_leaf, 0, tree["split_indices"]).astype(np.int32))
+            columns["threshold"].append(np.where(is_leaf, 0, conditions).astype(np.float32))
+            # A leaf's value is stored in split_conditions
+            columns["value"].append(np.where(is_leaf, conditions, 0).astype(np.float32))
+
+            roots.append(offset)
+            max_depth = max(max_depth, int(_node_depths(left, right).max()))
+            offset += len(left)
+
+        arrays = {name: np.concatenate(parts) for name, parts in columns.items()}
+
+        return cls(
+            roots=np.array(roots, dtype=np.int32),
+            tree_class=np.array(gbtree["model"]["tree_info"], dtype=np.int32),
+            base_margin=_parse_base_score(model["learner_model_param"]["base_score"], n_outputs, objective),
+            max_depth=max_depth,
+            objective=objective,
+            feature_names=model.get("feature_names") or [],
+            **arrays
+        )
+
+    @classmethod
+    def from_model(cls, model):
+        """From a fitted XGBClassifier"""
+        return cls.from_booster(model.get_booster())
+
+
+    # Evaluation
+
+    def _leaf_values(self, X):
+        values = np.ascontiguousarray(X).ravel()
+        row_offsets = (np.arange(len(X), dtype=np.int64) * X.shape[1])[:, None]
+        node = np.broadcast_to(self.roots, (len(X), len(self.roots)))
+
+        for _ in range(self.max_depth):
+            x = values[row_offsets + self.feature[node]]
+            # NaN compares False and goes left here; corrected below
+            following = self.children[2 * node + (x >= self.threshold[node])]
+
+            missing = np.isnan(x)
+            if missing.any():
+                following = np.where(missing, self.missing[node], following)
+            node = following
+
+        return self.value[node]
+
+    def margins(self, X):
+        """Raw scores (n_rows, n_outputs), as XGBoost's output_margin=True"""
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[None, :]
+
+        margins = np.empty((len(X), self.n_outputs))
+        for start in range(0, len(X), EVAL_BLOCK_ROWS):
+            block = X[start:start + EVAL_BLOCK_ROWS]
+            margins[start:start + len(block)] = self._leaf_values(block) @ self.class_matrix
+
+        return margins + self.base_margin
+
+    def predict_proba(self, X):
+        """Class probabilities, as XGBClassifier.predict_proba"""
+        margins = self.margins(X)
+
+        if self.objective == "binary:logistic":
+            positive = 1.0 / (1.0 + np.exp(-margins[:, 0]))
+            return np.column_stack([1.0 - positive, positive])
+
+        margins -= margins.max(axis=1, keepdims=True)
+        exp = np.exp(margins)
+        return exp / exp.sum(axis=1, keepdims=True)
+
+
+    # Persistence
+
+    ARRAYS = ("feature", "threshold", "left", "right", "missing", "value", "roots", "tree_class", "base_margin")
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        np.savez_compressed(
+            path,
+            max_depth=self.max_depth,
+            objective=np.array(self.objective),
+            feature_names=np.array(self.feature_names),
+            **{name: getattr(self, name) for name in self.ARRAYS}
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                max_depth=int(data["max_depth"]),
+                objective=str(data["objective"]),
+                feature_names=list(data["feature_names"]),
+                **{name: data[name] for name in cls.ARRAYS}
+            )
+
+
+
+# Check Against XGBoost
+
+def max_difference(compiled, model, X):
+    """Largest absolute probability difference from model.predict_proba on X"""
+    X = np.asarray(X, dtype=np.float32)
+    return float(np.abs(compiled.predict_proba(X) - model.predict_proba(X)).max())
+
+
+if __name__ == "__main__":
+    from xgboost import XGBClassifier
+
+    from models.model_registry import get_model
+    from models.prediction_table import grid_frame
+
+    parser = argparse.ArgumentParser(description="Compile the severity model to NumPy arrays and check it")
+    parser.add_argument("--output", help="Also save the compiled arrays (.npz)")
+    args = parser.parse_args()
+
+    bundle = get_model()
+    compiled = CompiledEnsemble.from_model(bundle.model)
+    print(f"Compiled {len(compiled)} trees ({len(compiled.feature):,} nodes, depth {compiled.max_depth})")
+
+    if args.output:
+        compiled.save(args.output)
+        print(f"Saved to: {args.output}")
+
+    # Every dashboard input, plus rows with missing values
+    X = grid_frame().to_numpy(dtype=np.float32)
+    X_missing = X[::97].copy()
+    X_missing[::3, 2] = np.nan
+    X_missing[1::3, 0] = np.nan
+    print(f"Max probability difference vs XGBoost: {max_difference(compiled, bundle.model, np.vstack([X, X_missing])):.2e}")
+
+    # Binary models take the logistic path (base_score enters as a logit)
+    rng = np.random.default_rng(42)
+    X_binary = rng.random((2000, 4), dtype=np.float32)
+    y_binary = (X_binary[:, 0] + 0.3 * rng.random(2000) > 0.9).astype(int)
+    binary = XGBClassifier(n_estimators=20, max_depth=3).fit(X_binary, y_binary)
+    difference = max_difference(CompiledEnsemble.from_model(binary), binary, X_binary)
+    print(f"Max probability difference vs XGBoost (binary model): {difference:.2e}")
+    assert difference < 1e-5, "Compiled binary model does not match XGBoost"
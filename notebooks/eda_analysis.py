@@ -15,42 +15,68 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database import rollups
+from utils.data_store import ML_READY_DATASET, load_dataset
+from utils.date_parsing import parse_dates, parse_times
 
 
 # Safe Path Handling (Production Ready)
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-DATA_PATH = os.path.join(BASE_DIR, "data", "processed", "ml_ready_accidents.csv")
 REPORTS_DIR = os.path.join(BASE_DIR, "reports")
 
 os.makedirs(REPORTS_DIR, exist_ok=True)
 
 
 
-# Load Dataset
+# Load Data & Aggregates
+# ANALYTICS_SOURCE=db reads the aggregates from the database rollup tables
+# (and only the numeric columns for the correlation heatmap)
+
+if rollups.ANALYTICS_SOURCE == "db":
+    # Imported here: only needed when reading from the database
+    from database.queries import read_accidents
 
-print("Loading dataset...")
-df = pd.read_csv(DATA_PATH)
+    print("Loading aggregates from the database rollups...")
+    daily = rollups.daily_counts()
+    yearly_trend = daily.groupby(daily["Date"].dt.year)["Accidents"].sum()
+    hourly = rollups.hourly_counts().groupby("Hour")["Accidents"].sum()
+    severity_counts = rollups.severity_counts()
+    weather_severity = rollups.severity_matrix("Weather_Conditions")
+    road_severity = rollups.severity_matrix("Road_Type")
 
-print("Dataset loaded successfully.")
+    df = read_accidents([
+        "Accident_Severity", "Number_of_Vehicles", "Number_of_Casualties", "Day_of_Week",
+        "Latitude", "Longitude", "Is_Weekend", "Weather_Severity_Index", "Road_Risk_Score"
+    ])
 
+else:
+    print("Loading dataset...")
+    df = load_dataset(ML_READY_DATASET)
 
+    print("Dataset loaded successfully.")
 
-# Convert Date & Time Properly
+    # Convert Date & Time Properly
+    df["Date"] = parse_dates(df["Date"])
+    df["Year"] = df["Date"].dt.year
 
-df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
-df["Year"] = df["Date"].dt.year
+    # If Hour column does not exist, recreate it safely
+    if "Hour" not in df.columns:
+        df["Hour"], df["Minute"] = parse_times(df["Time"])
 
-# If Hour column does not exist, recreate it safely
-if "Hour" not in df.columns:
-    df["Time"] = pd.to_datetime(df["Time"], errors="coerce")
-    df["Hour"] = df["Time"].dt.hour
+    yearly_trend = df.groupby("Year").size()
+    hourly = df.groupby("Hour").size()
+    severity_counts = df["Severity_Label"].value_counts()
+    weather_severity = pd.crosstab(df["Weather_Conditions"], df["Severity_Label"])
+    road_severity = pd.crosstab(df["Road_Type"], df["Severity_Label"])
 
 
 # 1️ Accident Trend by Year
 
 plt.figure(figsize=(10, 6))
-yearly_trend = df.groupby("Year").size()
 
 yearly_trend.plot(marker="o")
 plt.title("Accident Trend by Year")
@@ -66,7 +92,6 @@ plt.close()
 # 2️ Accident by Hour
 
 plt.figure(figsize=(10, 6))
-hourly = df.groupby("Hour").size()
 
 hourly.plot()
 plt.title("Accidents by Hour of Day")
@@ -82,7 +107,6 @@ plt.close()
 # 3️⃣ Severity Distribution
 
 plt.figure(figsize=(8, 6))
-severity_counts = df["Severity_Label"].value_counts()
 
 sns.barplot(x=severity_counts.index, y=severity_counts.values)
 plt.title("Accident Severity Distribution")
@@ -96,10 +120,6 @@ plt.close()
 # 4️ Weather Impact on Severity
 
 plt.figure(figsize=(12, 6))
-weather_severity = pd.crosstab(
-    df["Weather_Conditions"],
-    df["Severity_Label"]
-)
 
 weather_severity.plot(kind="bar", stacked=True)
 plt.title("Weather Impact on Severity")
@@ -112,10 +132,6 @@ plt.close()
 # 5️ Road Type Impact
 
 plt.figure(figsize=(12, 6))
-road_severity = pd.crosstab(
-    df["Road_Type"],
-    df["Severity_Label"]
-)
 
 road_severity.plot(kind="bar", stacked=True)
 plt.title("Road Type Impact on Severity")
@@ -8,63 +8,252 @@ Handles:
 - Handling missing values
 - Removing invalid records
 - Saving cleaned dataset
+- Streaming (chunked) cleaning for datasets larger than memory
+- Multi-core partitioned cleaning
 """
 
+import argparse
 import pandas as pd
 import numpy as np
 import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.data_store import CLEANED_DATASET, DatasetWriter, save_dataset
+from utils.date_parsing import RAW_DATE_FORMAT, parse_dates, parse_times
+from utils.parallel import PartitionPool, resolve_workers
+from utils.schema import RAW_SCHEMA
 
 
 RAW_DATA_PATH = "data/raw/UK_Accident.csv"
-PROCESSED_DATA_PATH = "data/processed/cleaned_accidents.csv"
+
+# Rows per chunk in streaming mode
+CHUNK_SIZE = 200_000
+
+# Distinct values kept per column when accumulating value counts for the
+# global medians. Columns with more (coordinates, eastings/northings) are
+# counted on a rounded grid instead, so their median is approximate.
+MAX_DISTINCT_VALUES = 10_000
 
 
 def load_raw_data():
     """Load raw CSV dataset"""
     print("Loading raw dataset...")
-    df = pd.read_csv(RAW_DATA_PATH)
+    df = pd.read_csv(RAW_DATA_PATH, dtype=RAW_SCHEMA)
     return df
 
 
-def clean_basic_issues(df):
-    """Basic cleaning steps"""
+def iter_raw_chunks(chunksize=CHUNK_SIZE, dtype=None, path=RAW_DATA_PATH):
+    """Read raw CSV dataset in row chunks"""
+    return pd.read_csv(path, chunksize=chunksize, dtype={**(dtype or {}), **RAW_SCHEMA})
+
+
+def normalize_column_names(columns):
+    """Strip whitespace and replace spaces with underscores"""
+    return columns.str.strip().str.replace(" ", "_")
+
+
+def clean_basic_issues(df, date_format=RAW_DATE_FORMAT):
+    """
+    Basic cleaning steps
+
+    date_format: explicit format of the raw Date column
+    """
 
     print("Cleaning column names...")
-    df.columns = df.columns.str.strip().str.replace(" ", "_")
+    df.columns = normalize_column_names(df.columns)
 
     # Fix Date column
     print("Parsing Date column...")
-    df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
-
-    # Remove rows where Date is missing
-    df = df.dropna(subset=["Date"])
+    df["Date"] = parse_dates(df["Date"], date_format)
 
-    # Fix Time column
+    # Fix Time column (integer Hour / Minute, Time kept as HH:MM)
     print("Parsing Time column...")
-    df["Time"] = pd.to_datetime(df["Time"], format="%H:%M", errors="coerce").dt.time
+    df["Hour"], df["Minute"] = parse_times(df["Time"])
 
-    # Drop rows with invalid time
-    df = df.dropna(subset=["Time"])
+    # Remove rows where Date or Time is invalid
+    df = df[df["Date"].notna() & (df["Hour"] >= 0)]
 
     return df
 
 
-def handle_missing_values(df):
-    """Handle missing values intelligently"""
+def handle_missing_values(df, fill_values=None):
+    """
+    Handle missing values intelligently
+
+    fill_values: precomputed global statistics from compute_fill_values().
+    When omitted, medians are computed from df itself.
+    """
 
     print("Handling missing values...")
 
     # Numerical columns
-    numeric_cols = df.select_dtypes(include=np.number).columns
-    df[numeric_cols] = df[numeric_cols].fillna(df[numeric_cols].median())
+    if fill_values is None:
+        numeric_cols = df.select_dtypes(include=np.number).columns
+        medians = df[numeric_cols].median()
+    else:
+        medians = fill_values["medians"]
+        numeric_cols = medians.index
+    df[numeric_cols] = df[numeric_cols].fillna(medians)
 
     # Categorical columns
-    categorical_cols = df.select_dtypes(include="object").columns
+    if fill_values is None:
+        categorical_cols = df.select_dtypes(include="object").columns
+    else:
+        categorical_cols = fill_values["categorical_cols"]
     df[categorical_cols] = df[categorical_cols].fillna("Unknown")
 
     return df
 
 
+def median_from_counts(counts):
+    """
+    Median from a value -> count Series.
+    Matches Series.median() on the expanded values (exact unless the
+    counts were compacted by compact_value_counts).
+    """
+    counts = counts[counts > 0].sort_index()
+    total = int(counts.sum())
+
+    if total == 0:
+        return np.nan
+
+    cumulative = counts.cumsum().to_numpy()
+    values = counts.index.to_numpy(dtype=float)
+
+    lower = values[np.searchsorted(cumulative, (total - 1) // 2, side="right")]
+    upper = values[np.searchsorted(cumulative, total // 2, side="right")]
+
+    return (lower + upper) / 2
+
+
+def compact_value_counts(counts, max_distinct=MAX_DISTINCT_VALUES):
+    """
+    Bound a value -> count Series to max_distinct entries.
+
+    Values are rounded to the finest power-of-ten grid that fits, so the
+    median taken from the result is within one grid step of the exact
+    one (e.g. 0.001 degrees for UK-wide latitudes). Low-cardinality
+    columns are returned unchanged and stay exact.
+    """
+    if len(counts) <= max_distinct:
+        return counts
+
+    values = counts.index.to_numpy(dtype=float)
+    spread = np.ptp(values) / max_distinct
+    step = 10.0 ** np.floor(np.log10(spread)) if spread > 0 else 1.0
+
+    while True:
+        rounded = np.round(values / step) * step
+        if len(np.unique(rounded)) <= max_distinct:
+            break
+        step *= 10
+
+    return counts.groupby(rounded).sum()
+
+
+def combine_value_counts(value_counts, partial_counts):
+    """Add per-column partial value counts into value_counts (in place)"""
+    for col, counts in partial_counts.items():
+        if col in value_counts:
+            counts = value_counts[col].add(counts, fill_value=0)
+        value_counts[col] = compact_value_counts(counts)
+    return value_counts
+
+
+def merge_value_counts(value_counts, df, columns):
+    """Add the value counts of df[columns] into value_counts (in place)"""
+    return combine_value_counts(
+        value_counts,
+        {col: df[col].value_counts() for col in columns}
+    )
+
+
+def medians_from_value_counts(value_counts, numeric_cols):
+    """Global medians from merged per-chunk / per-partition value counts"""
+    return pd.Series(
+        {col: median_from_counts(value_counts[col]) for col in numeric_cols},
+        dtype=float
+    )
+
+
+def missing_columns(df, columns):
+    """Columns of df[columns] that contain at least one NaN"""
+    return [col for col in columns if df[col].isna().any()]
+
+
+def compute_fill_values(chunksize=CHUNK_SIZE, path=RAW_DATA_PATH, on_chunk=None):
+    """
+    First streaming pass over the raw dataset.
+
+    Computes the global medians used by handle_missing_values by merging
+    per-chunk value counts. Counts are compacted to MAX_DISTINCT_VALUES
+    per column, so memory is bounded regardless of the number of rows;
+    medians are exact for low-cardinality columns and approximate (one
+    grid step, see compact_value_counts) for continuous ones. Medians are
+    only returned for columns that actually contain NaNs; the counts are
+    kept for every numeric column because incremental runs may see NaNs
+    in a column that had none so far. Also records the column dtypes of
+    a full in-memory load so every chunk of the second pass is read and
+    written identically.
+
+    on_chunk: optional callback receiving every chunk after
+    clean_basic_issues (used to collect extra state in the same pass).
+    """
+    print("Computing global fill values (first pass)...")
+
+    value_counts = {}
+    numeric_cols = None
+    nan_cols = set()
+    categorical_cols = []
+    float_cols = set()
+    raw_names = {}
+
+    for chunk in iter_raw_chunks(chunksize, path=path):
+        raw_names.update(zip(normalize_column_names(chunk.columns), chunk.columns))
+        chunk = clean_basic_issues(chunk)
+
+        if on_chunk is not None:
+            on_chunk(chunk)
+
+        chunk_numeric = chunk.select_dtypes(include=np.number).columns
+        if numeric_cols is None:
+            numeric_cols = list(chunk_numeric)
+        else:
+            numeric_cols = [col for col in numeric_cols if col in chunk_numeric]
+
+        for col in chunk.select_dtypes(include="object").columns:
+            if col not in categorical_cols:
+                categorical_cols.append(col)
+
+        float_cols.update(col for col in chunk_numeric if chunk[col].dtype.kind == "f")
+        nan_cols.update(missing_columns(chunk, chunk_numeric))
+        merge_value_counts(value_counts, chunk, chunk_numeric)
+
+    numeric_cols = numeric_cols or []
+    medians = medians_from_value_counts(
+        value_counts,
+        [col for col in numeric_cols if col in nan_cols]
+    )
+
+    # Dtypes of a full load: a column is float if any chunk had NaNs,
+    # and object if any chunk had strings.
+    dtypes = {raw_names[col]: "float64" for col in numeric_cols if col in float_cols}
+    dtypes.update({
+        raw_names[col]: "object"
+        for col in categorical_cols
+        if col in raw_names and col not in ("Date", "Time")
+    })
+
+    return {
+        "medians": medians,
+        "numeric_cols": numeric_cols,
+        "categorical_cols": categorical_cols,
+        "dtypes": dtypes,
+        "value_counts": value_counts
+    }
+
+
 def remove_invalid_coordinates(df):
     """Remove records with invalid lat/long"""
 
@@ -78,23 +267,140 @@ def remove_invalid_coordinates(df):
     return df
 
 
-def save_cleaned_data(df):
-    """Save cleaned dataset"""
-    os.makedirs("data/processed", exist_ok=True)
-    df.to_csv(PROCESSED_DATA_PATH, index=False)
+def save_cleaned_data(df, export_csv=False):
+    """Save cleaned dataset (Parquet store, optional CSV export)"""
+    save_dataset(df, CLEANED_DATASET, export_csv=export_csv)
+    print("Cleaned dataset saved successfully.")
+
+
+def run_streaming_cleaning_pipeline(chunksize=CHUNK_SIZE, export_csv=False):
+    """
+    Bounded-memory cleaning pipeline.
+
+    Pass 1 computes global fill values, pass 2 cleans each chunk through
+    the same stages and appends it to the processed store.
+    Returns the number of cleaned rows written.
+    """
+    fill_values = compute_fill_values(chunksize)
+
+    print("Cleaning dataset in chunks (second pass)...")
+    with DatasetWriter(CLEANED_DATASET, export_csv=export_csv) as writer:
+        for i, chunk in enumerate(iter_raw_chunks(chunksize, dtype=fill_values["dtypes"])):
+            chunk = clean_basic_issues(chunk)
+            chunk = handle_missing_values(chunk, fill_values)
+            chunk = remove_invalid_coordinates(chunk)
+
+            writer.write(chunk)
+            print(f"Chunk {i + 1} written ({writer.rows} rows so far).")
+
     print("Cleaned dataset saved successfully.")
+    print("Data cleaning completed successfully.")
+    return writer.rows
 
 
-def run_cleaning_pipeline():
-    """Full cleaning pipeline"""
-    df = load_raw_data()
+def _partition_statistics(df):
+    """Worker (reduction pass): partial statistics for the global fill values"""
     df = clean_basic_issues(df)
-    df = handle_missing_values(df)
-    df = remove_invalid_coordinates(df)
-    save_cleaned_data(df)
+    numeric_cols = df.select_dtypes(include=np.number).columns
+    nan_cols = missing_columns(df, numeric_cols)
+    return {
+        "value_counts": merge_value_counts({}, df, nan_cols),
+        "numeric_cols": list(numeric_cols),
+        "nan_cols": nan_cols,
+        "categorical_cols": list(df.select_dtypes(include="object").columns)
+    }
+
+
+def _clean_partition(df, fill_values):
+    """Worker (map pass): all cleaning stages with the global fill values"""
+    df = clean_basic_issues(df)
+    df = handle_missing_values(df, fill_values)
+    return remove_invalid_coordinates(df)
+
+
+def clean_dataframe(df, n_workers=1):
+    """
+    Run the cleaning stages on an in-memory raw DataFrame.
+
+    With n_workers > 1 the rows are split into ordered partitions and
+    processed in a process pool: a reduction pass merges per-partition
+    value counts of the columns with NaNs into the global medians, then a
+    map pass cleans every partition with them. The result is identical to
+    the serial path, except that medians of columns with more than
+    MAX_DISTINCT_VALUES distinct values are approximate.
+    """
+    n_workers = resolve_workers(n_workers)
+
+    if n_workers == 1:
+        df = clean_basic_issues(df)
+        df = handle_missing_values(df)
+        return remove_invalid_coordinates(df)
+
+    print(f"Cleaning dataset on {n_workers} workers...")
+
+    with PartitionPool(df, n_workers) as pool:
+        partials = pool.map(_partition_statistics)
+
+        # Reduction step: global fill values
+        value_counts = {}
+        for partial in partials:
+            combine_value_counts(value_counts, partial["value_counts"])
+
+        nan_cols = {col for partial in partials for col in partial["nan_cols"]}
+        fill_values = {
+            "medians": medians_from_value_counts(
+                value_counts,
+                [col for col in partials[0]["numeric_cols"] if col in nan_cols]
+            ),
+            "categorical_cols": partials[0]["categorical_cols"]
+        }
+
+        cleaned = pool.map(_clean_partition, fill_values)
+
+    return pd.concat(cleaned)
+
+
+def run_cleaning_pipeline(chunksize=None, export_csv=False, n_workers=1):
+    """
+    Full cleaning pipeline
+
+    chunksize: stream the raw CSV in chunks of this many rows instead of
+    loading it all at once (see run_streaming_cleaning_pipeline).
+    export_csv: also write data/processed/cleaned_accidents.csv
+    n_workers: number of processes for partitioned cleaning
+    """
+    if chunksize:
+        return run_streaming_cleaning_pipeline(chunksize, export_csv)
+
+    df = clean_dataframe(load_raw_data(), n_workers)
+    save_cleaned_data(df, export_csv)
     print("Data cleaning completed successfully.")
     return df
 
 
 if __name__ == "__main__":
-    run_cleaning_pipeline()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Clean the raw accident dataset")
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=None,
+        help="Stream the raw CSV in chunks of this many rows (bounded memory)"
+    )
+    parser.add_argument(
+        "--csv",
+        action="store_true",
+        help="Also export the cleaned dataset as CSV"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of worker processes (0 = all cores)"
+    )
+    args = parser.parse_args()
+
+    run_cleaning_pipeline(
+        chunksize=args.chunksize,
+        export_csv=args.csv,
+        n_workers=args.workers
+    )
\ No newline at end of file
@@ -0,0 +1,315 @@
+"""
+Processed Data Store
+Smart City Traffic Analytics System
+
+Canonical columnar (Parquet) store for the processed datasets.
+
+Handles:
+- Typed storage (dates and numeric dtypes survive the round trip)
+- Compact dtypes from the schema registry (utils/schema.py)
+- Categorical string columns on load
+- Column projection and predicate pushdown on read
+- Hive-style partitions (Year=.../Local_Authority_(District)=...) for the
+  ML-ready dataset; reads prune partitions from the filters before
+  opening any file, so a one-city, one-year read touches only that slice
+- Streaming writes from chunked pipelines
+- Optional CSV export
+"""
+
+import os
+import shutil
+from urllib.parse import unquote
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from utils.schema import CLEANED_SCHEMA, ML_READY_SCHEMA, apply_schema
+
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROCESSED_DIR = os.path.join(BASE_DIR, "data", "processed")
+
+CLEANED_DATASET = "cleaned_accidents"
+ML_READY_DATASET = "ml_ready_accidents"
+
+DATASET_SCHEMAS = {
+    CLEANED_DATASET: CLEANED_SCHEMA,
+    ML_READY_DATASET: ML_READY_SCHEMA
+}
+
+# String columns with fewer distinct values than this share of rows
+# are loaded as pandas categoricals
+CATEGORICAL_MAX_RATIO = 0.5
+
+# Partition columns per dataset (directory levels, in order)
+REGION_COLUMN = "Local_Authority_(District)"
+DATASET_PARTITIONS = {
+    ML_READY_DATASET: pa.schema([("Year", pa.int16()), (REGION_COLUMN, pa.string())])
+}
+
+
+def _year_predicate(op, value):
+    """Year predicate implied by a Date comparison"""
+    date = pd.Timestamp(value)
+    if op == "<" and date == pd.Timestamp(date.year, 1, 1):
+        return "<=", date.year - 1
+    return {">": ">=", "<": "<="}.get(op, op), date.year
+
+
+# Filters on these columns also prune the partition column they imply
+IMPLIED_PARTITION_FILTERS = {
+    "Date": ("Year", _year_predicate)
+}
+
+
+def dataset_path(name):
+    """Directory holding the Parquet part files of a dataset"""
+    return os.path.join(PROCESSED_DIR, name)
+
+
+def csv_path(name):
+    """Location of the optional CSV export of a dataset"""
+    return os.path.join(PROCESSED_DIR, f"{name}.csv")
+
+
+def _is_partitioned(path):
+    """Stored with partition directories (older datasets are flat part files)"""
+    return os.path.isdir(path) and any(
+        entry.is_dir() for entry in os.scandir(path)
+    )
+
+
+def _partitioning(name):
+    schema = DATASET_PARTITIONS.get(name)
+    return ds.partitioning(schema, flavor="hive") if schema is not None else None
+
+
+def open_dataset(name):
+    """pyarrow dataset over a stored dataset, with its partition columns"""
+    path = dataset_path(name)
+    partitioning = _partitioning(name) if _is_partitioned(path) else None
+    return ds.dataset(path, format="parquet", partitioning=partitioning)
+
+
+def _to_arrow(df):
+    """
+    Convert a DataFrame to an Arrow table.
+    Categoricals are stored as plain strings (Parquet dictionary-encodes
+    them anyway) so chunks with different categories share one schema.
+    """
+    category_cols = df.select_dtypes(include="category").columns
+    if len(category_cols):
+        df = df.astype({col: "object" for col in category_cols})
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def _to_categorical(df):
+    """Convert low-cardinality string columns to categoricals"""
+    for col in df.select_dtypes(include="object").columns:
+        if pd.api.types.infer_dtype(df[col], skipna=True) != "string":
+            continue
+        if df[col].nunique() <= CATEGORICAL_MAX_RATIO * len(df):
+            df[col] = df[col].astype("category")
+    return df
+
+
+class DatasetWriter:
+    """
+    Streams DataFrame chunks into a single Parquet part file.
+
+    Every chunk is cast to the schema of the first one (or of the
+    existing parts when appending), so callers must keep dtypes stable.
+    """
+
+    def __init__(self, name, overwrite=True, export_csv=False):
+        self.name = name
+        self.path = dataset_path(name)
+        self.export_csv = export_csv
+        self.rows = 0
+        self._writer = None
+        self._schema = None
+        self._chunks = 0
+
+        if overwrite and os.path.exists(self.path):
+            shutil.rmtree(self.path)
+        os.makedirs(self.path, exist_ok=True)
+
+        existing = [
+            f for _, _, files in os.walk(self.path) for f in files if f.endswith(".parquet")
+        ]
+        part = len({f.split("-")[1].split(".")[0] for f in existing})
+        self.part_path = os.path.join(self.path, f"part-{part:05d}.parquet")
+        self.part = part
+
+        # Partitioned layout for new datasets; appends keep the existing layout
+        self.partitioning = _partitioning(name)
+        if existing and not _is_partitioned(self.path):
+            self.partitioning = None
+
+        # New parts must match the parts already in the dataset
+        if existing:
+            self._schema = open_dataset(name).schema
+
+        if export_csv and overwrite and os.path.exists(csv_path(name)):
+            os.remove(csv_path(name))
+
+    def write(self, df):
+        # Numeric downcasts only; categoricals are stored as strings anyway
+        schema = DATASET_SCHEMAS.get(self.name, {})
+        df = apply_schema(df.copy(), {col: dtype for col, dtype in schema.items() if dtype != "category"})
+        table = _to_arrow(df)
+
+        if self._schema is None:
+            self._schema = table.schema
+        else:
+            table = table.select(self._schema.names).cast(self._schema)
+
+        if self.partitioning is not None:
+            # One file per partition touched by this chunk
+            ds.write_dataset(
+                table,
+                self.path,
+                format="parquet",
+                partitioning=self.partitioning,
+                basename_template=f"part-{self.part:05d}-{self._chunks:05d}-{{i}}.parquet",
+                existing_data_behavior="overwrite_or_ignore"
+            )
+            self._chunks += 1
+        else:
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.part_path, self._schema)
+            self._writer.write_table(table)
+
+        if self.export_csv:
+            df.to_csv(
+                csv_path(self.name),
+                mode="a",
+                header=not os.path.exists(csv_path(self.name)),
+                index=False
+            )
+
+        self.rows += len(df)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def save_dataset(df, name, export_csv=False):
+    """Replace a dataset with the contents of df"""
+    with DatasetWriter(name, overwrite=True, export_csv=export_csv) as writer:
+        writer.write(df)
+    print(f"Dataset '{name}' saved ({len(df)} rows) at: {dataset_path(name)}")
+
+
+def append_dataset(df, name, export_csv=False):
+    """Add df to a dataset as a new part file"""
+    with DatasetWriter(name, overwrite=False, export_csv=export_csv) as writer:
+        writer.write(df)
+    print(f"Appended {len(df)} rows to dataset '{name}'.")
+
+
+def dataset_columns(name):
+    """Column names of a stored dataset (reads only the schema)"""
+    return open_dataset(name).schema.names
+
+
+def dataset_mtime(name):
+    """Latest modification time of a dataset's part files (0.0 if it does not exist)"""
+    latest = 0.0
+    for root, _, files in os.walk(dataset_path(name)):
+        for f in files:
+            latest = max(latest, os.path.getmtime(os.path.join(root, f)))
+    return latest
+
+
+
+# Partition Pruning
+
+def _filter_expression(name, filters):
+    """
+    pyarrow expression for filters (a list of (column, op, value) ANDed,
+    or a list of such lists ORed), plus the partition predicates implied
+    by Date filters
+    """
+    if not filters:
+        return None
+
+    partition_columns = set(DATASET_PARTITIONS.get(name, pa.schema([])).names)
+    disjunction = filters if isinstance(filters[0], list) else [filters]
+
+    clauses = []
+    for conjunction in disjunction:
+        clause = []
+        for column, op, value in conjunction:
+            if column == "Date":
+                value = [pd.Timestamp(v) for v in value] if op in ("in", "not in") else pd.Timestamp(value)
+            clause.append((column, op, value))
+
+            implied = IMPLIED_PARTITION_FILTERS.get(column)
+            if implied and implied[0] in partition_columns and op in ("==", ">", ">=", "<", "<="):
+                clause.append((implied[0], *implied[1](op, value)))
+        clauses.append(clause)
+
+    return pq.filters_to_expression(clauses)
+
+
+def dataset_partitions(name, filters=None):
+    """
+    Files of a dataset that a read with these filters opens: partition
+    predicates are evaluated on the directory names only.
+    Returns (files, total_files).
+    """
+    dataset = open_dataset(name)
+    expression = _filter_expression(name, filters)
+    files = [fragment.path for fragment in dataset.get_fragments(filter=expression)]
+    return files, len(dataset.files)
+
+
+def partition_values(name, column):
+    """
+    Distinct values of a partition column, from the directory names
+    (read from the column itself on datasets stored without partitions)
+    """
+    if not _is_partitioned(dataset_path(name)):
+        values = open_dataset(name).to_table(columns=[column]).column(column).unique()
+        return sorted(value for value in values.to_pylist() if value is not None)
+
+    prefix = f"{column}="
+    values = set()
+    for root, dirs, _ in os.walk(dataset_path(name)):
+        for directory in dirs:
+            if directory.startswith(prefix):
+                values.add(unquote(directory[len(prefix):]))
+    return sorted(values)
+
+
+def load_dataset(name, columns=None, filters=None, report=False):
+    """
+    Shared loader for processed datasets.
+
+    columns: only read these columns
+    filters: pyarrow predicates pushed down to the Parquet reader,
+             e.g. [("Severity_Label", "==", "High")]; on partitioned
+             datasets, partitions that cannot match are never opened
+    report:  print the memory saved per column by the schema dtypes
+    """
+    path = dataset_path(name)
+
+    if not os.path.exists(path):
+        raise FileNotFoundError(
+            f"Dataset '{name}' not found at {path}. Run the pipeline first."
+        )
+
+    table = open_dataset(name).to_table(columns=columns, filter=_filter_expression(name, filters))
+    df = table.to_pandas()
+    df = apply_schema(df, DATASET_SCHEMAS.get(name, {}), report=report)
+    return _to_categorical(df)
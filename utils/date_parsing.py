@@ -0,0 +1,61 @@
+"""
+Date & Time Parsing Module
+Smart City Traffic Analytics System
+
+Shared parser for the Date and Time columns.
+
+Dates and times have very low cardinality (a few thousand distinct days,
+1440 distinct HH:MM values), so each distinct value is parsed once with
+an explicit format and the result is broadcast back to every row.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+# Raw UK accident export: 04/01/2005
+RAW_DATE_FORMAT = "%d/%m/%Y"
+
+# CSV exports of processed data: 2005-01-04
+ISO_DATE_FORMAT = "%Y-%m-%d"
+
+TIME_FORMAT = "%H:%M"
+
+
+def parse_dates(values, date_format=RAW_DATE_FORMAT):
+    """
+    Parse a Date column into datetime64 values.
+
+    Invalid values become NaT. Columns that are already datetimes are
+    returned unchanged.
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+
+    codes, uniques = pd.factorize(values)
+    parsed = pd.to_datetime(uniques, format=date_format, errors="coerce")
+
+    return pd.Series(
+        parsed.take(codes, allow_fill=True, fill_value=pd.NaT),
+        index=values.index,
+        name=values.name
+    )
+
+
+def parse_times(values, time_format=TIME_FORMAT):
+    """
+    Parse a Time column into integer hour and minute columns.
+
+    Returns (hour, minute) as int8 Series; invalid values are -1.
+    """
+    codes, uniques = pd.factorize(values)
+    parsed = pd.to_datetime(uniques, format=time_format, errors="coerce")
+
+    hours = np.append(parsed.hour.fillna(-1).to_numpy(dtype=np.int8), np.int8(-1))
+    minutes = np.append(parsed.minute.fillna(-1).to_numpy(dtype=np.int8), np.int8(-1))
+
+    # code -1 (missing value) picks the trailing -1 entry
+    hour = pd.Series(hours[codes], index=values.index, name="Hour")
+    minute = pd.Series(minutes[codes], index=values.index, name="Minute")
+
+    return hour, minute
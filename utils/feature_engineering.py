@@ -5,17 +5,20 @@ Smart City Traffic Analytics System
 Creates intelligent features for ML modeling.
 """
 
-import pandas as pd
-import numpy as np
+import argparse
 import os
+import sys
 
-CLEAN_DATA_PATH = "data/processed/cleaned_accidents.csv"
-ML_READY_PATH = "data/processed/ml_ready_accidents.csv"
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.data_store import CLEANED_DATASET, ML_READY_DATASET, load_dataset, save_dataset
+from utils.feature_registry import apply_features
+from utils.parallel import run_partitioned
+from utils.spatial_features import add_neighbourhood_features
 
 
 def load_clean_data():
     print("Loading cleaned dataset...")
-    return pd.read_csv(CLEAN_DATA_PATH)
+    return load_dataset(CLEANED_DATASET)
 
 
 
@@ -23,39 +26,16 @@ def load_clean_data():
 
 def create_time_category(df):
     print("Creating time category feature...")
-
-    df["Time"] = pd.to_datetime(df["Time"], errors="coerce")
-
-    df["Hour"] = df["Time"].dt.hour
-
-    def map_time(hour):
-        if 5 <= hour < 12:
-            return "Morning"
-        elif 12 <= hour < 17:
-            return "Afternoon"
-        elif 17 <= hour < 21:
-            return "Evening"
-        else:
-            return "Night"
-
-    df["Time_Category"] = df["Hour"].apply(map_time)
-
-    return df
+    # Hour is produced by the cleaning step; rebuilt from Time for older datasets
+    return apply_features(df, ["Time_Category"])
 
 
 # Weekend Flag
 
 def create_weekend_flag(df):
     print("Creating weekend flag...")
-
-    # If Day_of_Week column exists (1=Sunday, 7=Saturday typical UK format)
-    if "Day_of_Week" in df.columns:
-        df["Is_Weekend"] = df["Day_of_Week"].isin([1, 7]).astype(int)
-    else:
-        df["Date"] = pd.to_datetime(df["Date"])
-        df["Is_Weekend"] = df["Date"].dt.dayofweek.isin([5, 6]).astype(int)
-
-    return df
+    # Day_of_Week: 1=Sunday, 7=Saturday (UK format); derived from Date if missing
+    return apply_features(df, ["Is_Weekend"])
 
 
 
@@ -63,26 +43,7 @@ def create_weekend_flag(df):
 
 def create_weather_severity_index(df):
     print("Creating weather severity index...")
-
-    weather_risk_mapping = {
-        "Fine without high winds": 1,
-        "Fine with high winds": 2,
-        "Raining without high winds": 3,
-        "Raining with high winds": 4,
-        "Snowing without high winds": 4,
-        "Snowing with high winds": 5,
-        "Fog or mist": 3,
-        "Other": 2,
-        "Unknown": 2
-    }
-
-    if "Weather_Conditions" in df.columns:
-        df["Weather_Severity_Index"] = df["Weather_Conditions"].map(weather_risk_mapping)
-        df["Weather_Severity_Index"] = df["Weather_Severity_Index"].fillna(2)
-    else:
-        df["Weather_Severity_Index"] = 2
-
-    return df
+    return apply_features(df, ["Weather_Severity_Index"])
 
 
 
@@ -90,23 +51,7 @@ def create_weather_severity_index(df):
 
 def create_road_risk_score(df):
     print("Creating road risk score...")
-
-    road_risk_mapping = {
-        "Single carriageway": 3,
-        "Dual carriageway": 2,
-        "Roundabout": 1,
-        "One way street": 2,
-        "Slip road": 3,
-        "Unknown": 2
-    }
-
-    if "Road_Type" in df.columns:
-        df["Road_Risk_Score"] = df["Road_Type"].map(road_risk_mapping)
-        df["Road_Risk_Score"] = df["Road_Risk_Score"].fillna(2)
-    else:
-        df["Road_Risk_Score"] = 2
-
-    return df
+    return apply_features(df, ["Road_Risk_Score"])
 
 
 
@@ -114,38 +59,60 @@ def create_road_risk_score(df):
 
 def map_severity_label(df):
     print("Mapping severity labels...")
+    return apply_features(df, ["Severity_Label"])
 
-    severity_mapping = {
-        1: "High",     # Fatal
-        2: "Medium",   # Serious
-        3: "Low"       # Slight
-    }
 
-    df["Severity_Label"] = df["Accident_Severity"].map(severity_mapping)
 
-    return df
+# Save ML Ready Dataset
 
+def save_ml_ready_data(df, export_csv=False):
+    save_dataset(df, ML_READY_DATASET, export_csv=export_csv)
+    print("ML-ready dataset saved successfully.")
 
 
-# Save ML Ready Dataset
+# All feature steps are row-local, so partitions can be processed independently.
+# Mappings and bins are declared in utils/feature_registry.py
 
-def save_ml_ready_data(df):
-    os.makedirs("data/processed", exist_ok=True)
-    df.to_csv(ML_READY_PATH, index=False)
-    print("ML-ready dataset saved successfully.")
+def engineer_features(df):
+    print("Creating engineered features...")
+    return apply_features(df)
 
 
-def run_feature_engineering_pipeline():
+def run_feature_engineering_pipeline(export_csv=False, n_workers=1, spatial=True):
     df = load_clean_data()
-    df = create_time_category(df)
-    df = create_weekend_flag(df)
-    df = create_weather_severity_index(df)
-    df = create_road_risk_score(df)
-    df = map_severity_label(df)
-    save_ml_ready_data(df)
+    df = run_partitioned(engineer_features, df, n_workers)
+
+    # Neighbourhood features look across rows, so they run on the merged result
+    if spatial:
+        df = add_neighbourhood_features(df)
+
+    save_ml_ready_data(df, export_csv)
     print("Feature engineering completed successfully.")
     return df
 
 
 if __name__ == "__main__":
-    run_feature_engineering_pipeline()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Build the ML-ready dataset")
+    parser.add_argument(
+        "--csv",
+        action="store_true",
+        help="Also export the ML-ready dataset as CSV"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of worker processes (0 = all cores)"
+    )
+    parser.add_argument(
+        "--no-spatial",
+        action="store_true",
+        help="Skip the neighbourhood accident-density features"
+    )
+    args = parser.parse_args()
+
+    run_feature_engineering_pipeline(
+        export_csv=args.csv,
+        n_workers=args.workers,
+        spatial=not args.no_spatial
+    )
\ No newline at end of file
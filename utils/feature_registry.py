@@ -0,0 +1,286 @@
+"""
+Feature Registry
+Smart City Traffic Analytics System
+
+Every engineered feature is declared once, as a binning or lookup spec
+over one source column. The same specs drive batch feature engineering
+(vectorized NumPy over whole columns) and single-record scoring.
+
+Handles:
+- Bin specs: right-open bin edges, evaluated with np.searchsorted
+- Lookup specs: table evaluated once per distinct value, then indexed
+  by integer codes (categorical codes when the column is a category)
+- Derived inputs (Hour from Time, Day_of_Week from Date) for older data
+- Fixed category order, so partitions concatenate as categoricals
+- Model feature list shared by training, explainability and the dashboard
+"""
+
+import numpy as np
+import pandas as pd
+
+from utils.date_parsing import parse_dates, parse_times
+
+
+
+# Spec Types
+
+class DerivedSpec:
+    """Input columns computed from another column when they are missing"""
+
+    def __init__(self, names, source, func):
+        self.names = names
+        self.source = source
+        self.func = func
+
+    def apply(self, df):
+        if all(name in df.columns for name in self.names) or self.source not in df.columns:
+            return {}
+        values = self.func(df[self.source])
+        if len(self.names) == 1:
+            values = (values,)
+        return dict(zip(self.names, values))
+
+
+class BinSpec:
+    """
+    Feature = labels[i] for edges[i - 1] <= value < edges[i].
+    labels has one more entry than edges (below the first / above the last).
+    """
+
+    def __init__(self, name, source, edges, labels):
+        self.name = name
+        self.source = source
+        self.edges = np.asarray(edges)
+        self.labels = labels
+
+        # Repeated labels (e.g. Night on both ends) share one category code
+        self.categories = list(dict.fromkeys(labels))
+        self.codes = np.array([self.categories.index(label) for label in labels], dtype=np.int8)
+
+    def evaluate(self, values):
+        bins = np.searchsorted(self.edges, np.asarray(values), side="right")
+        return pd.Categorical.from_codes(self.codes[bins], categories=self.categories)
+
+    def value(self, value):
+        return self.labels[int(np.searchsorted(self.edges, value, side="right"))]
+
+
+class LookupSpec:
+    """
+    Feature = table[value], or default for values not in the table
+    (and for every row when the source column is missing).
+
+    A numeric dtype gives a compact numeric column; dtype=None gives a
+    categorical with the table's values as categories (default None = NaN).
+    """
+
+    def __init__(self, name, source, table, default, dtype=None):
+        self.name = name
+        self.source = source
+        self.table = table
+        self.default = default
+        self.dtype = dtype
+        self.categories = None if dtype else list(dict.fromkeys(table.values()))
+
+    def _lookup_array(self, uniques):
+        """Output per distinct value, with the default appended for code -1"""
+        outputs = [self.table.get(value, self.default) for value in uniques] + [self.default]
+
+        if self.dtype:
+            return np.array(outputs, dtype=self.dtype)
+
+        return np.array(
+            [-1 if output is None else self.categories.index(output) for output in outputs],
+            dtype=np.int8
+        )
+
+    def evaluate(self, values):
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            codes, uniques = values.cat.codes.to_numpy(), values.cat.categories
+        else:
+            codes, uniques = pd.factorize(values)
+
+        result = self._lookup_array(uniques)[codes]
+
+        if self.dtype:
+            return result
+        return pd.Categorical.from_codes(result, categories=self.categories)
+
+    def constant(self, n_rows):
+        if self.dtype:
+            return np.full(n_rows, self.default, dtype=self.dtype)
+        return pd.Categorical([self.default] * n_rows, categories=self.categories)
+
+    def value(self, value):
+        return self.table.get(value, self.default)
+
+    def sources_of(self, output):
+        """Table keys that map to output (e.g. the road types with a given risk score)"""
+        return [key for key, value in self.table.items() if value == output]
+
+
+
+# Feature Declarations
+
+def _hour_and_minute(times):
+    return parse_times(times)
+
+
+def _uk_day_of_week(dates):
+    # UK convention: 1 = Sunday ... 7 = Saturday (pandas: 0 = Monday)
+    return ((parse_dates(dates).dt.dayofweek + 1) % 7 + 1).astype(np.int8)
+
+
+DERIVED_INPUTS = [
+    DerivedSpec(("Hour", "Minute"), "Time", _hour_and_minute),
+    DerivedSpec(("Day_of_Week",), "Date", _uk_day_of_week)
+]
+
+FEATURE_SPECS = [
+    BinSpec(
+        "Time_Category", "Hour",
+        edges=[5, 12, 17, 21],
+        labels=["Night", "Morning", "Afternoon", "Evening", "Night"]
+    ),
+    LookupSpec(
+        "Is_Weekend", "Day_of_Week",
+        {1: 1, 7: 1},
+        default=0, dtype="int8"
+    ),
+    LookupSpec(
+        "Weather_Severity_Index", "Weather_Conditions",
+        {
+            "Fine without high winds": 1,
+            "Fine with high winds": 2,
+            "Raining without high winds": 3,
+            "Raining with high winds": 4,
+            "Snowing without high winds": 4,
+            "Snowing with high winds": 5,
+            "Fog or mist": 3,
+            "Other": 2,
+            "Unknown": 2
+        },
+        default=2, dtype="int8"
+    ),
+    LookupSpec(
+        "Road_Risk_Score", "Road_Type",
+        {
+            "Single carriageway": 3,
+            "Dual carriageway": 2,
+            "Roundabout": 1,
+            "One way street": 2,
+            "Slip road": 3,
+            "Unknown": 2
+        },
+        default=2, dtype="int8"
+    ),
+    LookupSpec(
+        "Severity_Label", "Accident_Severity",
+        {
+            1: "High",     # Fatal
+            2: "Medium",   # Serious
+            3: "Low"       # Slight
+        },
+        default=None
+    )
+]
+
+SPECS_BY_NAME = {spec.name: spec for spec in FEATURE_SPECS}
+
+# Model inputs, in training column order
+MODEL_FEATURES = [
+    "Number_of_Vehicles",
+    "Number_of_Casualties",
+    "Speed_limit",
+    "Weather_Severity_Index",
+    "Road_Risk_Score",
+    "Is_Weekend"
+]
+
+
+
+# Batch Evaluation
+
+def compute_features(df, names=None):
+    """
+    Evaluate the declared features over df in one pass.
+    Returns {column: values}, including any derived inputs that were missing.
+    """
+    specs = FEATURE_SPECS if names is None else [SPECS_BY_NAME[name] for name in names]
+
+    columns = {}
+    for derived in DERIVED_INPUTS:
+        columns.update(derived.apply(df))
+
+    for spec in specs:
+        source = columns.get(spec.source)
+        if source is None and spec.source in df.columns:
+            source = df[spec.source]
+
+        if source is not None:
+            columns[spec.name] = spec.evaluate(source)
+        elif isinstance(spec, LookupSpec):
+            columns[spec.name] = spec.constant(len(df))
+        else:
+            raise KeyError(f"Feature '{spec.name}' needs column '{spec.source}'")
+
+    return columns
+
+
+def apply_features(df, names=None):
+    """Add the declared features (all by default) to df"""
+    for col, values in compute_features(df, names).items():
+        df[col] = values
+    return df
+
+
+def model_frame(df):
+    """Model input frame (MODEL_FEATURES order) for a batch of raw or ML-ready rows"""
+    features = compute_features(df, [name for name in MODEL_FEATURES if name in SPECS_BY_NAME])
+    return pd.DataFrame(
+        {col: features[col] if col in features else df[col] for col in MODEL_FEATURES},
+        index=df.index
+    )
+
+
+def model_inputs():
+    """
+    Source columns model_frame needs, as alternatives per feature, e.g.
+    ("Day_of_Week", "Date") when Day_of_Week can be derived from Date
+    """
+    derived_from = {name: spec.source for spec in DERIVED_INPUTS for name in spec.names}
+
+    inputs = []
+    for name in MODEL_FEATURES:
+        source = SPECS_BY_NAME[name].source if name in SPECS_BY_NAME else name
+        alternatives = (source, derived_from[source]) if source in derived_from else (source,)
+        if alternatives not in inputs:
+            inputs.append(alternatives)
+    return inputs
+
+
+
+# Single-Record Scoring
+
+def record_features(record):
+    """
+    Engineered features for one record (a dict of raw columns).
+    Values already present in the record are kept as given.
+    """
+    features = dict(record)
+
+    for spec in FEATURE_SPECS:
+        if spec.name in features:
+            continue
+        if spec.source in features:
+            features[spec.name] = spec.value(features[spec.source])
+        elif isinstance(spec, LookupSpec):
+            features[spec.name] = spec.default
+
+    return features
+
+
+def model_input(record):
+    """One-row model input frame (MODEL_FEATURES order) for a raw record"""
+    features = record_features(record)
+    return pd.DataFrame([{col: features[col] for col in MODEL_FEATURES}])
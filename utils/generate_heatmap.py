@@ -5,62 +5,75 @@ Smart City Traffic & Accident Risk Analytics System
 Features:
 - Severity-based heatmap
 - Time category filtering
-- City filtering
+- City and year filtering (pruned to the matching dataset partitions)
 """
 
 import os
-import pandas as pd
+import sys
 import folium
 from folium.plugins import HeatMap
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.data_store import ML_READY_DATASET, REGION_COLUMN, dataset_partitions, load_dataset, partition_values
+
 
 # Configuration
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-DATA_PATH = os.path.join(BASE_DIR, "data", "processed", "ml_ready_accidents.csv")
 OUTPUT_DIR = os.path.join(BASE_DIR, "reports", "heatmap")
 
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
 
 
-# Load Data
-
-print("Loading dataset...")
-df = pd.read_csv(DATA_PATH)
-
-df = df.dropna(subset=["Latitude", "Longitude"])
-df = df[(df["Latitude"] != 0) & (df["Longitude"] != 0)]
-
-print(f"Total records after cleaning: {len(df)}")
-
-
-
 # 🔵 Filter Controls (Change Here Manually for Now)
 
 
-FILTER_SEVERITY = "None"   # Options: "Low", "Medium", "High", or None
+FILTER_SEVERITY = None   # Options: "Low", "Medium", "High", or None
 FILTER_TIME = None       # Options: "Morning", "Afternoon", "Evening", "Night", or None
 FILTER_CITY = None       # Example: "London", "Birmingham", etc. or None
+FILTER_YEAR = None       # Example: 2012, or None
+
 
+# Filters are pushed down to the Parquet reader; city and year also
+# select the dataset partitions, so nothing else is read
+filters = []
 
-# Apply severity filter
 if FILTER_SEVERITY:
-    df = df[df["Severity_Label"] == FILTER_SEVERITY]
+    filters.append(("Severity_Label", "==", FILTER_SEVERITY))
     print(f"Filtered by Severity: {FILTER_SEVERITY}")
 
-# Apply time filter
 if FILTER_TIME:
-    df = df[df["Time_Category"] == FILTER_TIME]
+    filters.append(("Time_Category", "==", FILTER_TIME))
     print(f"Filtered by Time: {FILTER_TIME}")
 
-# Apply city filter
-if FILTER_CITY and "Local_Authority_(District)" in df.columns:
-    df = df[df["Local_Authority_(District)"].str.contains(FILTER_CITY, case=False)]
-    print(f"Filtered by City: {FILTER_CITY}")
+if FILTER_YEAR:
+    filters.append(("Year", "==", int(FILTER_YEAR)))
+    print(f"Filtered by Year: {FILTER_YEAR}")
 
+if FILTER_CITY:
+    # Any local authority whose name contains the city (e.g. "London" -> "City of London")
+    cities = [value for value in partition_values(ML_READY_DATASET, REGION_COLUMN) if FILTER_CITY.lower() in value.lower()]
+    filters.append((REGION_COLUMN, "in", cities))
+    print(f"Filtered by City: {FILTER_CITY} ({len(cities)} local authorities)")
+
+columns = ["Latitude", "Longitude"]
+
+files, total_files = dataset_partitions(ML_READY_DATASET, filters or None)
+print(f"Reading {len(files)} of {total_files} dataset files")
+
+
+
+# Load Data
+
+print("Loading dataset...")
+df = load_dataset(ML_READY_DATASET, columns=columns, filters=filters or None)
+
+df = df.dropna(subset=["Latitude", "Longitude"])
+df = df[(df["Latitude"] != 0) & (df["Longitude"] != 0)]
+
+print(f"Total records after cleaning: {len(df)}")
 
-print(f"Records after filtering: {len(df)}")
 
 
 
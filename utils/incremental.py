@@ -0,0 +1,333 @@
+"""
+Incremental Processing Module
+Smart City Traffic Analytics System
+
+Processes only newly arrived raw accident records (e.g. a monthly drop)
+instead of re-running cleaning, feature engineering and the database
+load over the whole history.
+
+Handles:
+- Persisted watermark (latest processed Date)
+- On-disk Accident_Index dedup index: every incoming row is checked
+  against it, late arrivals (dated before the watermark) included
+- Incrementally maintained value counts for the global median fill values
+- Appending new rows to the processed store and the accidents table
+  (idempotent: a retried or replayed batch appends nothing twice)
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.data_cleaning import (
+    CHUNK_SIZE,
+    RAW_DATA_PATH,
+    clean_basic_issues,
+    compute_fill_values,
+    handle_missing_values,
+    iter_raw_chunks,
+    medians_from_value_counts,
+    merge_value_counts,
+    missing_columns,
+    remove_invalid_coordinates
+)
+from utils.data_store import (
+    CLEANED_DATASET,
+    ML_READY_DATASET,
+    PROCESSED_DIR,
+    append_dataset,
+    dataset_columns,
+    dataset_path,
+    load_dataset
+)
+from utils.feature_engineering import engineer_features
+from utils.spatial_features import NEIGHBOURHOOD_INPUTS, SPATIAL_FEATURES, WINDOWS_DAYS, add_neighbourhood_features
+
+
+STATE_DIR = os.path.join(PROCESSED_DIR, "incremental_state")
+STATE_PATH = os.path.join(STATE_DIR, "state.json")
+VALUE_COUNTS_PATH = os.path.join(STATE_DIR, "value_counts.parquet")
+SEEN_INDEX_DIR = os.path.join(STATE_DIR, "seen_index")
+
+# The dedup index is compacted into one segment beyond this many segments
+MAX_INDEX_SEGMENTS = 16
+
+
+
+# Dedup Index
+
+class SeenIndex:
+    """
+    On-disk set of processed Accident_Index values.
+
+    Stored as sorted NumPy segments (one per run, memory-mapped on load).
+    Lookups are a binary search per segment, so a run costs
+    O(new rows * log(history)) instead of re-reading the history.
+    """
+
+    def __init__(self, directory=SEEN_INDEX_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.segments = [np.load(path, mmap_mode="r") for path in self._segment_paths()]
+
+    def _segment_paths(self):
+        return sorted(glob.glob(os.path.join(self.directory, "segment-*.npy")))
+
+    def __len__(self):
+        return sum(len(segment) for segment in self.segments)
+
+    def contains(self, values):
+        """Boolean mask: which values are already in the index"""
+        keys = np.asarray(values, dtype=str).astype(bytes)
+        found = np.zeros(len(keys), dtype=bool)
+
+        for segment in self.segments:
+            if not len(segment):
+                continue
+            positions = np.minimum(np.searchsorted(segment, keys), len(segment) - 1)
+            found |= segment[positions] == keys
+
+        return found
+
+    def add(self, values):
+        """Persist values as a new sorted segment"""
+        keys = np.unique(np.asarray(values, dtype=str).astype(bytes))
+        if not len(keys):
+            return
+
+        paths = self._segment_paths()
+        number = int(os.path.basename(paths[-1])[8:13]) + 1 if paths else 0
+        path = os.path.join(self.directory, f"segment-{number:05d}.npy")
+        np.save(path, keys)
+        self.segments.append(np.load(path, mmap_mode="r"))
+
+        if len(self.segments) > MAX_INDEX_SEGMENTS:
+            self.compact()
+
+    def compact(self):
+        """Merge all segments into one"""
+        print("Compacting Accident_Index dedup index...")
+        paths = self._segment_paths()
+        merged = np.unique(np.concatenate([np.asarray(segment) for segment in self.segments]))
+
+        number = int(os.path.basename(paths[-1])[8:13]) + 1
+        path = os.path.join(self.directory, f"segment-{number:05d}.npy")
+        np.save(path, merged)
+
+        self.segments = []
+        for old_path in paths:
+            os.remove(old_path)
+        self.segments = [np.load(path, mmap_mode="r")]
+
+
+
+# Persisted State
+
+def load_state():
+    """Watermark, fill-value statistics and dtypes of the last run (or None)"""
+    if not os.path.exists(STATE_PATH):
+        return None
+
+    with open(STATE_PATH) as f:
+        state = json.load(f)
+
+    counts = pd.read_parquet(VALUE_COUNTS_PATH)
+    state["value_counts"] = {
+        col: group.set_index("value")["count"]
+        for col, group in counts.groupby("column")
+    }
+    return state
+
+
+def save_state(state):
+    os.makedirs(STATE_DIR, exist_ok=True)
+
+    counts = pd.concat(
+        [
+            pd.DataFrame({
+                "column": col,
+                "value": counts.index.astype(float),
+                "count": counts.to_numpy(dtype=np.int64)
+            })
+            for col, counts in state["value_counts"].items()
+        ],
+        ignore_index=True
+    )
+    counts.to_parquet(VALUE_COUNTS_PATH, index=False)
+
+    meta = {key: value for key, value in state.items() if key != "value_counts"}
+    tmp_path = STATE_PATH + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp_path, STATE_PATH)
+
+
+def bootstrap_state(raw_path=RAW_DATA_PATH, chunksize=CHUNK_SIZE):
+    """
+    One-off pass over the full raw history: builds the value counts,
+    dtypes, watermark and dedup index that incremental runs maintain.
+    """
+    print("Bootstrapping incremental state from the raw history...")
+
+    seen = SeenIndex()
+    watermark = []
+
+    def record(chunk):
+        seen.add(chunk["Accident_Index"])
+        if len(chunk):
+            watermark.append(chunk["Date"].max())
+
+    fill_values = compute_fill_values(chunksize, path=raw_path, on_chunk=record)
+    seen.compact()
+
+    state = {
+        "watermark": str(max(watermark).date()) if watermark else None,
+        "rows_processed": len(seen),
+        "numeric_cols": list(fill_values["numeric_cols"]),
+        "categorical_cols": list(fill_values["categorical_cols"]),
+        "dtypes": fill_values["dtypes"],
+        "value_counts": fill_values["value_counts"]
+    }
+    save_state(state)
+
+    print(f"Incremental state ready. Watermark: {state['watermark']}")
+    return state
+
+
+
+# Incremental Run
+
+def _append_unstored(df, name):
+    """
+    Append the rows of df whose Accident_Index is not in the dataset yet,
+    so a run that failed after appending re-appends nothing when retried
+    """
+    if os.path.exists(dataset_path(name)):
+        # A stored copy of a row has the same Date, so earlier dates are never read
+        stored = load_dataset(name, columns=["Accident_Index"], filters=[("Date", ">=", df["Date"].min())])
+        stored_rows = df["Accident_Index"].isin(stored["Accident_Index"])
+        if stored_rows.any():
+            print(f"{int(stored_rows.sum())} rows already in dataset '{name}' (earlier attempt); not appended again.")
+            df = df[~stored_rows]
+
+    if not df.empty:
+        append_dataset(df, name)
+
+
+def run_incremental_update(raw_path, chunksize=CHUNK_SIZE, insert_db=True):
+    """
+    Clean, engineer and load only the rows of raw_path that were not
+    processed before. Returns the number of new ML-ready rows.
+
+    Global medians are recomputed from the persisted value counts plus
+    the new rows; rows processed earlier keep the fill values of their run.
+    """
+    state = load_state()
+    if state is None:
+        raise RuntimeError("No incremental state found. Run with --bootstrap first.")
+
+    seen = SeenIndex()
+
+    print(f"Reading new records from {raw_path} (watermark: {state['watermark']})...")
+
+    new_parts = []
+    skipped = 0
+    for chunk in iter_raw_chunks(chunksize, dtype=state["dtypes"], path=raw_path):
+        chunk = clean_basic_issues(chunk)
+        rows = len(chunk)
+
+        chunk = chunk[~seen.contains(chunk["Accident_Index"])]
+
+        skipped += rows - len(chunk)
+        new_parts.append(chunk)
+
+    new = pd.concat(new_parts).drop_duplicates(subset=["Accident_Index"])
+    print(f"New records: {len(new)} (skipped {skipped} already processed)")
+
+    if state["watermark"] and len(new):
+        late = int((new["Date"] < pd.Timestamp(state["watermark"])).sum())
+        if late:
+            print(f"Late arrivals: {late} of the new records are dated before the watermark")
+
+    if new.empty:
+        return 0
+
+    # Maintain global statistics incrementally
+    merge_value_counts(state["value_counts"], new, state["numeric_cols"])
+    fill_values = {
+        "medians": medians_from_value_counts(
+            state["value_counts"],
+            missing_columns(new, state["numeric_cols"])
+        ),
+        "categorical_cols": state["categorical_cols"]
+    }
+
+    new = handle_missing_values(new, fill_values)
+    new_keys = new["Accident_Index"]
+    new = remove_invalid_coordinates(new)
+
+    # Neighbourhood features of new rows also count earlier accidents, but only
+    # within the longest window, so only that stretch of the history is read
+    history = None
+    if os.path.exists(dataset_path(ML_READY_DATASET)) and SPATIAL_FEATURES[0] in dataset_columns(ML_READY_DATASET):
+        since = new["Date"].min() - pd.Timedelta(days=max(WINDOWS_DAYS.values()))
+        history = load_dataset(
+            CLEANED_DATASET,
+            columns=NEIGHBOURHOOD_INPUTS + ["Accident_Index"],
+            filters=[("Date", ">=", since)]
+        )
+        # Rows of this batch stored by an earlier, failed run are not history
+        history = history[~history["Accident_Index"].isin(new["Accident_Index"])]
+
+    _append_unstored(new, CLEANED_DATASET)
+    ml_ready = engineer_features(new.copy())
+    if history is not None:
+        ml_ready = add_neighbourhood_features(ml_ready, history)
+    _append_unstored(ml_ready, ML_READY_DATASET)
+
+    if insert_db:
+        from database.db_connection import insert_dataframe
+        from database.insert_data import prepare_accidents_frame
+        # Upsert: rows of a re-sent batch replace their earlier copies
+        if not insert_dataframe(prepare_accidents_frame(ml_ready), mode="upsert"):
+            raise RuntimeError("Loading the new records into the database failed; the batch is not marked as processed.")
+
+    # State is saved last so a failed run is simply retried
+    seen.add(new_keys)
+    watermark = new["Date"].max()
+    if state["watermark"]:
+        watermark = max(watermark, pd.Timestamp(state["watermark"]))
+    state["watermark"] = str(watermark.date())
+    state["rows_processed"] += len(new_keys)
+    save_state(state)
+
+    print(f"Incremental update completed. New watermark: {state['watermark']}")
+    return len(ml_ready)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Process newly arrived raw accident records")
+    parser.add_argument("raw_path", nargs="?", help="CSV file with the new raw records")
+    parser.add_argument(
+        "--bootstrap",
+        action="store_true",
+        help="Build the incremental state from the full raw history first"
+    )
+    parser.add_argument("--chunksize", type=int, default=CHUNK_SIZE)
+    parser.add_argument(
+        "--no-db",
+        action="store_true",
+        help="Only update the processed store, not the accidents table"
+    )
+    args = parser.parse_args()
+
+    if args.bootstrap:
+        bootstrap_state(chunksize=args.chunksize)
+
+    if args.raw_path:
+        run_incremental_update(args.raw_path, args.chunksize, insert_db=not args.no_db)
@@ -0,0 +1,280 @@
+"""
+OLAP Cube Module
+Smart City Traffic Analytics System
+
+Dense accident-count cube for the dashboard: every KPI and chart under
+any combination of filters is a slice and a sum over a fixed-size array,
+so its cost depends on the number of days and categories, not on the
+number of accidents.
+
+Handles:
+- Counts over Date x Hour x Severity_Label x Weather_Conditions x Road_Type
+- Time_Category and Is_Weekend as groupings of the Hour and Date axes
+  (both are functions of those axes, so separate axes would only add
+  empty cells)
+- Filter selection (date range, category lists) and marginals
+- Persistence to a single compressed .npz file
+"""
+
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.data_store import ML_READY_DATASET, PROCESSED_DIR, load_dataset
+from utils.feature_registry import SPECS_BY_NAME, compute_features
+
+
+OLAP_CUBE_PATH = os.path.join(PROCESSED_DIR, "olap_cube.npz")
+
+# Stored axes, in array order
+AXES = ["Date", "Hour", "Severity_Label", "Weather_Conditions", "Road_Type"]
+
+# Groupings of a stored axis: dimension -> (axis, feature computed from the axis labels)
+DERIVED_DIMENSIONS = {
+    "Time_Category": ("Hour", "Time_Category"),
+    "Is_Weekend": ("Date", "Is_Weekend")
+}
+
+SOURCE_COLUMNS = ["Date", "Hour", "Accident_Severity", "Weather_Conditions", "Road_Type"]
+
+# Missing categories are counted here rather than dropped
+MISSING_LABEL = "Unknown"
+
+
+
+# Axis Labels
+
+def _category_labels(values, declared):
+    """Declared registry categories first, then any others seen in the data"""
+    seen = pd.Series(values).dropna().unique()
+    extra = sorted(str(value) for value in seen if value not in declared)
+    labels = list(declared) + extra
+    if MISSING_LABEL not in labels:
+        labels.append(MISSING_LABEL)
+    return labels
+
+
+def _codes(values, labels):
+    codes = pd.Categorical(pd.Series(values).astype(object).fillna(MISSING_LABEL), categories=labels).codes
+    return codes.astype(np.int64)
+
+
+def _count_dtype(max_count):
+    for dtype in (np.uint16, np.uint32):
+        if max_count <= np.iinfo(dtype).max:
+            return dtype
+    return np.uint64
+
+
+
+# Cube
+
+class OlapCube:
+
+    def __init__(self, counts, labels):
+        self.counts = counts
+        self.labels = {axis: np.asarray(labels[axis]) for axis in AXES}
+
+        # Source rows left out of the counts (no valid date, hour or severity)
+        self.skipped_rows = 0
+
+        # Derived dimension value of each label of its axis
+        self.derived = {}
+        for name, (axis, feature) in DERIVED_DIMENSIONS.items():
+            frame = pd.DataFrame({axis: self.labels[axis]})
+            self.derived[name] = np.asarray(compute_features(frame, [feature])[feature])
+
+    def __len__(self):
+        """Accidents counted"""
+        return int(self.counts.sum(dtype=np.int64))
+
+    @property
+    def shape(self):
+        return dict(zip(AXES, self.counts.shape))
+
+    @classmethod
+    def from_dataframe(cls, df):
+        """
+        Count the rows of df. Rows without a valid date, hour or severity are
+        left out (counted in skipped_rows); ValueError if no row is valid.
+        """
+        severity_spec = SPECS_BY_NAME["Severity_Label"]
+        severity_labels = list(severity_spec.table.values())
+
+        hours = df["Hour"].to_numpy(dtype=np.float64, na_value=np.nan)
+        dates = df["Date"].to_numpy(dtype="datetime64[D]")
+        severity = pd.Categorical(
+            df["Accident_Severity"].map(severity_spec.table), categories=severity_labels
+        ).codes.astype(np.int64)
+
+        valid = ~np.isnat(dates) & (hours >= 0) & (hours <= 23) & (severity >= 0)
+        if not valid.any():
+            raise ValueError(f"No rows with a valid date, hour and severity to count ({len(df)} rows given)")
+        hours = np.where(valid, hours, 0).astype(np.int64)
+
+        first, last = dates[valid].min(), dates[valid].max()
+        labels = {
+            "Date": np.arange(first, last + 1, dtype="datetime64[D]"),
+            "Hour": np.arange(24),
+            "Severity_Label": severity_labels,
+            "Weather_Conditions": _category_labels(
+                df["Weather_Conditions"], SPECS_BY_NAME["Weather_Severity_Index"].table
+            ),
+            "Road_Type": _category_labels(df["Road_Type"], SPECS_BY_NAME["Road_Risk_Score"].table)
+        }
+
+        axis_codes = [
+            (dates - first).astype(np.int64),
+            hours,
+            severity,
+            _codes(df["Weather_Conditions"], labels["Weather_Conditions"]),
+            _codes(df["Road_Type"], labels["Road_Type"])
+        ]
+        shape = tuple(len(labels[axis]) for axis in AXES)
+
+        # One flat cell index per row, counted in a single pass
+        flat = np.ravel_multi_index([codes[valid] for codes in axis_codes], shape)
+        counts = np.bincount(flat, minlength=int(np.prod(shape)))
+        counts = counts.astype(_count_dtype(counts.max(initial=0))).reshape(shape)
+
+        cube = cls(counts, labels)
+        cube.skipped_rows = int((~valid).sum())
+        return cube
+
+
+    # Selection
+
+    def _axis_selection(self, axis, values):
+        """Positions along axis whose label (or derived value) is in values"""
+        if isinstance(values, (str, int, np.integer)):
+            values = [values]
+
+        if axis in DERIVED_DIMENSIONS:
+            source = DERIVED_DIMENSIONS[axis][0]
+            return source, np.isin(self.derived[axis], list(values))
+
+        return axis, np.isin(self.labels[axis], list(values))
+
+    def select(self, date_from=None, date_to=None, filters=None):
+        """
+        Sub-cube of the accidents matching every filter:
+
+            cube.select("2012-01-01", "2012-12-31", {
+                "Severity_Label": ["High", "Medium"],
+                "Time_Category": ["Evening", "Night"],
+                "Is_Weekend": 1
+            })
+
+        filters: dimension (a stored axis or derived dimension) -> value or list of values
+        """
+        dates = self.labels["Date"]
+        start = 0 if date_from is None else np.searchsorted(dates, np.datetime64(pd.Timestamp(date_from), "D"))
+        stop = len(dates) if date_to is None else np.searchsorted(dates, np.datetime64(pd.Timestamp(date_to), "D"), "right")
+
+        counts = self.counts[start:stop]
+        labels = dict(self.labels, Date=dates[start:stop])
+
+        masks = {}
+        for dimension, values in (filters or {}).items():
+            if values is None:
+                continue
+            axis, mask = self._axis_selection(dimension, values)
+            if axis == "Date":
+                mask = mask[start:stop]
+            masks[axis] = masks[axis] & mask if axis in masks else mask
+
+        # Only the filtered axes are copied, each narrowed once
+        for axis, mask in masks.items():
+            position = AXES.index(axis)
+            counts = np.compress(mask, counts, axis=position)
+            labels[axis] = labels[axis][mask]
+
+        return OlapCube(counts, labels)
+
+
+    # Aggregation
+
+    def total(self):
+        return len(self)
+
+    def marginal(self, dimension):
+        """Accidents per label of a stored axis or derived dimension (pd.Series)"""
+        axis, derived = DERIVED_DIMENSIONS.get(dimension, (dimension, None))
+        position = AXES.index(axis)
+
+        others = tuple(i for i in range(len(AXES)) if i != position)
+        sums = self.counts.sum(axis=others, dtype=np.int64)
+        series = pd.Series(sums, index=pd.Index(self.labels[axis], name=axis), name="Accidents")
+
+        if derived is None:
+            return series
+        return series.groupby(self.derived[dimension]).sum().rename_axis(dimension)
+
+    def marginals(self, *dimensions):
+        """
+        Several marginals sharing one pass over the cube: the axes none of
+        them need are summed away first
+        """
+        axes = {DERIVED_DIMENSIONS.get(dimension, (dimension,))[0] for dimension in dimensions}
+        unused = tuple(i for i, axis in enumerate(AXES) if axis not in axes)
+
+        reduced = self.counts.sum(axis=unused, dtype=np.int64, keepdims=True)
+        narrowed = OlapCube.__new__(OlapCube)
+        narrowed.counts, narrowed.labels, narrowed.derived = reduced, self.labels, self.derived
+
+        return {dimension: narrowed.marginal(dimension) for dimension in dimensions}
+
+
+    # Persistence
+
+    def save(self, path=OLAP_CUBE_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        np.savez_compressed(
+            path,
+            counts=self.counts,
+            **{f"labels_{axis}": self.labels[axis].astype(str) for axis in AXES if axis != "Date"},
+            date_start=self.labels["Date"][:1]
+        )
+
+    @classmethod
+    def load(cls, path=OLAP_CUBE_PATH):
+        with np.load(path, allow_pickle=False) as data:
+            counts = data["counts"]
+            labels = {axis: data[f"labels_{axis}"] for axis in AXES if axis != "Date"}
+            start = data["date_start"][0]
+
+        labels["Date"] = start + np.arange(counts.shape[0])
+        labels["Hour"] = labels["Hour"].astype(np.int64)
+        return cls(counts, labels)
+
+
+
+# Build
+
+def build_olap_cube(name=ML_READY_DATASET, path=OLAP_CUBE_PATH):
+    print("Loading cube dimensions...")
+    df = load_dataset(name, columns=SOURCE_COLUMNS)
+
+    print("Building OLAP cube...")
+    start = time.perf_counter()
+    try:
+        cube = OlapCube.from_dataframe(df)
+    except ValueError as err:
+        print(f"OLAP cube not built: {err}")
+        return None
+    cube.save(path)
+
+    shape = " x ".join(f"{size} {axis}" for axis, size in cube.shape.items())
+    print(f"OLAP cube saved ({len(cube)} accidents, {shape}, {cube.counts.dtype}) at: {path}")
+    if cube.skipped_rows:
+        print(f"Skipped {cube.skipped_rows} rows without a valid date, hour or severity")
+    print(f"Built in {time.perf_counter() - start:.2f} s ({os.path.getsize(path) / 1e6:.1f} MB on disk)")
+    return cube
+
+
+if __name__ == "__main__":
+    if build_olap_cube() is None:
+        sys.exit(1)
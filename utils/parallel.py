@@ -0,0 +1,133 @@
+"""
+Parallel Execution Module
+Smart City Traffic Analytics System
+
+Splits a DataFrame into ordered row partitions and runs row-local
+pipeline steps on them in a process pool.
+
+Where the platform supports fork, workers inherit the source frame and
+only receive (start, end) row bounds, so partitions are never pickled on
+the way in. On the way back object columns travel as categoricals (a
+fraction of the pickling cost) and are restored in the parent, so
+results are exactly what the function returned, in partition order.
+"""
+
+import os
+import multiprocessing
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+
+
+# Frame shared with forked workers (set only while a PartitionPool is open)
+_SOURCE_FRAME = None
+
+
+def resolve_workers(n_workers):
+    """None or 0 means one worker per CPU core"""
+    if not n_workers:
+        return os.cpu_count() or 1
+    return max(1, int(n_workers))
+
+
+def partition_bounds(n_rows, n_partitions):
+    """(start, end) row bounds of n contiguous partitions"""
+    bounds = np.linspace(0, n_rows, n_partitions + 1, dtype=int)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def _encode_result(result):
+    """Worker side: send object columns back as categoricals"""
+    if not isinstance(result, pd.DataFrame):
+        return result, None
+
+    object_cols = list(result.select_dtypes(include="object").columns)
+    return result.astype({col: "category" for col in object_cols}), object_cols
+
+
+def _decode_result(encoded):
+    """Parent side: restore the original object columns"""
+    result, object_cols = encoded
+    if object_cols:
+        result = result.astype({col: "object" for col in object_cols})
+    return result
+
+
+# Each worker owns its partition, so pandas' chained-assignment
+# (SettingWithCopy) heuristics only produce false positives there
+
+def _run_on_slice(func, partition, args):
+    with pd.option_context("mode.chained_assignment", None):
+        return _encode_result(func(partition, *args))
+
+
+def _run_on_shared_slice(func, start, end, args):
+    with pd.option_context("mode.chained_assignment", None):
+        return _encode_result(func(_SOURCE_FRAME.iloc[start:end].copy(), *args))
+
+
+class PartitionPool:
+    """
+    Process pool bound to one source DataFrame.
+
+    map(func, *args) runs func(partition, *args) on every partition and
+    returns the results in row order. The same pool can run several
+    passes over the source (e.g. a reduction pass, then a map pass).
+    """
+
+    def __init__(self, df, n_workers):
+        self.df = df
+        self.n_workers = resolve_workers(n_workers)
+        self.bounds = partition_bounds(len(df), self.n_workers)
+        self._shared = "fork" in multiprocessing.get_all_start_methods()
+        self._pool = None
+
+    def __enter__(self):
+        global _SOURCE_FRAME
+
+        if self._shared:
+            _SOURCE_FRAME = self.df
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.n_workers,
+                mp_context=multiprocessing.get_context("fork")
+            )
+        else:
+            self._pool = ProcessPoolExecutor(max_workers=self.n_workers)
+
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        global _SOURCE_FRAME
+
+        self._pool.shutdown()
+        _SOURCE_FRAME = None
+
+    def map(self, func, *args):
+        if self._shared:
+            futures = [
+                self._pool.submit(_run_on_shared_slice, func, start, end, args)
+                for start, end in self.bounds
+            ]
+        else:
+            futures = [
+                self._pool.submit(_run_on_slice, func, self.df.iloc[start:end], args)
+                for start, end in self.bounds
+            ]
+
+        return [_decode_result(future.result()) for future in futures]
+
+
+def run_partitioned(func, df, n_workers, *args):
+    """
+    Apply a row-local function to df across n_workers processes.
+    Falls back to a direct call for a single worker.
+    """
+    n_workers = resolve_workers(n_workers)
+
+    if n_workers == 1:
+        return func(df, *args)
+
+    with PartitionPool(df, n_workers) as pool:
+        results = pool.map(func, *args)
+
+    return pd.concat(results)
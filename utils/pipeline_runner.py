@@ -0,0 +1,483 @@
+"""
+Pipeline Runner
+Smart City Traffic Analytics System
+
+Runs the end-to-end pipeline as a DAG of stages:
+
+    clean -> features -> insert_db / train / forecast / heatmap / eda
+    clean -> spatial_index
+                         train -> shap
+
+Handles:
+- Content-addressed stage cache: a stage's key hashes its input files,
+  its code (the script plus every local module it imports), its
+  parameters and the environment variables that code reads (.env included)
+- Skipping stages whose key is unchanged and whose outputs are intact;
+  outputs of earlier keys are restored from the cache instead of recomputed
+- Keeping only the most recent PIPELINE_CACHE_KEEP cached outputs per stage
+- Concurrent execution of independent stages
+- File hashes memoized by (size, mtime), so unchanged data is not re-read
+
+Usage:
+    python -m utils.pipeline_runner                 # everything
+    python -m utils.pipeline_runner heatmap         # heatmap and its upstream stages
+    python -m utils.pipeline_runner --dry-run       # show what would run
+"""
+
+import argparse
+import ast
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from dotenv import load_dotenv
+
+# Stage scripts read .env through database/db_connection.py; load it here
+# too, so the environment hashed into stage keys is the one they will see
+load_dotenv()
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_DIR = os.path.join(BASE_DIR, ".cache", "pipeline")
+FILE_HASHES_PATH = os.path.join(CACHE_DIR, "file_hashes.json")
+STAGE_RECORDS_DIR = os.path.join(CACHE_DIR, "stages")
+OBJECTS_DIR = os.path.join(CACHE_DIR, "objects")
+
+# Packages whose modules count as stage code
+LOCAL_PACKAGES = ("utils", "database", "models")
+
+HASH_BLOCK_SIZE = 1 << 20
+
+# Cached output copies kept per stage (older keys are evicted)
+PIPELINE_CACHE_KEEP = int(os.getenv("PIPELINE_CACHE_KEEP", "3"))
+
+
+
+# Stage Definitions
+
+class Stage:
+    """
+    One pipeline step: a script run with cwd=BASE_DIR.
+    inputs/outputs are paths relative to BASE_DIR (files or directories).
+    args are part of the stage key; run_args (e.g. a worker count) only
+    change how the stage runs, not its outputs, and are not.
+    """
+
+    def __init__(self, name, script, deps=(), inputs=(), outputs=(), args=(), run_args=()):
+        self.name = name
+        self.script = script
+        self.deps = list(deps)
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.args = list(args)
+        self.run_args = list(run_args)
+
+
+CLEANED_DIR = "data/processed/cleaned_accidents"
+ML_READY_DIR = "data/processed/ml_ready_accidents"
+MODEL_DIR = "models/trained_models"
+
+EDA_FIGURES = [
+    "reports/accident_trend_by_year.png",
+    "reports/accidents_by_hour.png",
+    "reports/severity_distribution.png",
+    "reports/weather_impact.png",
+    "reports/road_type_impact.png",
+    "reports/correlation_heatmap.png"
+]
+
+
+def build_stages(workers=1):
+    stages = [
+        Stage(
+            "clean", "utils/data_cleaning.py",
+            inputs=["data/raw/UK_Accident.csv"],
+            outputs=[CLEANED_DIR],
+            run_args=["--workers", str(workers)]
+        ),
+        Stage(
+            "features", "utils/feature_engineering.py",
+            deps=["clean"],
+            inputs=[CLEANED_DIR],
+            outputs=[ML_READY_DIR],
+            run_args=["--workers", str(workers)]
+        ),
+        Stage(
+            "spatial_index", "utils/spatial_index.py",
+            deps=["clean"],
+            inputs=[CLEANED_DIR],
+            outputs=["data/processed/spatial_index.npz"]
+        ),
+        Stage(
+            "cube", "utils/olap_cube.py",
+            deps=["features"],
+            inputs=[ML_READY_DIR],
+            outputs=["data/processed/olap_cube.npz"]
+        ),
+        # Loads the database; no files to cache, so it re-runs only when the data changes
+        Stage("insert_db", "database/insert_data.py", deps=["features"], inputs=[ML_READY_DIR]),
+        Stage("train", "models/train_model.py", deps=["features"], inputs=[ML_READY_DIR], outputs=[MODEL_DIR]),
+        Stage(
+            "shap", "models/shap_explainability.py",
+            deps=["features", "train"],
+            inputs=[ML_READY_DIR, MODEL_DIR + "/best_model.pkl"],
+            outputs=["reports/shap"]
+        ),
+        Stage("forecast", "models/forecasting.py", deps=["features"], inputs=[ML_READY_DIR], outputs=["reports/forecast"]),
+        Stage("heatmap", "utils/generate_heatmap.py", deps=["features"], inputs=[ML_READY_DIR], outputs=["reports/heatmap"]),
+        Stage("eda", "notebooks/eda_analysis.py", deps=["features"], inputs=[ML_READY_DIR], outputs=EDA_FIGURES)
+    ]
+    return {stage.name: stage for stage in stages}
+
+
+
+# Content Hashing
+
+class FileHasher:
+    """SHA-256 of files, memoized by (size, mtime) across runs"""
+
+    def __init__(self, path=FILE_HASHES_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._memo = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                self._memo = json.load(f)
+
+    def file_hash(self, path):
+        stat = os.stat(path)
+        signature = [stat.st_size, stat.st_mtime_ns]
+
+        with self._lock:
+            cached = self._memo.get(path)
+        if cached and cached[0] == signature:
+            return cached[1]
+
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+                digest.update(block)
+
+        with self._lock:
+            self._memo[path] = [signature, digest.hexdigest()]
+        return digest.hexdigest()
+
+    def path_hash(self, rel_path):
+        """Hash of a file or directory tree; None if it does not exist"""
+        path = os.path.join(BASE_DIR, rel_path)
+
+        if os.path.isfile(path):
+            return self.file_hash(path)
+        if not os.path.isdir(path):
+            return None
+
+        digest = hashlib.sha256()
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                file_path = os.path.join(root, name)
+                digest.update(os.path.relpath(file_path, path).encode())
+                digest.update(self.file_hash(file_path).encode())
+        return digest.hexdigest()
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self._lock:
+            memo = dict(self._memo)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(memo, f)
+        os.replace(tmp_path, self.path)
+
+
+def _local_imports(script):
+    """Local modules (as file paths relative to BASE_DIR) imported by a script"""
+    with open(os.path.join(BASE_DIR, script)) as f:
+        tree = ast.parse(f.read())
+
+    modules = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            modules.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            modules.add(node.module)
+
+    paths = []
+    for module in modules:
+        if module.split(".")[0] not in LOCAL_PACKAGES:
+            continue
+        path = module.replace(".", "/") + ".py"
+        if os.path.exists(os.path.join(BASE_DIR, path)):
+            paths.append(path)
+    return paths
+
+
+def code_files(script):
+    """The script and every local module reachable from its imports"""
+    seen = set()
+    pending = [script]
+    while pending:
+        path = pending.pop()
+        if path in seen:
+            continue
+        seen.add(path)
+        pending.extend(_local_imports(path))
+    return sorted(seen)
+
+
+def _env_reads(path):
+    """Names of the environment variables a file reads (os.getenv / os.environ)"""
+    with open(os.path.join(BASE_DIR, path)) as f:
+        tree = ast.parse(f.read())
+
+    def is_environ(node):
+        return (
+            isinstance(node, ast.Attribute) and node.attr == "environ"
+            and isinstance(node.value, ast.Name) and node.value.id == "os"
+        )
+
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Call) and node.args and isinstance(node.args[0], ast.Constant):
+            func = node.func
+            if isinstance(func, ast.Attribute) and (
+                (func.attr == "getenv" and isinstance(func.value, ast.Name) and func.value.id == "os")
+                or (func.attr == "get" and is_environ(func.value))
+            ):
+                names.add(node.args[0].value)
+        elif isinstance(node, ast.Subscript) and is_environ(node.value) and isinstance(node.slice, ast.Constant):
+            names.add(node.slice.value)
+    return names
+
+
+def stage_key(stage, hasher):
+    """Content hash of everything a stage's outputs depend on"""
+    code = code_files(stage.script)
+    env_names = sorted(set().union(*(_env_reads(path) for path in code)))
+
+    manifest = {
+        "stage": stage.name,
+        "args": stage.args,
+        "python": sys.version.split()[0],
+        "code": {path: hasher.path_hash(path) for path in code},
+        "inputs": {path: hasher.path_hash(path) for path in stage.inputs},
+        # e.g. DB_BACKEND: the same code and data can give other outputs
+        "env": {name: os.environ.get(name) for name in env_names}
+    }
+    return hashlib.sha256(json.dumps(manifest, sort_keys=True).encode()).hexdigest()
+
+
+
+# Stage Cache
+
+def _record_path(stage):
+    return os.path.join(STAGE_RECORDS_DIR, f"{stage.name}.json")
+
+
+def load_record(stage):
+    """Key and output hashes of the stage's last successful run"""
+    if not os.path.exists(_record_path(stage)):
+        return None
+    with open(_record_path(stage)) as f:
+        return json.load(f)
+
+
+def store_outputs(stage, key, hasher):
+    """Record the run and keep a copy of its outputs under the key"""
+    outputs = {path: hasher.path_hash(path) for path in stage.outputs}
+
+    object_dir = os.path.join(OBJECTS_DIR, stage.name, key)
+    if os.path.exists(object_dir):
+        shutil.rmtree(object_dir)
+    for path in stage.outputs:
+        source = os.path.join(BASE_DIR, path)
+        target = os.path.join(object_dir, path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        if os.path.isdir(source):
+            shutil.copytree(source, target)
+        elif os.path.exists(source):
+            shutil.copy2(source, target)
+
+    os.makedirs(STAGE_RECORDS_DIR, exist_ok=True)
+    with open(_record_path(stage), "w") as f:
+        json.dump({"key": key, "outputs": outputs}, f, indent=2)
+
+    prune_outputs(stage)
+
+
+def prune_outputs(stage, keep=PIPELINE_CACHE_KEEP):
+    """Delete all but the keep most recently stored output copies of a stage"""
+    stage_dir = os.path.join(OBJECTS_DIR, stage.name)
+    if not os.path.isdir(stage_dir):
+        return
+
+    entries = sorted(
+        (entry for entry in os.scandir(stage_dir) if entry.is_dir()),
+        key=lambda entry: entry.stat().st_mtime_ns,
+        reverse=True
+    )
+    for entry in entries[keep:]:
+        shutil.rmtree(entry.path)
+
+
+def restore_outputs(stage, key, hasher):
+    """
+    Bring the stage's outputs to the cached state for key.
+    Returns 'cached' (already there), 'restored', or None when key was never cached.
+    """
+    record = load_record(stage)
+    if record and record["key"] == key and all(
+        hasher.path_hash(path) == digest for path, digest in record["outputs"].items()
+    ):
+        return "cached"
+
+    # Stages without file outputs (database loads) cannot be restored
+    object_dir = os.path.join(OBJECTS_DIR, stage.name, key)
+    if not stage.outputs or not os.path.isdir(object_dir):
+        return None
+
+    for path in stage.outputs:
+        source = os.path.join(object_dir, path)
+        target = os.path.join(BASE_DIR, path)
+        if os.path.isdir(target):
+            shutil.rmtree(target)
+        if os.path.isdir(source):
+            shutil.copytree(source, target)
+        elif os.path.exists(source):
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copy2(source, target)
+
+    store_outputs(stage, key, hasher)
+    return "restored"
+
+
+
+# Execution
+
+def select_stages(stages, targets):
+    """Targets plus all their upstream stages (everything if no targets)"""
+    if not targets:
+        return set(stages)
+
+    selected = set()
+    pending = list(targets)
+    while pending:
+        name = pending.pop()
+        if name not in stages:
+            raise KeyError(f"Unknown stage '{name}'. Stages: {', '.join(stages)}")
+        if name not in selected:
+            selected.add(name)
+            pending.extend(stages[name].deps)
+    return selected
+
+
+def run_stage(stage, hasher, force=False, dry_run=False):
+    """Returns 'cached', 'restored', 'ran', 'would run' or 'failed'"""
+    key = stage_key(stage, hasher)
+
+    if not force:
+        record = load_record(stage)
+        if dry_run and record and record["key"] == key:
+            return "cached"
+        if not dry_run:
+            status = restore_outputs(stage, key, hasher)
+            if status:
+                return status
+
+    if dry_run:
+        return "would run"
+
+    print(f"[{stage.name}] running {stage.script}...", flush=True)
+    result = subprocess.run(
+        [sys.executable, stage.script, *stage.args, *stage.run_args],
+        cwd=BASE_DIR,
+        env={**os.environ, "MPLBACKEND": "Agg"},
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True
+    )
+
+    log_path = os.path.join(CACHE_DIR, "logs", f"{stage.name}.log")
+    os.makedirs(os.path.dirname(log_path), exist_ok=True)
+    with open(log_path, "w") as f:
+        f.write(result.stdout)
+
+    if result.returncode != 0:
+        print(f"[{stage.name}] failed (exit {result.returncode}), log: {log_path}", flush=True)
+        return "failed"
+
+    # Inputs were hashed before the run; the key stays valid for those contents
+    store_outputs(stage, key, hasher)
+    return "ran"
+
+
+def run_pipeline(targets=None, workers=1, jobs=None, force=False, dry_run=False):
+    """
+    Run the selected stages in dependency order, independent stages
+    concurrently. Returns {stage: status}.
+    """
+    stages = build_stages(workers)
+    selected = select_stages(stages, targets)
+    hasher = FileHasher()
+
+    statuses = {}
+    running = {}
+    jobs = jobs or len(selected)
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        while len(statuses) < len(selected):
+            for name in selected:
+                if name in statuses or name in running.values():
+                    continue
+                deps = [dep for dep in stages[name].deps if dep in selected]
+
+                if any(statuses.get(dep) in ("failed", "skipped") for dep in deps):
+                    statuses[name] = "skipped"
+                    print(f"[{name}] skipped (upstream failure)", flush=True)
+                # A dry run cannot know downstream keys until upstream stages run
+                elif any(statuses.get(dep) == "would run" for dep in deps):
+                    statuses[name] = "would run"
+                    print(f"[{name}] would run", flush=True)
+                elif all(dep in statuses for dep in deps):
+                    future = pool.submit(run_stage, stages[name], hasher, force, dry_run)
+                    running[future] = name
+
+            if not running:
+                continue
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                statuses[name] = future.result()
+                print(f"[{name}] {statuses[name]}", flush=True)
+
+    hasher.save()
+    return statuses
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the pipeline stages whose inputs changed")
+    parser.add_argument("stages", nargs="*", help="Stages to bring up to date (default: all)")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes for cleaning and features")
+    parser.add_argument("--jobs", type=int, default=None, help="Maximum stages running at once")
+    parser.add_argument("--force", action="store_true", help="Re-run the stages even if cached")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would run")
+    parser.add_argument("--list", action="store_true", help="List the stages and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        for stage in build_stages().values():
+            print(f"{stage.name:<10} {stage.script:<32} deps: {', '.join(stage.deps) or '-'}")
+        sys.exit(0)
+
+    start = time.perf_counter()
+    statuses = run_pipeline(args.stages, args.workers, args.jobs, args.force, args.dry_run)
+    print(f"Pipeline finished in {time.perf_counter() - start:.1f} s")
+
+    if "failed" in statuses.values():
+        sys.exit(1)
@@ -0,0 +1,193 @@
+"""
+Dataset Schema Registry
+Smart City Traffic Analytics System
+
+Compact dtypes for every column of the raw, cleaned and ML-ready
+datasets, applied by all loaders.
+
+Handles:
+- int8/int16 for small counts, codes and scores
+- float32 for coordinates (~0.5 m precision at UK latitudes)
+- category for string columns
+- Safe downcasting (a column is left as-is if values would not fit)
+- Per-column memory savings report
+"""
+
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+
+# Raw CSV (applied at read time)
+# Only dtypes that are safe before missing values are filled: string
+# columns must stay object for the "Unknown" fill.
+
+RAW_SCHEMA = {
+    "Accident_Index": "object",
+    "Latitude": "float32",
+    "Longitude": "float32",
+    "LSOA_of_Accident_Location": "object"
+}
+
+
+# Cleaned dataset
+
+CLEANED_SCHEMA = {
+    "Accident_Index": "object",
+    "Location_Easting_OSGR": "float32",
+    "Location_Northing_OSGR": "float32",
+    "Longitude": "float32",
+    "Latitude": "float32",
+    "Police_Force": "int8",
+    "Accident_Severity": "int8",
+    "Number_of_Vehicles": "int8",
+    "Number_of_Casualties": "int8",
+    "Day_of_Week": "int8",
+    "Time": "category",
+    "Local_Authority_(District)": "category",
+    "Local_Authority_(Highway)": "category",
+    "1st_Road_Class": "int8",
+    "1st_Road_Number": "int16",
+    "Road_Type": "category",
+    "Speed_limit": "int8",
+    "Junction_Control": "category",
+    "2nd_Road_Class": "int8",
+    "2nd_Road_Number": "int16",
+    "Pedestrian_Crossing-Human_Control": "category",
+    "Pedestrian_Crossing-Physical_Facilities": "category",
+    "Light_Conditions": "category",
+    "Weather_Conditions": "category",
+    "Road_Surface_Conditions": "category",
+    "Special_Conditions_at_Site": "category",
+    "Carriageway_Hazards": "category",
+    "Urban_or_Rural_Area": "int8",
+    "Did_Police_Officer_Attend_Scene_of_Accident": "category",
+    "LSOA_of_Accident_Location": "category",
+    "Year": "int16",
+    "Hour": "int8",
+    "Minute": "int8"
+}
+
+
+# ML-ready dataset (cleaned columns + engineered features)
+
+ML_READY_SCHEMA = {
+    **CLEANED_SCHEMA,
+    "Time_Category": "category",
+    "Is_Weekend": "int8",
+    "Weather_Severity_Index": "int8",
+    "Road_Risk_Score": "int8",
+    "Severity_Label": "category"
+}
+
+
+
+# Conversion
+
+def _convert(series, dtype):
+    """Converted series, or None when the conversion is not safe"""
+    if str(series.dtype) == dtype:
+        return None
+
+    if dtype == "category":
+        if pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series):
+            return series.astype("category")
+        return None
+
+    if dtype == "object":
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            return series.astype("object")
+        return None
+
+    if not pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+        return None
+
+    target = np.dtype(dtype)
+
+    if target.kind == "f":
+        return series.astype(target)
+
+    # Integer targets: no missing values, whole numbers, within range
+    values = series.to_numpy()
+    if series.isna().any():
+        return None
+    if values.dtype.kind == "f" and not np.array_equal(values, np.floor(values)):
+        return None
+
+    info = np.iinfo(target)
+    if len(values) and (values.min() < info.min or values.max() > info.max):
+        return None
+
+    return series.astype(target)
+
+
+def apply_schema(df, schema, report=False):
+    """
+    Convert df's columns to the dtypes declared in schema (in place).
+    Columns not in the schema, or whose values would not fit, are kept.
+    """
+    before = df.memory_usage(deep=True, index=False) if report else None
+
+    for col, dtype in schema.items():
+        if col not in df.columns:
+            continue
+        converted = _convert(df[col], dtype)
+        if converted is not None:
+            df[col] = converted
+
+    if report:
+        print_memory_report(before, df.memory_usage(deep=True, index=False))
+
+    return df
+
+
+def widen_dtypes(df):
+    """Default pandas dtypes (int64 / float64 / object), as read_csv would give"""
+    widened = {}
+    for col in df.columns:
+        kind = df[col].dtype.kind
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            widened[col] = "object"
+        elif kind in "iu":
+            widened[col] = "int64"
+        elif kind == "f":
+            widened[col] = "float64"
+    return df.astype(widened)
+
+
+
+# Memory Report
+
+def memory_report(before, after):
+    """Per-column bytes before/after and savings (from memory_usage(deep=True))"""
+    report = pd.DataFrame({"before_bytes": before, "after_bytes": after})
+    report["saved_bytes"] = report["before_bytes"] - report["after_bytes"]
+    report["saved_pct"] = (100 * report["saved_bytes"] / report["before_bytes"]).round(1)
+    return report.sort_values("saved_bytes", ascending=False)
+
+
+def print_memory_report(before, after):
+    report = memory_report(before, after)
+    print(report.to_string())
+
+    total_before = report["before_bytes"].sum()
+    total_after = report["after_bytes"].sum()
+    print(
+        f"Total: {total_before / 1e6:.1f} MB -> {total_after / 1e6:.1f} MB "
+        f"({total_before / max(total_after, 1):.1f}x smaller)"
+    )
+
+
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from utils.data_store import CLEANED_DATASET, ML_READY_DATASET, load_dataset
+
+    for name, schema in [(CLEANED_DATASET, CLEANED_SCHEMA), (ML_READY_DATASET, ML_READY_SCHEMA)]:
+        print(f"\nMemory report: {name}")
+        df = load_dataset(name)
+        wide = widen_dtypes(df)
+        print_memory_report(
+            wide.memory_usage(deep=True, index=False),
+            apply_schema(wide, schema).memory_usage(deep=True, index=False)
+        )
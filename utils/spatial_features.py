@@ -0,0 +1,209 @@
+"""
+Neighbourhood Features Module
+Smart City Traffic Analytics System
+
+Location risk features: for each accident, how many accidents (and how
+many severe ones) happened nearby before it.
+
+Handles:
+- Several radii x time windows in one pass
+- Leakage safety: only accidents on strictly earlier dates are counted
+- Grid cells sized to the largest radius, so each accident only looks
+  at a small block of surrounding cells
+- Points sorted by (cell, date): each time window is a searchsorted range,
+  and only those candidates get an exact haversine distance check
+- Pair expansion in bounded batches, so memory stays flat for millions of rows
+- Scoring new rows against a history (incremental runs)
+"""
+
+import numpy as np
+import pandas as pd
+
+from utils.spatial_index import EARTH_RADIUS_M, REFERENCE_LATITUDE, SpatialIndex
+
+
+RADII_M = (250, 1000)
+WINDOWS_DAYS = {"1y": 365, "3y": 1095}
+
+# Fatal + serious (Accident_Severity codes)
+SEVERE_CODES = (1, 2)
+
+# Each accident looks this many cells out in every direction. Cells are
+# sized so that distance covers the largest radius; two cells per radius
+# check ~30% fewer candidate pairs than one
+NEIGHBOUR_CELLS = 2
+
+# Candidate pairs checked per batch
+PAIR_BATCH_SIZE = 20_000_000
+
+NEIGHBOUR_OFFSETS = [
+    (dx, dy)
+    for dx in range(-NEIGHBOUR_CELLS, NEIGHBOUR_CELLS + 1)
+    for dy in range(-NEIGHBOUR_CELLS, NEIGHBOUR_CELLS + 1)
+]
+
+
+def feature_names(radii=RADII_M, windows=WINDOWS_DAYS):
+    names = []
+    for radius in radii:
+        for label in windows:
+            names.append(f"Nearby_Accidents_{radius}m_{label}")
+            names.append(f"Nearby_Severe_{radius}m_{label}")
+    return names
+
+
+SPATIAL_FEATURES = feature_names()
+
+# Columns needed from every accident (query or neighbour)
+NEIGHBOURHOOD_INPUTS = ["Latitude", "Longitude", "Accident_Severity", "Date"]
+
+
+def _day_numbers(dates):
+    return (pd.to_datetime(dates).to_numpy(dtype="datetime64[D]") - np.datetime64("1970-01-01", "D")).astype(np.int64)
+
+
+
+# Counting
+
+def prior_neighbour_counts(reference, queries, radii=RADII_M, windows=WINDOWS_DAYS):
+    """
+    Counts of reference accidents within each radius and window before
+    each query accident.
+
+    reference, queries: frames with Latitude, Longitude, Date
+                        (reference also Accident_Severity)
+    Returns a DataFrame aligned with queries, one int32 column per feature.
+    """
+    names = feature_names(radii, windows)
+    if not len(queries) or not len(reference):
+        return pd.DataFrame({name: np.zeros(len(queries), dtype=np.int32) for name in names}, index=queries.index)
+
+    max_radius = max(radii)
+    max_window = max(windows.values())
+
+    ref_days = _day_numbers(reference["Date"])
+    query_days = _day_numbers(queries["Date"])
+
+    ref_lat = reference["Latitude"].to_numpy(dtype=np.float64)
+    q_lat = queries["Latitude"].to_numpy(dtype=np.float64)
+    q_lon = queries["Longitude"].to_numpy(dtype=np.float64)
+
+    # North of REFERENCE_LATITUDE the grid projection stretches east-west
+    # distances, so cells grow accordingly to keep the radius covered
+    max_lat = max(np.abs(ref_lat).max(), np.abs(q_lat).max())
+    stretch = max(1.0, np.cos(np.radians(REFERENCE_LATITUDE)) / np.cos(np.radians(max_lat))) * 1.01
+
+    # Stable sort by date first, so every grid cell lists its points in date order
+    by_day = np.argsort(ref_days, kind="stable")
+    index = SpatialIndex.build(
+        ref_lat[by_day],
+        reference["Longitude"].to_numpy()[by_day],
+        reference["Accident_Severity"].to_numpy()[by_day],
+        ref_days[by_day].astype("datetime64[D]"),
+        cell_size=max_radius * stretch / NEIGHBOUR_CELLS
+    )
+    days = index.days.astype(np.int64)
+    severe = np.isin(index.severity, SEVERE_CODES)
+
+    # One sorted key per point: cell id, then day (offset so windows never cross cells)
+    first_day = min(days.min(), query_days.min()) - max_window
+    span = max(days.max(), query_days.max()) - first_day + 1
+    point_cells = np.repeat(index.cell_ids, np.diff(index.starts))
+    keys = point_cells * span + (days - first_day)
+
+    # Queries in (cell, day) order, so lookups and pair gathers walk memory in order
+    n_queries = len(queries)
+    cx, cy = index.cell_coords(q_lat, q_lon)
+    q_order = np.lexsort((query_days, cy, cx))
+    cx, cy, q_lat, q_lon, query_days = cx[q_order], cy[q_order], q_lat[q_order], q_lon[q_order], query_days[q_order]
+
+    # Key ranges [day - max_window, day) in each neighbouring cell
+
+    low = np.zeros((n_queries, len(NEIGHBOUR_OFFSETS)), dtype=np.int64)
+    high = np.zeros_like(low)
+    for j, (dx, dy) in enumerate(NEIGHBOUR_OFFSETS):
+        ncx, ncy = cx + dx, cy + dy
+        valid = (ncx >= 0) & (ncx < index.shape[0]) & (ncy >= 0) & (ncy < index.shape[1])
+        base = (ncx * index.shape[1] + ncy) * span - first_day
+        low[:, j] = np.where(valid, np.searchsorted(keys, base + query_days - max_window), 0)
+        high[:, j] = np.where(valid, np.searchsorted(keys, base + query_days), 0)
+
+    counts = {name: np.zeros(n_queries, dtype=np.int32) for name in names}
+
+    # Batches of queries whose candidate pairs fit in PAIR_BATCH_SIZE
+    pairs_per_query = (high - low).sum(axis=1)
+    cumulative = np.cumsum(pairs_per_query)
+    start = 0
+    while start < n_queries:
+        budget = (cumulative[start - 1] if start else 0) + PAIR_BATCH_SIZE
+        end = max(int(np.searchsorted(cumulative, budget, side="right")), start + 1)
+        _count_batch(
+            slice(start, end), low, high, index, days, severe,
+            q_lat, q_lon, query_days, radii, windows, counts
+        )
+        start = end
+
+    unsorted = {name: np.empty(n_queries, dtype=np.int32) for name in names}
+    for name in names:
+        unsorted[name][q_order] = counts[name]
+    return pd.DataFrame(unsorted, index=queries.index)
+
+
+def _count_batch(batch, low, high, index, days, severe, q_lat, q_lon, query_days, radii, windows, counts):
+    begin = low[batch].ravel()
+    lengths = high[batch].ravel() - begin
+    total = int(lengths.sum())
+    if not total:
+        return
+
+    # Expand the ranges into (query, candidate) pairs
+    query = np.repeat(np.repeat(np.arange(batch.start, batch.stop), low.shape[1]), lengths)
+    candidate = np.repeat(begin - np.cumsum(lengths) + lengths, lengths) + np.arange(total)
+
+    # Haversine term compared against each radius's threshold (no arcsin/sqrt per pair)
+    q_lat_rad = np.radians(q_lat[query])
+    ref_lat_rad = np.radians(index.lat[candidate])
+    a = (
+        np.sin((ref_lat_rad - q_lat_rad) / 2) ** 2
+        + np.cos(q_lat_rad) * np.cos(ref_lat_rad)
+        * np.sin(np.radians(index.lon[candidate] - q_lon[query]) / 2) ** 2
+    )
+    thresholds = np.sin(np.asarray(sorted(radii), dtype=np.float64) / (2 * EARTH_RADIUS_M)) ** 2
+    window_days = sorted(windows.values())
+
+    # Smallest radius / window each pair falls in (len = outside all of them)
+    radius_class = sum((a > threshold).astype(np.int64) for threshold in thresholds)
+    window_class = sum((query_days[query] - days[candidate] > window).astype(np.int64) for window in window_days)
+
+    # One bincount over (query, radius class, window class, severe)
+    shape = (batch.stop - batch.start, len(radii) + 1, len(windows) + 1, 2)
+    code = (((query - batch.start) * shape[1] + radius_class) * shape[2] + window_class) * 2 + severe[candidate]
+    table = np.bincount(code, minlength=np.prod(shape)).reshape(shape)
+
+    # Within radius r and window w = every smaller class too
+    table = table.cumsum(axis=1).cumsum(axis=2)
+
+    for i, radius in enumerate(sorted(radii)):
+        for label, window in windows.items():
+            j = window_days.index(window)
+            counts[f"Nearby_Accidents_{radius}m_{label}"][batch] = table[:, i, j, 0] + table[:, i, j, 1]
+            counts[f"Nearby_Severe_{radius}m_{label}"][batch] = table[:, i, j, 1]
+
+
+
+# Pipeline Hooks
+
+def add_neighbourhood_features(df, history=None):
+    """
+    Add the neighbourhood features to df.
+    history: earlier accidents (not in df) that also count as neighbours.
+    """
+    print("Creating neighbourhood accident-density features...")
+
+    columns = NEIGHBOURHOOD_INPUTS
+    reference = df[columns] if history is None else pd.concat([history[columns], df[columns]], ignore_index=True)
+
+    features = prior_neighbour_counts(reference, df)
+    for col in features.columns:
+        df[col] = features[col]
+    return df
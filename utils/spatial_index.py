@@ -0,0 +1,304 @@
+"""
+Spatial Index Module
+Smart City Traffic Analytics System
+
+Uniform grid over accident coordinates for location queries such as
+"severe accidents within 500 m of this junction in the last 3 years".
+
+Handles:
+- Equirectangular projection to metres (accurate to well under 1% at city scale)
+- Points sorted by grid cell, with a start offset per non-empty cell
+- Radius (haversine), bounding-box and k-nearest queries
+- Optional severity and date filters
+- Persistence to a single .npz file, reused by the dashboard's location
+  lookup while it is newer than the dataset it was built from
+
+Query results are row positions in the source dataset (as loaded by
+load_dataset), so callers can pull any other column for the matches.
+"""
+
+import argparse
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.data_store import CLEANED_DATASET, PROCESSED_DIR, dataset_mtime, load_dataset
+
+
+SPATIAL_INDEX_PATH = os.path.join(PROCESSED_DIR, "spatial_index.npz")
+
+EARTH_RADIUS_M = 6_371_000.0
+
+# Cells of this size keep a 500 m radius query to ~25 cells
+DEFAULT_CELL_SIZE_M = 250.0
+
+# Projection reference latitude (centre of Great Britain)
+REFERENCE_LATITUDE = 54.0
+
+EPOCH = np.datetime64("1970-01-01", "D")
+
+
+
+# Geometry
+
+def project(lat, lon):
+    """Equirectangular projection to metres around REFERENCE_LATITUDE"""
+    lat = np.radians(np.asarray(lat, dtype=np.float64))
+    lon = np.radians(np.asarray(lon, dtype=np.float64))
+    x = EARTH_RADIUS_M * lon * np.cos(np.radians(REFERENCE_LATITUDE))
+    y = EARTH_RADIUS_M * lat
+    return x, y
+
+
+def haversine_m(lat1, lon1, lat2, lon2):
+    """Great-circle distance in metres (vectorized)"""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=np.float64)) for v in (lat1, lon1, lat2, lon2))
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(a))
+
+
+def _to_days(dates):
+    """Dates (anything pandas can parse) as int32 days since 1970-01-01"""
+    values = pd.to_datetime(dates).to_numpy(dtype="datetime64[D]")
+    return (values - EPOCH).astype(np.int32)
+
+
+
+# Index
+
+class SpatialIndex:
+    """
+    Grid index over points sorted by cell.
+
+    Points of cell_ids[i] are rows starts[i]:starts[i + 1] of the sorted
+    arrays (lat, lon, severity, days, rows).
+    """
+
+    def __init__(self, arrays):
+        self.cell_size = float(arrays["cell_size"])
+        self.origin = arrays["origin"]          # (x0, y0) of cell (0, 0)
+        self.shape = arrays["shape"]            # (n_cells_x, n_cells_y)
+        self.cell_ids = arrays["cell_ids"]
+        self.starts = arrays["starts"]
+        self.lat = arrays["lat"]
+        self.lon = arrays["lon"]
+        self.severity = arrays["severity"]
+        self.days = arrays["days"]
+        self.rows = arrays["rows"]
+
+    def __len__(self):
+        return len(self.rows)
+
+    @classmethod
+    def build(cls, lat, lon, severity, dates, cell_size=DEFAULT_CELL_SIZE_M):
+        """Index points given as parallel arrays (dates may be None)"""
+        lat = np.asarray(lat, dtype=np.float64)
+        lon = np.asarray(lon, dtype=np.float64)
+        x, y = project(lat, lon)
+
+        origin = np.array([x.min(), y.min()]) if len(x) else np.zeros(2)
+        cx = ((x - origin[0]) // cell_size).astype(np.int64)
+        cy = ((y - origin[1]) // cell_size).astype(np.int64)
+        shape = np.array([cx.max() + 1, cy.max() + 1]) if len(x) else np.ones(2, dtype=np.int64)
+
+        cells = cx * shape[1] + cy
+        order = np.argsort(cells, kind="stable")
+        cell_ids, starts = np.unique(cells[order], return_index=True)
+
+        days = _to_days(dates) if dates is not None else np.zeros(len(lat), dtype=np.int32)
+
+        return cls({
+            "cell_size": cell_size,
+            "origin": origin,
+            "shape": shape,
+            "cell_ids": cell_ids,
+            "starts": np.append(starts, len(order)).astype(np.int64),
+            "lat": lat[order],
+            "lon": lon[order],
+            "severity": np.asarray(severity, dtype=np.int8)[order],
+            "days": days[order],
+            "rows": order.astype(np.int64)
+        })
+
+    @classmethod
+    def from_dataframe(cls, df, cell_size=DEFAULT_CELL_SIZE_M):
+        dates = df["Date"] if "Date" in df.columns else None
+        return cls.build(df["Latitude"], df["Longitude"], df["Accident_Severity"], dates, cell_size)
+
+    def save(self, path=SPATIAL_INDEX_PATH):
+        np.savez(path, **{
+            "cell_size": self.cell_size, "origin": self.origin, "shape": self.shape,
+            "cell_ids": self.cell_ids, "starts": self.starts, "lat": self.lat,
+            "lon": self.lon, "severity": self.severity, "days": self.days, "rows": self.rows
+        })
+
+    @classmethod
+    def load(cls, path=SPATIAL_INDEX_PATH):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Spatial index not found at {path}. Run: python utils/spatial_index.py")
+        with np.load(path) as arrays:
+            return cls({key: arrays[key] for key in arrays.files})
+
+
+    # Candidate Gathering
+
+    def cell_coords(self, lat, lon):
+        """Grid (cx, cy) of arbitrary points (outside the grid for far-away points)"""
+        x, y = project(lat, lon)
+        cx = ((x - self.origin[0]) // self.cell_size).astype(np.int64)
+        cy = ((y - self.origin[1]) // self.cell_size).astype(np.int64)
+        return cx, cy
+
+    def _search_radius(self, lat, radius_m):
+        """
+        Half-side (projected metres) of a square that holds every point
+        within radius_m: north of REFERENCE_LATITUDE the projection
+        stretches east-west distances.
+        """
+        stretch = np.cos(np.radians(REFERENCE_LATITUDE)) / np.cos(np.radians(lat))
+        return radius_m * max(1.0, float(stretch)) * 1.01 + 1
+
+    def _cell_range(self, x, y, radius_m):
+        """Cell coordinate bounds (inclusive) covering a square around (x, y)"""
+        low_x = int((x - radius_m - self.origin[0]) // self.cell_size)
+        high_x = int((x + radius_m - self.origin[0]) // self.cell_size)
+        low_y = int((y - radius_m - self.origin[1]) // self.cell_size)
+        high_y = int((y + radius_m - self.origin[1]) // self.cell_size)
+        return (
+            max(low_x, 0), min(high_x, int(self.shape[0]) - 1),
+            max(low_y, 0), min(high_y, int(self.shape[1]) - 1)
+        )
+
+    def _candidates(self, low_x, high_x, low_y, high_y):
+        """Sorted-array positions of all points in a block of cells"""
+        if low_x > high_x or low_y > high_y:
+            return np.empty(0, dtype=np.int64)
+
+        # Each grid column (fixed cx) is one contiguous run of cell ids
+        columns = np.arange(low_x, high_x + 1, dtype=np.int64) * self.shape[1]
+        first = np.searchsorted(self.cell_ids, columns + low_y, side="left")
+        last = np.searchsorted(self.cell_ids, columns + high_y, side="right")
+
+        begin = self.starts[first]
+        end = self.starts[last]
+        lengths = end - begin
+        total = int(lengths.sum())
+        if not total:
+            return np.empty(0, dtype=np.int64)
+
+        # Concatenated aranges of [begin, end) without a Python loop
+        offsets = np.repeat(begin - np.cumsum(lengths) + lengths, lengths)
+        return offsets + np.arange(total, dtype=np.int64)
+
+    def _filter(self, positions, severity=None, since=None, until=None):
+        if severity is not None:
+            positions = positions[np.isin(self.severity[positions], np.atleast_1d(severity))]
+        if since is not None:
+            positions = positions[self.days[positions] >= _to_days([since])[0]]
+        if until is not None:
+            positions = positions[self.days[positions] <= _to_days([until])[0]]
+        return positions
+
+
+    # Queries
+
+    def radius(self, lat, lon, radius_m, severity=None, since=None, until=None):
+        """
+        Dataset rows within radius_m metres of (lat, lon).
+        severity: Accident_Severity code(s), e.g. [1, 2] for fatal + serious
+        since/until: inclusive Date bounds
+        """
+        x, y = project(lat, lon)
+        positions = self._candidates(*self._cell_range(float(x), float(y), self._search_radius(lat, radius_m)))
+        positions = self._filter(positions, severity, since, until)
+
+        distance = haversine_m(lat, lon, self.lat[positions], self.lon[positions])
+        return self.rows[positions[distance <= radius_m]]
+
+    def count(self, lat, lon, radius_m, severity=None, since=None, until=None):
+        return len(self.radius(lat, lon, radius_m, severity, since, until))
+
+    def bbox(self, min_lat, min_lon, max_lat, max_lon, severity=None, since=None, until=None):
+        """Dataset rows inside a lat/lon bounding box"""
+        low_x, low_y = project(min_lat, min_lon)
+        high_x, high_y = project(max_lat, max_lon)
+        cells = self._cell_range(
+            (float(low_x) + float(high_x)) / 2,
+            (float(low_y) + float(high_y)) / 2,
+            max(float(high_x) - float(low_x), float(high_y) - float(low_y)) / 2 + self.cell_size
+        )
+
+        positions = self._filter(self._candidates(*cells), severity, since, until)
+        inside = (
+            (self.lat[positions] >= min_lat) & (self.lat[positions] <= max_lat)
+            & (self.lon[positions] >= min_lon) & (self.lon[positions] <= max_lon)
+        )
+        return self.rows[positions[inside]]
+
+    def nearest(self, lat, lon, k=10, severity=None, since=None, until=None):
+        """
+        The k nearest matching accidents: (rows, distances in metres),
+        closest first. Searches outward in growing squares of cells.
+        """
+        x, y = project(lat, lon)
+        search_m = self.cell_size
+        max_search_m = self.cell_size * float(max(self.shape))
+
+        while True:
+            positions = self._candidates(*self._cell_range(float(x), float(y), self._search_radius(lat, search_m)))
+            positions = self._filter(positions, severity, since, until)
+            distance = haversine_m(lat, lon, self.lat[positions], self.lon[positions])
+
+            # Everything within search_m is guaranteed to be among the candidates
+            within = distance <= search_m
+            if within.sum() >= k or search_m >= max_search_m:
+                order = np.argsort(distance, kind="stable")[:k]
+                return self.rows[positions[order]], distance[order]
+
+            search_m *= 2
+
+
+
+# Loading
+
+def index_is_current(path=SPATIAL_INDEX_PATH, name=CLEANED_DATASET):
+    """The saved index exists and was built after the last write to its dataset"""
+    return os.path.exists(path) and os.path.getmtime(path) >= dataset_mtime(name)
+
+
+def load_spatial_index(path=SPATIAL_INDEX_PATH, name=CLEANED_DATASET):
+    """
+    The saved index, or None when it is missing or older than its dataset
+    (rebuild it with python utils/spatial_index.py)
+    """
+    if not index_is_current(path, name):
+        return None
+    return SpatialIndex.load(path)
+
+
+
+# Build
+
+def build_spatial_index(name=CLEANED_DATASET, cell_size=DEFAULT_CELL_SIZE_M, path=SPATIAL_INDEX_PATH):
+    print("Loading coordinates...")
+    df = load_dataset(name, columns=["Latitude", "Longitude", "Accident_Severity", "Date"])
+
+    print(f"Building spatial index ({cell_size:.0f} m cells)...")
+    index = SpatialIndex.from_dataframe(df, cell_size)
+    index.save(path)
+
+    print(f"Spatial index saved ({len(index)} points, {len(index.cell_ids)} cells) at: {path}")
+    return index
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the accident spatial index")
+    parser.add_argument("--cell-size", type=float, default=DEFAULT_CELL_SIZE_M, help="Grid cell size in metres")
+    args = parser.parse_args()
+
+    build_spatial_index(cell_size=args.cell_size)